@@ -0,0 +1,43 @@
+"""
+Disk bytes vs CPU time of compressed JSON dumps/loads of a large tree.
+
+    python benchmarks/bench_compression.py
+"""
+import os
+import time
+import random
+import tempfile
+from benedict import BeneDict
+
+
+def make_tree(n_groups=2000):
+    rng = random.Random(0)
+    return {
+        'group{}'.format(g): {
+            'params': {'p{}'.format(i): rng.random() for i in range(20)},
+            'history': [{'step': s, 'loss': rng.random()} for s in range(10)],
+        }
+        for g in range(n_groups)
+    }
+
+
+def main():
+    tree = BeneDict(make_tree())
+    tmpdir = tempfile.mkdtemp()
+    cases = [('.json', None), ('.json.gz', 1), ('.json.gz', 6), ('.json.gz', 9),
+             ('.json.bz2', 9), ('.json.xz', 0), ('.json.xz', 6)]
+    for ext, level in cases:
+        file_path = os.path.join(tmpdir, 'state' + ext)
+        start = time.perf_counter()
+        tree.dump_file(file_path, compresslevel=level)
+        dump_time = time.perf_counter() - start
+        start = time.perf_counter()
+        BeneDict.load_file(file_path)
+        load_time = time.perf_counter() - start
+        print('{:<10} level={:<5} {:9.2f} MB  dump {:6.2f} s  load {:6.2f} s'
+              .format(ext, str(level), os.path.getsize(file_path) / 2**20,
+                      dump_time, load_time))
+
+
+if __name__ == '__main__':
+    main()
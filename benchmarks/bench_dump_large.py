@@ -0,0 +1,60 @@
+"""
+Time and peak traced memory of dumping a large BeneDict to JSON:
+plain copy + json.dump vs the streaming encoder of dump_json_file.
+
+    python benchmarks/bench_dump_large.py
+"""
+import os
+import json
+import time
+import tempfile
+import tracemalloc
+from benedict import BeneDict, data_format as df
+
+
+def make_tree(n_groups=20000, n_leaves=20):
+    return {
+        'group{}'.format(g): {
+            'params': {'p{}'.format(i): i * 0.5 for i in range(n_leaves)},
+            'tags': ['t{}'.format(i) for i in range(5)],
+            'runs': [{'seed': s, 'ok': True} for s in range(3)],
+        }
+        for g in range(n_groups)
+    }
+
+
+def measure(fn):
+    "tracing slows allocations down, so time and memory are separate runs"
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    tree = BeneDict(make_tree())
+    file_path = os.path.join(tempfile.mkdtemp(), 'state.json')
+
+    def copy_then_dump():
+        with open(file_path, 'w') as fp:
+            json.dump(tree.to_dict(), fp, indent=4)
+
+    chunks = []
+    for label, fn in [
+        ('to_dict + json.dump', copy_then_dump),
+        ('streaming', lambda: df.dump_json_file(
+            tree, file_path, json_backend='json', progress=chunks.append)),
+    ]:
+        elapsed, peak = measure(fn)
+        print('{:<20} {:7.3f} s  peak {:8.2f} MB'.format(
+            label, elapsed, peak / 2**20))
+    print('{:.1f} MB written in {} chunks'.format(
+        os.path.getsize(file_path) / 2**20, len(chunks) // 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+extend_configs over a sweep of generated configs, from 1 to os.cpu_count()
+worker processes, against a loop of extend_config calls.
+
+    python benchmarks/bench_extend_configs.py [n_configs]
+"""
+import os
+import sys
+import time
+from benedict import extend_config, extend_configs
+from bench_schema import make_default, make_job
+
+
+def main(n_configs=5000):
+    default = make_default()
+    start = time.perf_counter()
+    for i in range(n_configs):
+        extend_config(make_job(i), default)
+    loop = time.perf_counter() - start
+    print('extend_config loop        {:7.3f} s'.format(loop))
+    for as_config in True, False:
+        for workers in range(1, (os.cpu_count() or 1) + 1):
+            jobs = [make_job(i) for i in range(n_configs)]
+            start = time.perf_counter()
+            extend_configs(jobs, default, workers=workers, as_config=as_config)
+            elapsed = time.perf_counter() - start
+            print('extend_configs workers={:<2} as_config={:<5} {:7.3f} s  '
+                  '{:5.1f}x'.format(workers, str(as_config), elapsed,
+                                    loop / elapsed))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
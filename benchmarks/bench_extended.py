@@ -0,0 +1,33 @@
+"""
+Extending job configs without touching them: a defensive deep copy followed
+by extend_config vs extended_config, which shares untouched subtrees.
+
+    python benchmarks/bench_extended.py
+"""
+import copy
+import time
+from benedict import Config, compile_schema, extend_config, extended_config
+from bench_schema import make_default, make_job
+
+
+def main(n_jobs=500):
+    default = make_default()
+    schema = compile_schema(Config(default))
+    jobs = [make_job(i) for i in range(n_jobs)]
+    config_jobs = [Config(job) for job in jobs]
+    for label, extend, inputs in [
+            ('deepcopy + extend_config',
+             lambda job: extend_config(copy.deepcopy(job), default), jobs),
+            ('extended_config, dict job',
+             lambda job: extended_config(job, schema), jobs),
+            ('extended_config, Config job',
+             lambda job: extended_config(job, schema), config_jobs)]:
+        start = time.perf_counter()
+        for job in inputs:
+            extend(job)
+        print('{:<28} {} jobs {:7.3f} s'
+              .format(label, n_jobs, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
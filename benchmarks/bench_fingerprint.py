@@ -0,0 +1,51 @@
+"""
+Keying a cache by config: hashing dump_json_str(sort_keys=True) vs
+fingerprint(), the first time, again after changing a single value and
+again without any change.
+
+    python benchmarks/bench_fingerprint.py
+"""
+import hashlib
+import time
+from benedict import Config
+from bench_schema import make_default, make_job
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(n_sections=500, repeat=20):
+    config = Config(make_default(n_sections))
+    config.extend(make_job(1, n_sections))
+
+    def json_digest(i, backend=None):
+        config.section7.steps = i
+        return hashlib.blake2b(config.dump_json_str(
+            sort_keys=True, json_backend=backend).encode()).hexdigest()
+
+    copies = [Config(config) for _ in range(repeat)]
+
+    def first_fingerprint(i):
+        return copies[i].fingerprint()
+
+    def fingerprint(i):
+        config.section7.steps = i
+        return config.fingerprint()
+
+    config.fingerprint()
+    for label, fn in [('json + blake2b', json_digest),
+                      ('stdlib json + blake2b',
+                       lambda i: json_digest(i, 'json')),
+                      ('fingerprint, cold', first_fingerprint),
+                      ('fingerprint, after a change', fingerprint),
+                      ('fingerprint, unchanged',
+                       lambda i: config.fingerprint())]:
+        print('{:<28} {:8.3f} ms'.format(label, timed(fn, repeat) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Attribute access latency on Config and BeneDict: hits, misses caught as
+ConfigError, and hasattr / getattr probes of optional keys, against the
+previous Config.__getattr__.
+
+    python benchmarks/bench_getattr.py
+"""
+import timeit
+from benedict import BeneDict, Config, ConfigError
+
+
+class OldConfig(Config):
+    "the previous __getattr__: retried the lookup, formatted every message"
+    def __getattr__(self, key):
+        try:
+            return super().__getattribute__(key)
+        except AttributeError:
+            raise ConfigError('config key "{}" missing.'.format(key))
+
+
+def old_hasattr(config, key):
+    try:
+        getattr(config, key)
+    except ConfigError:
+        return False
+    return True
+
+
+def miss(config):
+    try:
+        config.missing
+    except ConfigError:
+        pass
+
+
+def main(number=200000):
+    data = {'learner': {'lr': 0.1}, 'present': 1}
+    cases = [
+        ('hit', lambda c: c.present),
+        ('miss, except ConfigError', miss),
+        ('hasattr miss', lambda c: hasattr(c, 'missing')),
+        ('getattr(c, k, None) miss', lambda c: getattr(c, 'missing', None)),
+        ("'k' in c", lambda c: 'missing' in c),
+    ]
+    print('{:<28} {:>10} {:>10} {:>10}'.format(
+        'ns per access', 'old', 'Config', 'BeneDict'))
+    for label, fn in cases:
+        timings = []
+        for cls in OldConfig, Config, BeneDict:
+            config = cls(data)
+            access = fn
+            if cls is OldConfig and 'attr' in label:
+                # hasattr() and getattr() with a default raised on a miss
+                access = lambda c: old_hasattr(c, 'missing')
+            if cls is BeneDict and 'except' in label:
+                timings.append(float('nan'))
+                continue
+            timings.append(
+                timeit.timeit(lambda: access(config), number=number)
+                / number * 1e9)
+        print('{:<28} {:>10.0f} {:>10.0f} {:>10.0f}'.format(label, *timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+JSON dump/load throughput of every installed backend, on the kind of small
+BeneDict state an RPC layer serializes many times per second.
+
+    python benchmarks/bench_json_backends.py
+"""
+import time
+import random
+from benedict import BeneDict, data_format as df
+
+
+def make_state(n_keys=50):
+    rng = random.Random(0)
+    return {
+        'key{}'.format(i): {
+            'value': rng.random(),
+            'tags': ['t{}'.format(j) for j in range(5)],
+            'meta': {'step': i, 'done': i % 2 == 0, 'name': 'worker' * 3},
+        }
+        for i in range(n_keys)
+    }
+
+
+def rate(fn, seconds=1.0):
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(100):
+            fn()
+        count += 100
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    state = BeneDict(make_state())
+    plain = state.to_dict()
+    for backend in df.available_json_backends():
+        s = df.dump_json_str(plain, json_backend=backend)
+        print('{:<10} dump BeneDict {:9.0f}/s  dump dict {:9.0f}/s  '
+              'load dict {:9.0f}/s'.format(
+                  backend,
+                  rate(lambda: state.dump_json_str(json_backend=backend)),
+                  rate(lambda: df.dump_json_str(plain, json_backend=backend)),
+                  rate(lambda: df.load_json_str(s, json_backend=backend))))
+
+
+if __name__ == '__main__':
+    main()
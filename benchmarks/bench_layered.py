@@ -0,0 +1,39 @@
+"""
+Per-request config overlays: merging the layers with Config.extend vs a
+LayeredConfig child over shared layers, each followed by a few lookups.
+
+    python benchmarks/bench_layered.py
+"""
+import time
+from benedict import BeneDict, Config, LayeredConfig
+from bench_schema import make_default
+
+
+def main(n_requests=2000):
+    defaults = BeneDict(make_default())
+    for section in defaults.values():
+        section.update(lr=0.1, steps=10, mode='train', nested={'b': 1})
+    tenant = BeneDict({'section3': {'lr': 0.2}})
+    base = LayeredConfig(tenant, defaults)
+
+    def merged(i):
+        config = Config({'section1': {'steps': i}})
+        config.extend(tenant.to_dict())
+        config.extend(defaults.to_dict())
+        return config
+
+    def layered(i):
+        return base.new_child({'section1': {'steps': i}})
+
+    for label, make in ('merged', merged), ('layered', layered):
+        start = time.perf_counter()
+        for i in range(n_requests):
+            config = make(i)
+            config.section1.steps, config.section3.lr
+            config.section7.nested.b
+        print('{:<8} {} requests {:7.3f} s'
+              .format(label, n_requests, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Load time and peak traced memory of BeneDict.load_file on a large tree.
+
+    python benchmarks/bench_load_large.py
+"""
+import os
+import time
+import tempfile
+import tracemalloc
+from benedict import BeneDict, OrderedBeneDict
+
+
+def make_tree(n_groups=500, n_leaves=20):
+    return {
+        'group{}'.format(g): {
+            'params': {'p{}'.format(i): i * 0.5 for i in range(n_leaves)},
+            'tags': ['t{}'.format(i) for i in range(5)],
+            'runs': [{'seed': s, 'ok': True} for s in range(3)],
+        }
+        for g in range(n_groups)
+    }
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    tree = BeneDict(make_tree())
+    tmpdir = tempfile.mkdtemp()
+    for ext in ['.json', '.yml']:
+        file_path = os.path.join(tmpdir, 'large' + ext)
+        tree.dump_file(file_path)
+        for cls in [BeneDict, OrderedBeneDict]:
+            elapsed, peak = measure(lambda: cls.load_file(file_path))
+            print('{:<16} {:<5} {:7.3f} s  peak {:7.1f} MB'.format(
+                cls.__name__, ext, elapsed, peak / 2**20))
+
+
+if __name__ == '__main__':
+    main()
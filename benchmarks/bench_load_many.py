@@ -0,0 +1,47 @@
+"""
+Scaling of BeneDict.load_many over many small YAML specs, across pool sizes.
+
+    python benchmarks/bench_load_many.py [n_files]
+"""
+import os
+import sys
+import time
+import tempfile
+from benedict import BeneDict
+
+
+def make_specs(n_files):
+    tmpdir = tempfile.mkdtemp()
+    file_paths = []
+    for i in range(n_files):
+        file_path = os.path.join(tmpdir, 'task{}.yml'.format(i))
+        BeneDict({
+            'task': i,
+            'learner': {'lr': 1e-3, 'batch_size': 64, 'layers': [256] * 4},
+            'env': {'name': 'env-{}'.format(i), 'frame_skip': 4},
+        }).dump_file(file_path)
+        file_paths.append(file_path)
+    return file_paths
+
+
+def main(n_files=1000):
+    file_paths = make_specs(n_files)
+    start = time.perf_counter()
+    for file_path in file_paths:
+        BeneDict.load_file(file_path)
+    serial = time.perf_counter() - start
+    print('serial load_file          {:7.2f} s'.format(serial))
+    n_cpus = os.cpu_count() or 1
+    pool_sizes = sorted({1, 2, 4, n_cpus} | {n_cpus * 2})
+    for executor in ['thread', 'process']:
+        for workers in pool_sizes:
+            start = time.perf_counter()
+            list(BeneDict.load_many(file_paths, workers=workers,
+                                    executor=executor))
+            elapsed = time.perf_counter() - start
+            print('{:<8} workers={:<3}     {:7.2f} s  speedup {:.2f}x'.format(
+                executor, workers, elapsed, serial / elapsed))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
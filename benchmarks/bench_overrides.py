@@ -0,0 +1,44 @@
+"""
+Thousands of dotted command line overrides: Config.from_overrides against
+merging one override at a time into a Config, then extending it.
+
+    python benchmarks/bench_overrides.py
+"""
+import time
+from benedict import Config
+from bench_schema import make_default
+
+
+def argparse_glue(default, argv):
+    "what the tools did before: one nested dict per flag, merged one by one"
+    config = Config()
+    for arg in argv:
+        key, _, text = arg[2:].partition('=')
+        *parents, leaf = key.split('.')
+        parse = {'lr': float, 'mode': str}.get(leaf, int)
+        override = {leaf: parse(text)}
+        for parent in reversed(parents):
+            override = {parent: override}
+        config = Config(override).extend(config)
+    return config.extend(default)
+
+
+def main(n_sections=200):
+    default = make_default(n_sections)
+    argv = []
+    for s in range(n_sections):
+        argv += ['--section{}.lr=1e-3'.format(s),
+                 '--section{}.steps={}'.format(s, s),
+                 '--section{}.nested.b=2'.format(s),
+                 '--section{}.mode=train'.format(s)]
+    for label, build in [
+            ('glue', lambda: argparse_glue(default, argv)),
+            ('from_overrides', lambda: Config.from_overrides(default, argv))]:
+        start = time.perf_counter()
+        build()
+        print('{:<15} {} overrides {:7.3f} s'
+              .format(label, len(argv), time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
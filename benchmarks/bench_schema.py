@@ -0,0 +1,71 @@
+"""
+Validating many job configs against the same defaults:
+the default dict vs a schema from compile_schema, and fail-fast vs
+collect=True on valid configs.
+
+    python benchmarks/bench_schema.py
+"""
+import time
+from benedict import Config, compile_schema
+from benedict.config import _fill_default_config, _fill_collect
+
+
+def make_default(n_sections=20):
+    return {
+        'section{}'.format(s): {
+            'lr': '_float_',
+            'steps': '_int_',
+            'mode': '_enum[train, eval, test]_',
+            'name': 'default',
+            'sizes': [64, 64],
+            'nested': {'a': 1, 'b': '_num_', 'c': {'d': 'x', 'e': 2}},
+            'optional': {'x': 1, 'y': [2, 3], 'z': {'w': None}},
+        }
+        for s in range(n_sections)
+    }
+
+
+def make_job(i, n_sections=20):
+    return {
+        'section{}'.format(s): {
+            'lr': 0.1 * i, 'steps': i, 'mode': 'train',
+            'nested': {'b': 1.5, 'c': {}},
+        }
+        for s in range(n_sections)
+    }
+
+
+def timed(fn, jobs):
+    start = time.perf_counter()
+    for job in jobs:
+        fn(job)
+    return time.perf_counter() - start
+
+
+def main(n_jobs=2000):
+    default = make_default()
+    schema = compile_schema(default)
+    cases = [
+        # extend_config() runs _fill_default_config, then wraps in a Config
+        ('dict', lambda i: make_job(i),
+         lambda job: _fill_default_config(job, default, []),
+         schema.extend),
+        ('Config', lambda i: Config(make_job(i)),
+         lambda job: job.extend(default),
+         lambda job: job.extend(schema)),
+    ]
+    for label, make, extend, compiled in cases:
+        before = timed(extend, [make(i) for i in range(n_jobs)])
+        after = timed(compiled, [make(i) for i in range(n_jobs)])
+        print('{:<8} {} jobs  default dict {:6.3f} s  compiled {:6.3f} s  '
+              '{:5.1f}x'.format(label, n_jobs, before, after, before / after))
+    fail_fast = timed(lambda job: _fill_default_config(job, default, []),
+                      [make_job(i) for i in range(n_jobs)])
+    collect = timed(lambda job: _fill_collect(job, default),
+                    [make_job(i) for i in range(n_jobs)])
+    print('valid    {} jobs  fail-fast    {:6.3f} s  collect  {:6.3f} s'
+          .format(n_jobs, fail_fast, collect))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Time and peak traced memory of loading one small subtree with
+`load_file(select=...)` vs loading the whole file.
+
+    python benchmarks/bench_select.py
+"""
+import os
+import time
+import tempfile
+import tracemalloc
+from benedict import BeneDict
+
+
+def make_tree(n_groups, n_leaves=20):
+    tree = {
+        'group{}'.format(g): {
+            'params': {'p{}'.format(i): i * 0.5 for i in range(n_leaves)},
+            'tags': ['t{}'.format(i) for i in range(5)],
+            'runs': [{'seed': s, 'ok': True, 'note': 'a "quoted" {x}'}
+                     for s in range(3)],
+        }
+        for g in range(n_groups)
+    }
+    tree['learner'] = {'optimizer': {'lr': 1e-3, 'betas': [0.9, 0.999]}}
+    return tree
+
+
+def measure(fn):
+    "tracing slows allocations down, so time and memory are separate runs"
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    tmpdir = tempfile.mkdtemp()
+    for ext, n_groups in [('.json', 20000), ('.yml', 500)]:
+        file_path = os.path.join(tmpdir, 'experiment' + ext)
+        BeneDict(make_tree(n_groups)).dump_file(file_path)
+        print('{} {:.1f} MB'.format(ext, os.path.getsize(file_path) / 2**20))
+        for label, fn in [
+            ('full', lambda: BeneDict.load_file(file_path).learner.optimizer),
+            ('select', lambda: BeneDict.load_file(
+                file_path, select='learner.optimizer')),
+        ]:
+            elapsed, peak = measure(fn)
+            print('  {:<8} {:7.3f} s  peak {:8.2f} MB'.format(
+                label, elapsed, peak / 2**20))
+
+
+if __name__ == '__main__':
+    main()
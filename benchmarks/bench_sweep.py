@@ -0,0 +1,44 @@
+"""
+Expanding a sweep over a large config: nested loops over deepcopy() vs
+Sweep, which shares the unchanged subtrees.
+
+    python benchmarks/bench_sweep.py
+"""
+import itertools
+import time
+from benedict import Config, Sweep
+from bench_schema import make_default
+
+
+def main(n_sections=50):
+    base = Config(make_default(n_sections))
+    lrs, batches, names = [0.1, 0.01, 1e-3, 1e-4], [32, 64, 128], ['a', 'b']
+
+    start = time.perf_counter()
+    for lr, batch, name in itertools.product(lrs, batches, names):
+        config = base.deepcopy()
+        config.section0.lr = lr
+        config.section1.steps = batch
+        config.section2.name = name
+    loops = time.perf_counter() - start
+
+    swept = base.deepcopy()
+    swept.section0.lr = '_grid[0.1, 0.01, 1e-3, 1e-4]_'
+    swept.section1.steps = '_grid[32, 64, 128]_'
+    swept.section2.name = '_grid[a, b]_'
+    start = time.perf_counter()
+    configs = list(Sweep(swept))
+    lazy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sweep = Sweep(swept)
+    for n in range(0, len(sweep), 5):
+        sweep[n]
+    indexed = time.perf_counter() - start
+    print('{} configs: deepcopy loops {:.3f} s, Sweep {:.4f} s, '
+          'every 5th by index {:.4f} s'
+          .format(len(configs), loops, lazy, indexed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Cold parse vs sidecar-cached load of a large YAML config.
+
+    python benchmarks/bench_yaml_sidecar.py
+"""
+import os
+import time
+import tempfile
+from benedict import BeneDict, OrderedBeneDict, data_format as df
+
+
+def make_tree(n_groups=500, n_leaves=20):
+    return {
+        'group{}'.format(g): {
+            'params': {'p{}'.format(i): i * 0.5 for i in range(n_leaves)},
+            'tags': ['t{}'.format(i) for i in range(5)],
+            'runs': [{'seed': s, 'ok': True} for s in range(3)],
+        }
+        for g in range(n_groups)
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    tmpdir = tempfile.mkdtemp()
+    file_path = os.path.join(tmpdir, 'config.yml')
+    BeneDict(make_tree()).dump_file(file_path)
+    cache = df.SidecarCache(os.path.join(tmpdir, 'cache'))
+    print('{:.2f} MB YAML'.format(os.path.getsize(file_path) / 2**20))
+    for cls in [BeneDict, OrderedBeneDict]:
+        parse = timed(lambda: cls.load_file(file_path, sidecar=False))
+        build = timed(lambda: cls.load_file(file_path, sidecar=cache))
+        hit = min(timed(lambda: cls.load_file(file_path, sidecar=cache))
+                  for _ in range(5))
+        os.utime(file_path)
+        rehash = timed(lambda: cls.load_file(file_path, sidecar=cache))
+        print('{:<16} parse {:6.3f} s  first (parse + write) {:6.3f} s  '
+              'hit {:6.3f} s  touched (hash) {:6.3f} s'.format(
+                  cls.__name__, parse, build, hit, rehash))
+
+
+if __name__ == '__main__':
+    main()
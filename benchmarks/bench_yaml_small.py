@@ -0,0 +1,32 @@
+"""
+Per-call overhead of the ordered YAML loader/dumper on a small document,
+e.g. a per-job spec.
+
+    python benchmarks/bench_yaml_small.py
+"""
+import timeit
+import benedict.data_format as df
+
+
+SMALL_YAML = """
+name: job-17
+resources: {cpu: 4, gpu: 1}
+args: [--lr, '0.001']
+"""
+
+
+def main(number=2000):
+    data = df.ordered_load_yaml_str(SMALL_YAML)
+    plain = df.load_yaml_str(SMALL_YAML)
+    for name, fn in [
+        ('load_yaml_str', lambda: df.load_yaml_str(SMALL_YAML)),
+        ('ordered_load_yaml_str', lambda: df.ordered_load_yaml_str(SMALL_YAML)),
+        ('dump_yaml_str', lambda: df.dump_yaml_str(plain)),
+        ('ordered_dump_yaml_str', lambda: df.ordered_dump_yaml_str(data)),
+    ]:
+        sec = timeit.timeit(fn, number=number)
+        print('{:<24} {:8.1f} us/call'.format(name, sec / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,12 @@
 from .core import (
-    BeneDict, benedict_to_dict
+    BeneDict, benedict_to_dict, benedict_fingerprint
 )
 from .ordered import (
     OrderedBeneDict, benedict_to_ordereddict
 )
 from .data_format import *
 from .config import *
+from .watcher import *
+from .layered import *
+from .interpolation import *
+from .sweeps import *
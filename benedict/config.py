@@ -1,48 +1,231 @@
 import re
-from benedict.core import BeneDict
+import os
+import collections.abc as abc
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import yaml
+from benedict.core import (
+    BeneDict, _build_nodes, _set_node_value, benedict_to_dict
+)
+from benedict.ordered import OrderedBeneDict
 
 
 class ConfigError(Exception):
     pass
 
 
+class ConfigErrors(ConfigError):
+    """
+    Every problem found by a `collect=True` extend, in traversal order
+
+    Attributes:
+        errors: list of (dotted_key_path, message)
+    """
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('{} config errors:\n'.format(len(errors))
+                         + '\n'.join('  ' + msg for _, msg in errors))
+
+    def __reduce__(self):
+        return type(self), (self.errors,)
+
+
+class ConfigKeyError(ConfigError, AttributeError):
+    """
+    Missing key on attribute access. Also an AttributeError, so that
+    `hasattr(config, key)` and `getattr(config, key, None)` probe optional
+    keys without raising. The message is only formatted when shown.
+    `key in config` and `config.builtin_get(key)` are cheaper still.
+    """
+    # no __init__: raised on every miss, the key is kept in `args` as is
+    @property
+    def key(self):
+        return self.args[0]
+
+    def __str__(self):
+        return 'config key "{}" missing.'.format(self.key)
+
+
 def _trace_key(dict_trace, key):
     return 'key "{}" '.format('.'.join(dict_trace + [key]))
 
 
-_enum_marker = re.compile('_enum\[(.*)\]_')
+# ==================== markers ====================
+def _parse_bool(text):
+    lowered = text.strip().lower()
+    if lowered in ('true', 'yes', 'on', '1'):
+        return True
+    elif lowered in ('false', 'no', 'off', '0'):
+        return False
+    raise ValueError(text)
+
+
+def _parse_num(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+# check(x) -> bool, types is set if check is just isinstance(x, types),
+# parse(text) converts command line overrides, None for YAML
+_Marker = namedtuple('_Marker', ['check', 'description', 'types', 'parse'])
+
+_MARKERS = {}  # '_name_' -> _Marker
+_MARKER_FACTORIES = {}  # name of '_name[args]_' -> factory(args) -> _Marker
+_parametrized_marker = re.compile(r'_(\w+?)\[(.*)\]_')
+
+
+def register_marker(name, check, description=None, parse=None,
+                    parametrized=False):
+    """
+    Adds a placeholder for default configs, e.g.
+
+        register_marker('port', lambda x: isinstance(x, int) and x < 65536,
+                        'a port number', parse=int)
+
+    makes `'_port_'` a required entry. Placeholders are case-insensitive.
+    Register markers before compiling schemas that use them.
+
+    Args:
+        name: the placeholder is `_{name}_`, or `_{name}[args]_` if
+            `parametrized`
+        check: predicate(value) -> bool, or a type or tuple of types for an
+            isinstance check. If `parametrized`, a factory(args_string) that
+            returns (check, description) and is called once per distinct
+            placeholder.
+        description: completes "key ... must be {description}."
+        parse: converts a command line or environment override string for
+            `Config.from_overrides`, defaults to YAML
+    """
+    name = name.lower()
+    if parametrized:
+        def factory(args):
+            marker_check, marker_description = check(args)
+            return _make_marker(marker_check, marker_description, parse)
+        _MARKER_FACTORIES[name] = factory
+    else:
+        assert description is not None, 'description required'
+        _MARKERS['_{}_'.format(name)] = _make_marker(check, description, parse)
+    _compile_marker.cache_clear()
+
+
+def unregister_marker(name, parametrized=False):
+    """
+    Removes a placeholder added by `register_marker`, schemas compiled
+    before keep using it
+
+    Returns:
+        True if it was registered
+    """
+    name = name.lower()
+    if parametrized:
+        removed = _MARKER_FACTORIES.pop(name, None)
+    else:
+        removed = _MARKERS.pop('_{}_'.format(name), None)
+    _compile_marker.cache_clear()
+    return removed is not None
+
+
+def _make_marker(check, description, parse):
+    if isinstance(check, (type, tuple)):
+        types = check
+        return _Marker(lambda x: isinstance(x, types), description, types,
+                       parse)
+    return _Marker(check, description, None, parse)
+
+
+@lru_cache(maxsize=1024)
+def _compile_marker(value):
+    """
+    Parses a placeholder string once into its checker
+
+    Returns:
+        _Marker, or None if `value` is not a placeholder
+    """
+    lowered = value.lower()
+    marker = _MARKERS.get(lowered)
+    if marker is not None:
+        return marker
+    match = _parametrized_marker.match(lowered)
+    if match:
+        factory = _MARKER_FACTORIES.get(match.group(1))
+        if factory is not None:
+            return factory(match.group(2))
+    return None
+
+
+def _marker_of(value):
+    # only placeholder-like strings reach the cache, so that arbitrary
+    # config values do not evict the parsed markers
+    if isinstance(value, str) and value[:1] == '_':
+        return _compile_marker(value)
+    return None
 
 
 def _req_type_check(value):
-    if not isinstance(value, str):
-        return None
-    value = value.lower()
-    if value == '_object_':
-        return lambda x: True
-    elif value == '_singleton_':
-        return lambda x: not isinstance(x, (list, dict))  # non-collection
-    elif value == '_list_':
-        return lambda x: isinstance(x, list)
-    elif value == '_dict_':
-        return lambda x: isinstance(x, dict)
-    elif value == '_int_':
-        return lambda x: isinstance(x, int)
-    elif value == '_float_':
-        return lambda x: isinstance(x, float)
-    elif value == '_num_':
-        return lambda x: isinstance(x, (int, float))
-    elif value == '_str_':
-        return lambda x: isinstance(x, str)
-    elif value == '_bool_':
-        return lambda x: isinstance(x, bool)
-    elif _enum_marker.match(value):
-        enum_options = _enum_marker.match(value).group(1)
-        if not enum_options:
-            raise ConfigError('_enum[...]_ cannot be empty')
-        enum_options = list(map(str.strip, enum_options.split(',')))
-        return lambda x: x in enum_options
+    marker = _marker_of(value)
+    return None if marker is None else marker.check
+
+
+def _enum_factory(args):
+    if not args:
+        raise ConfigError('_enum[...]_ cannot be empty')
+    options = frozenset(map(str.strip, args.split(',')))
+
+    def check(x):
+        try:
+            return x in options
+        except TypeError:  # unhashable, cannot equal a string option
+            return False
+    return check, 'an enum in [{}]'.format(args)
+
+
+def _list_factory(args):
+    "_list[int]_: every element satisfies the marker `_int_`"
+    element = _compile_marker('_{}_'.format(args.strip()))
+    if element is None:
+        raise ConfigError('_list[{}]_: unknown element marker'.format(args))
+    types = element.types
+    if types is not None:
+        def check(x):
+            return (isinstance(x, list)
+                    and all(isinstance(e, types) for e in x))
     else:
-        return None
+        element_check = element.check
+
+        def check(x):
+            return isinstance(x, list) and all(map(element_check, x))
+    return check, 'a list with each element {}'.format(element.description)
+
+
+def _range_factory(args):
+    "_range[low, high]_: a number, bounds included"
+    try:
+        low, high = map(_parse_num, args.split(','))
+    except ValueError:
+        raise ConfigError('_range[{}]_: expects two numbers'.format(args))
+
+    def check(x):
+        return isinstance(x, (int, float)) and low <= x <= high
+    return check, 'a number in [{}, {}]'.format(low, high)
+
+
+register_marker('object', object, 'filled')
+register_marker('singleton', lambda x: not isinstance(x, (list, dict)),
+                'a singleton (non-list/dict)')
+register_marker('list', list, 'a list')
+register_marker('dict', dict, 'a dict')
+register_marker('int', int, 'an integer', parse=int)
+register_marker('float', float, 'a float', parse=float)
+register_marker('num', (int, float), 'a numeric value', parse=_parse_num)
+register_marker('str', str, 'a string', parse=str)
+register_marker('bool', bool, 'a boolean', parse=_parse_bool)
+register_marker('path', (str, os.PathLike), 'a path', parse=str)
+register_marker('enum', _enum_factory, parse=str, parametrized=True)
+register_marker('list', _list_factory, parametrized=True)
+register_marker('range', _range_factory, parse=_parse_num, parametrized=True)
 
 
 def _is_req(value):
@@ -59,48 +242,42 @@ def _has_req(config):
     return False
 
 
-def _raise_req_error(key, value, dict_trace, prefix_msg=''):
-    value = value.lower()
-    if value == '_object_':
-        msg = 'filled'
-    elif value == '_singleton_':
-        msg = 'a singleton (non-list/dict)'
-    elif value == '_list_':
-        msg = 'a list'
-    elif value == '_dict_':
-        msg = 'a dict'
-    elif value == '_int_':
-        msg = 'an integer'
-    elif value == '_float_':
-        msg = 'a float'
-    elif value == '_num_':
-        msg = 'a numeric value'
-    elif value == '_str_':
-        msg = 'a string'
-    elif value == '_bool_':
-        msg = 'a boolean'
-    elif _enum_marker.match(value):
-        enum_options = _enum_marker.match(value).group(1)
-        msg = 'an enum in [{}]'.format(enum_options)
-    else:
-        assert False, 'internal error: req value fell through'
+def _report(errors, dict_trace, key, message):
+    "raises at the first problem, or collects it if `errors` is a list"
+    if errors is None:
+        raise ConfigError(message)
+    errors.append(('.'.join(dict_trace + [key]), message))
+
+
+def _raise_req_error(key, value, dict_trace, prefix_msg='', errors=None):
+    marker = _marker_of(value)
+    assert marker is not None, 'internal error: req value fell through'
     prefix_msg = prefix_msg+' ' if prefix_msg else ''
-    raise ConfigError('{}{}must be {}.'
-                      .format(prefix_msg, _trace_key(dict_trace, key), msg))
+    _report(errors, dict_trace, key,
+            '{}{}must be {}.'.format(prefix_msg, _trace_key(dict_trace, key),
+                                     marker.description))
 
 
-def _fill_default_config(config, default_config, dict_trace):
+def _fill_default_config(config, default_config, dict_trace, errors=None):
+    """
+    Args:
+        errors: None raises ConfigError at the first problem, a list collects
+            all of them as (dotted_key_path, message) and carries on
+    """
     for key, default_value in default_config.items():
         if key not in config:
             if _is_req(default_value):
                 _raise_req_error(key, default_value, dict_trace,
-                                 'Required entry missing:')
+                                 'Required entry missing:', errors)
+                continue
             elif isinstance(default_value, dict):
                 if _has_req(default_value):
-                    raise ConfigError(
+                    _report(
+                        errors, dict_trace, key,
                         'Sub-dict under key "{}" contains a required config: {}.'
                         .format(_trace_key(dict_trace, key), default_value)
                     )
+                    continue
             config[key] = default_value
         else:
             value = config[key]
@@ -108,7 +285,8 @@ def _fill_default_config(config, default_config, dict_trace):
                 # value remains a placeholder after being extended
                 if _is_req(value):
                     if value != default_value:
-                        raise ConfigError(
+                        _report(
+                            errors, dict_trace, key,
                             'inherited {}: "{}" must match default "{}"'
                             .format(_trace_key(dict_trace, key),
                                     value, default_value)
@@ -116,42 +294,543 @@ def _fill_default_config(config, default_config, dict_trace):
                 else:
                     checker = _req_type_check(default_value)
                     if not checker(value):
-                        _raise_req_error(
-                            key, default_value, dict_trace, 'Wrong type:')
+                        _raise_req_error(key, default_value, dict_trace,
+                                         'Wrong type:', errors)
             else:
                 if (isinstance(value, dict) and
                         not isinstance(default_value, dict)):
-                    raise ConfigError(
+                    _report(
+                        errors, dict_trace, key,
                         _trace_key(dict_trace, key)
                         + 'must be a singleton instead of a sub-dict'
                     )
+                    continue
                 if isinstance(default_value, dict):
                     if not isinstance(value, dict):
-                        raise ConfigError(
+                        _report(
+                            errors, dict_trace, key,
                             _trace_key(dict_trace, key)
                             + 'must have a sub-dict instead of a singleton'
                         )
+                        continue
                     config[key] = _fill_default_config(
                         value,
                         default_value,
-                        dict_trace + [key]
+                        dict_trace + [key],
+                        errors
                     )
     return config
 
 
+def _fill_collect(config, default_config):
+    "single traversal that raises all the problems at once"
+    errors = []
+    _fill_default_config(config, default_config, [], errors)
+    if errors:
+        raise ConfigErrors(errors)
+    return config
+
+
+# ==================== precompiled schema ====================
+# one entry per default key, the marker or the sub-schema may be None
+_SchemaEntry = namedtuple(
+    '_SchemaEntry', ['key', 'default', 'marker', 'children', 'has_req'])
+
+# the same entries grouped by kind, for the fast path
+_SchemaNode = namedtuple('_SchemaNode', ['leaves', 'markers', 'dicts'])
+
+
+def _compile_entries(default_config):
+    entries = []
+    for key, default_value in dict.items(default_config):
+        marker = _marker_of(default_value)
+        children = None
+        has_req = False
+        if marker is None and isinstance(default_value, dict):
+            children = _compile_entries(default_value)
+            has_req = any(entry.marker is not None or entry.has_req
+                          for entry in children)
+        entries.append(
+            _SchemaEntry(key, default_value, marker, children, has_req))
+    return entries
+
+
+def _compile_node(entries):
+    node = _SchemaNode([], [], [])
+    for key, default_value, marker, children, has_req in entries:
+        if marker is not None:
+            node.markers.append(
+                (key, default_value, marker.types, marker.check))
+        elif children is not None:
+            node.dicts.append(
+                (key, default_value, _compile_node(children), has_req))
+        else:
+            node.leaves.append((key, default_value))
+    return node
+
+
+_missing = object()
+
+
+def _store_default(config, key, default_value):
+    """
+    `config[key] = default_value` for BeneDict and OrderedBeneDict configs.
+    They get their copy of the default from `_build_nodes`, which skips the
+    class scan `cls(...)` runs for every new node.
+    """
+    _set_node_value(config, key, _build_nodes(type(config), default_value))
+
+
+def _extend_fast(config, node, get=dict.get, missing=_missing):
+    """
+    Fills `config` from a compiled node, kind by kind.
+
+    Returns:
+        False as soon as anything is wrong, `_extend_ordered` then finds
+        the first error in the original key order
+    """
+    leaves, markers, dicts = node
+    is_node = isinstance(config, (BeneDict, OrderedBeneDict))
+    for key, default_value in leaves:
+        value = get(config, key, missing)
+        if value is missing:
+            if is_node:
+                _store_default(config, key, default_value)
+            else:
+                config[key] = default_value
+        elif isinstance(value, dict):
+            return False
+    for key, default_value, types, check in markers:
+        value = get(config, key, missing)
+        if value is missing:
+            return False
+        if (isinstance(value, str) and value[:1] == '_'
+                and _compile_marker(value) is not None):
+            # value remains a placeholder after being extended
+            if value != default_value:
+                return False
+        elif types is not None:
+            if not isinstance(value, types):
+                return False
+        elif not check(value):
+            return False
+    for key, default_value, child, has_req in dicts:
+        value = get(config, key, missing)
+        if value is missing:
+            if has_req:
+                return False
+            if is_node:
+                _store_default(config, key, default_value)
+            else:
+                config[key] = default_value
+        elif not isinstance(value, dict) or not _extend_fast(value, child):
+            return False
+    return True
+
+
+def _extend_ordered(config, entries, dict_trace, errors=None):
+    "`_fill_default_config` over precompiled entries, raises the same errors"
+    for key, default_value, marker, children, has_req in entries:
+        if key not in config:
+            if marker is not None:
+                _raise_req_error(key, default_value, dict_trace,
+                                 'Required entry missing:', errors)
+            elif has_req:
+                _report(
+                    errors, dict_trace, key,
+                    'Sub-dict under key "{}" contains a required config: {}.'
+                    .format(_trace_key(dict_trace, key), default_value)
+                )
+            else:
+                config[key] = default_value
+            continue
+        value = config[key]
+        if marker is not None:
+            if _marker_of(value) is not None:
+                # value remains a placeholder after being extended
+                if value != default_value:
+                    _report(
+                        errors, dict_trace, key,
+                        'inherited {}: "{}" must match default "{}"'
+                        .format(_trace_key(dict_trace, key),
+                                value, default_value)
+                    )
+            elif not marker.check(value):
+                _raise_req_error(key, default_value, dict_trace,
+                                 'Wrong type:', errors)
+        elif children is None:
+            if isinstance(value, dict):
+                _report(
+                    errors, dict_trace, key,
+                    _trace_key(dict_trace, key)
+                    + 'must be a singleton instead of a sub-dict'
+                )
+        elif not isinstance(value, dict):
+            _report(
+                errors, dict_trace, key,
+                _trace_key(dict_trace, key)
+                + 'must have a sub-dict instead of a singleton'
+            )
+        else:
+            # filled in place, no need to store (and copy) it again
+            _extend_ordered(value, children, dict_trace + [key], errors)
+    return config
+
+
+def _as_node(cls, value):
+    "`value` itself unless it holds mappings that are not `cls` nodes yet"
+    if isinstance(value, cls):
+        return value
+    elif isinstance(value, abc.Mapping):
+        return _build_nodes(cls, value)
+    elif isinstance(value, (list, tuple)):
+        for x in value:
+            if isinstance(x, (abc.Mapping, list, tuple)):
+                return _build_nodes(cls, value)
+    return value
+
+
+def _extend_pure(cls, config, entries, dict_trace, errors=None,
+                 reuse=False):
+    """
+    `_extend_ordered` without touching `config`: the default values in
+    `entries` must already be `cls` nodes and are shared as is.
+
+    Args:
+        reuse: return `config` itself if it is a `cls` node that lacks no
+            default, for the sub-dicts. The root is always a new node.
+
+    Returns:
+        a `cls` node. Below the root, only the nodes along paths that get
+        defaults filled in are rebuilt.
+    """
+    replaced = {}
+    added = []
+    for key, default_value, marker, children, has_req in entries:
+        value = dict.get(config, key, _missing)
+        if value is _missing:
+            if marker is not None:
+                _raise_req_error(key, default_value, dict_trace,
+                                 'Required entry missing:', errors)
+            elif has_req:
+                _report(
+                    errors, dict_trace, key,
+                    'Sub-dict under key "{}" contains a required config: {}.'
+                    .format(_trace_key(dict_trace, key), default_value)
+                )
+            else:
+                added.append((key, default_value))
+            continue
+        if marker is not None:
+            if _marker_of(value) is not None:
+                if value != default_value:
+                    _report(
+                        errors, dict_trace, key,
+                        'inherited {}: "{}" must match default "{}"'
+                        .format(_trace_key(dict_trace, key),
+                                value, default_value)
+                    )
+            elif not marker.check(value):
+                _raise_req_error(key, default_value, dict_trace,
+                                 'Wrong type:', errors)
+        elif children is None:
+            if isinstance(value, dict):
+                _report(
+                    errors, dict_trace, key,
+                    _trace_key(dict_trace, key)
+                    + 'must be a singleton instead of a sub-dict'
+                )
+        elif not isinstance(value, dict):
+            _report(
+                errors, dict_trace, key,
+                _trace_key(dict_trace, key)
+                + 'must have a sub-dict instead of a singleton'
+            )
+        else:
+            new_value = _extend_pure(cls, value, children, dict_trace + [key],
+                                     errors, reuse=True)
+            if new_value is not value:
+                replaced[key] = new_value
+    if reuse and not replaced and not added and isinstance(config, cls):
+        return config
+    pairs = [(k, replaced[k] if k in replaced else _as_node(cls, v))
+             for k, v in dict.items(config)]
+    return cls._from_pairs(pairs + added)
+
+
+class ConfigSchema:
+    """
+    A default config compiled once into a validator tree: placeholders are
+    parsed into checkers, enum options into sets, and which sub-dicts contain
+    required entries is known up front. `extend` raises the same ConfigErrors
+    as `Config.extend` / `extend_config`.
+
+    The schema keeps a reference to `default_config`, do not mutate it.
+
+    Speed, benchmarks/bench_schema.py: Config nodes are about 40x faster to
+    extend than with the default dict. Plain dicts are only about 3-4x
+    faster than `extend_config`, short of the 5x that was aimed for.
+    """
+    def __init__(self, default_config):
+        assert isinstance(default_config, dict)
+        self.default_config = default_config
+        self._entries = _compile_entries(default_config)
+        self._node = _compile_node(self._entries)
+        self._node_entries = {}  # cls -> entries over `cls` default nodes
+
+    def __reduce__(self):
+        # checkers are closures, recompile on the other side of the pickle
+        return type(self), (self.default_config,)
+
+    def extend(self, config, collect=False):
+        """
+        Fills `config` in place with the default values, like `Config.extend`
+
+        Args:
+            collect: report every problem at once instead of the first one
+
+        Returns:
+            `config`
+
+        Raises:
+            ConfigError if required placeholders are not satisfied,
+            `config` may then be partially filled, as with `Config.extend`.
+            ConfigErrors with all of them if `collect`.
+        """
+        assert isinstance(config, dict)
+        if not _extend_fast(config, self._node):
+            if not collect:
+                _extend_ordered(config, self._entries, [])
+            else:
+                errors = []
+                _extend_ordered(config, self._entries, [], errors)
+                if errors:
+                    raise ConfigErrors(errors)
+        return config
+
+    def extended(self, config, cls=None, collect=False):
+        """
+        Like `extend`, but returns a new `cls` node (default Config) and
+        leaves `config` and the default config untouched.
+
+        The root node is always new. Subtrees are shared, not copied:
+        defaults for missing keys, and sub-dicts of `config` that are
+        already `cls` nodes and lack no default. Only the nodes on paths
+        that combine both sides are rebuilt, so the cost is proportional
+        to the overlap, at least the number of top-level keys. Assign new
+        values rather than mutating nested nodes of the result in place.
+        """
+        assert isinstance(config, dict)
+        if cls is None:
+            cls = Config
+        entries = self._node_entries.get(cls)
+        if entries is None:
+            default_nodes = self.default_config
+            if not isinstance(default_nodes, cls):
+                default_nodes = _build_nodes(cls, default_nodes)
+            entries = self._node_entries[cls] = _compile_entries(default_nodes)
+        if not collect:
+            return _extend_pure(cls, config, entries, [])
+        errors = []
+        result = _extend_pure(cls, config, entries, [], errors)
+        if errors:
+            raise ConfigErrors(errors)
+        return result
+
+
+def compile_schema(default_config):
+    """
+    Returns:
+        ConfigSchema, to validate many configs against the same defaults
+    """
+    return ConfigSchema(default_config)
+
+
+# ==================== overrides ====================
+def _parse_yaml(text):
+    value = yaml.safe_load(text)
+    return text if value is None and text.strip() else value
+
+
+_TYPE_PARSERS = [
+    (bool, _parse_bool),
+    (int, int),
+    (float, float),
+    (str, str),
+]
+
+
+def _coerce(text, default_value, key_path):
+    """
+    Override string to the type the default config asks for. A string that
+    a placeholder cannot parse is kept as is, the validation then reports
+    it as a wrong type. Plain defaults are not validated, so a string that
+    cannot be converted to their type raises ConfigError right away.
+    """
+    default_type = None
+    if isinstance(default_value, str):
+        marker = _marker_of(default_value)
+        if marker is None:
+            return text
+        parse = marker.parse or _parse_yaml
+    else:
+        for default_type, parse in _TYPE_PARSERS:
+            if isinstance(default_value, default_type):
+                break
+        else:  # None, lists, dicts and keys without a default
+            default_type = None
+            parse = _parse_yaml
+    try:
+        return parse(text)
+    except (ValueError, yaml.YAMLError):
+        if default_type is None:
+            return text
+        raise ConfigError(
+            'override "{}={}" must be {}, like the default value {!r}'
+            .format('.'.join(map(str, key_path)), text,
+                    default_type.__name__, default_value))
+
+
+def _iter_argv(argv):
+    "(dotted_key, text) from `--a.b=1`, `--a.b 1` and bare `--flag` (true)"
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if not arg.startswith('--') or len(arg) == 2:
+            raise ConfigError('cannot parse command line override "{}", '
+                              'expected --key.path=value'.format(arg))
+        key, sep, text = arg[2:].partition('=')
+        if not sep:
+            if i + 1 < len(argv) and not argv[i + 1].startswith('--'):
+                i += 1
+                text = argv[i]
+            else:
+                text = 'true'
+        yield key.split('.'), text
+        i += 1
+
+
+def _iter_environ(environ, env_prefix):
+    "(key_path, text) from `PREFIX__A__B=1`"
+    prefix = env_prefix + '__'
+    for name, text in environ.items():
+        if name.startswith(prefix) and len(name) > len(prefix):
+            yield name[len(prefix):].split('__'), text
+
+
+def _apply_overrides(tree, overrides, default_config, ignore_case):
+    """
+    Sets all overrides into the plain dict `tree` in a single pass, each one
+    walks the tree and the default config once along its path
+    """
+    case_maps = {}  # id(default node) -> {lowered key: key}
+    for key_path, text in overrides:
+        node = tree
+        default_node = default_config
+        for depth, key in enumerate(key_path):
+            if ignore_case and isinstance(default_node, dict):
+                case_map = case_maps.get(id(default_node))
+                if case_map is None:
+                    case_map = {k.lower(): k for k in default_node
+                                if isinstance(k, str)}
+                    case_maps[id(default_node)] = case_map
+                key = case_map.get(key.lower(), key.lower())
+            if isinstance(default_node, dict):
+                default_node = dict.get(default_node, key)
+            else:
+                default_node = None
+            if depth == len(key_path) - 1:
+                node[key] = _coerce(text, default_node, key_path)
+                break
+            child = node.get(key)
+            if child is None:
+                child = node[key] = {}
+            elif not isinstance(child, dict):
+                raise ConfigError(
+                    'override "{}" conflicts with the value of key "{}"'
+                    .format('.'.join(key_path),
+                            '.'.join(key_path[:depth + 1])))
+            node = child
+    return tree
+
+
 class Config(BeneDict):
     def __getattr__(self, key):
-        try:
-            return super().__getattribute__(key)
-        except AttributeError:
-            raise ConfigError('config key "{}" missing.'.format(key))
+        # only called once the regular lookup has failed, no need to retry
+        raise ConfigKeyError(key)
 
-    def extend(self, default_config):
+    def extend(self, default_config, collect=False):
+        """
+        Args:
+            default_config: a dict or a ConfigSchema from `compile_schema`
+            collect: raise ConfigErrors with every problem in one pass
+                instead of a ConfigError at the first one
+        """
+        if isinstance(default_config, ConfigSchema):
+            return default_config.extend(self, collect=collect)
         assert isinstance(default_config, dict)
+        if collect:
+            return _fill_collect(self, default_config)
         return _fill_default_config(self, default_config, [])
 
+    def extended(self, default_config, collect=False):
+        """
+        Non-mutating `extend`: returns a new config that shares the untouched
+        subtrees of this config and of the default config.
+        See `ConfigSchema.extended`.
+        """
+        if not isinstance(default_config, ConfigSchema):
+            default_config = compile_schema(default_config)
+        return default_config.extended(self, type(self), collect=collect)
+
+    @classmethod
+    def from_overrides(cls, default_config, argv=None, env_prefix=None,
+                       environ=None, config=None, collect=False):
+        """
+        Builds a config from dotted overrides, then fills and validates it
+        against `default_config` like `extend`. The override strings are
+        converted to the type the default asks for: placeholders
+        (`_int_`, `_float_`, `_num_`, `_bool_`, `_str_`, `_enum[...]_`) or
+        the type of a plain default value, YAML for anything else.
+
+        Args:
+            default_config: a dict or a ConfigSchema
+            argv: e.g. sys.argv[1:], `--learner.lr=1e-3`, `--learner.lr 1e-3`
+                or a bare `--flag` for true. Pass the leftovers of
+                `argparse.parse_known_args` if the tool has its own flags.
+            env_prefix: reads `{env_prefix}__LEARNER__LR` from `environ`,
+                the key names are matched to the default config ignoring case
+            environ: defaults to os.environ
+            config: lowest layer, e.g. loaded from a file, is not modified
+            collect: as in `extend`
+
+        Returns:
+            Config, command line over environment over `config` over defaults
+
+        Raises:
+            ConfigError for unparsable arguments, overrides that cannot be
+            converted to the type of a plain default value, e.g. "64.0"
+            for 32, overrides of a sub-dict path under a singleton value,
+            and everything `extend` raises
+        """
+        if isinstance(default_config, ConfigSchema):
+            schema = default_config
+        else:
+            schema = compile_schema(default_config)
+        tree = benedict_to_dict(config) if config is not None else {}
+        if env_prefix is not None:
+            if environ is None:
+                environ = os.environ
+            _apply_overrides(tree, _iter_environ(environ, env_prefix),
+                             schema.default_config, ignore_case=True)
+        if argv is not None:
+            _apply_overrides(tree, _iter_argv(list(argv)),
+                             schema.default_config, ignore_case=False)
+        schema.extend(tree, collect=collect)
+        return _build_nodes(cls, tree)
 
-def extend_config(config, default_config):
+
+def extend_config(config, default_config, collect=False):
     """
     default_config must specify all the expected keys. Use the following special
     values for required placeholders:
@@ -160,13 +839,111 @@ def extend_config(config, default_config):
     * _req_DICT_: require a dict
     * _req_LIST_: require a list
 
+    `default_config` can also be a ConfigSchema from `compile_schema`.
+
     Returns:
         AttributeDict
         `config` filled by default values if certain keys are unspecified
 
     Raises:
         ConfigError if required placeholders are not satisfied
+        ConfigErrors if `collect`: every problem with its dotted key path in
+            `.errors`, found in a single traversal
     """
     assert isinstance(config, dict)
+    if isinstance(default_config, ConfigSchema):
+        return Config(default_config.extend(config, collect=collect))
     assert isinstance(default_config, dict)
+    if collect:
+        return Config(_fill_collect(config, default_config))
     return Config(_fill_default_config(config, default_config, []))
+
+
+def extended_config(config, default_config, collect=False):
+    """
+    `extend_config` without side effects: `config` and `default_config` are
+    left untouched and untouched subtrees are shared with the new Config.
+    Pass a ConfigSchema, and a `config` made of Config nodes, to make the
+    cost proportional to the keys both sides have in common.
+    See `ConfigSchema.extended`.
+
+    Returns:
+        new Config
+    """
+    assert isinstance(config, dict)
+    if not isinstance(default_config, ConfigSchema):
+        default_config = compile_schema(default_config)
+    return default_config.extended(config, Config, collect=collect)
+
+
+# ==================== batch extend ====================
+_worker_schema = None
+
+
+def _init_worker(schema):
+    global _worker_schema
+    _worker_schema = schema
+
+
+def _extend_chunk(configs, collect, schema=None):
+    """
+    Returns:
+        list of filled plain dicts or ConfigError instances
+    """
+    if schema is None:
+        schema = _worker_schema
+    results = []
+    for config in configs:
+        try:
+            results.append(schema.extend(config, collect=collect))
+        except ConfigError as e:
+            results.append(e)
+    return results
+
+
+def extend_configs(configs, default_config, workers=1, chunksize=None,
+                   collect=False, as_config=True):
+    """
+    `extend_config` over a batch of configs against one default config,
+    which is compiled once with `compile_schema`.
+
+    Args:
+        configs: iterable of dicts
+        default_config: a dict or a ConfigSchema
+        workers: number of processes, None for os.cpu_count(). With 1 the
+            batch is validated in this process.
+        chunksize: configs sent to a worker at a time, defaults to about
+            4 chunks per worker
+        collect: as in `extend_config`
+        as_config: False returns the filled plain dicts, building Config
+            nodes happens in this process and costs more than validating
+
+    Returns:
+        list in input order, with a Config for every valid config and the
+        ConfigError it raised for every invalid one.
+        Use the results: only `workers=1` fills the input dicts in place.
+    """
+    if not isinstance(default_config, ConfigSchema):
+        default_config = compile_schema(default_config)
+    configs = list(configs)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(configs))
+    if workers <= 1:
+        results = _extend_chunk(configs, collect, default_config)
+    else:
+        if chunksize is None:
+            chunksize = -(-len(configs) // (workers * 4))
+        chunks = [configs[i:i + chunksize]
+                  for i in range(0, len(configs), chunksize)]
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(default_config,)) as executor:
+            results = [result for chunk in executor.map(
+                _extend_chunk, chunks, [collect] * len(chunks))
+                for result in chunk]
+    if not as_config:
+        return results
+    # the filled dicts are either ours or fresh from a pickle, build the
+    # nodes without the copy that Config() makes
+    return [r if isinstance(r, ConfigError) else _build_nodes(Config, r)
+            for r in results]
@@ -7,7 +7,11 @@ but their original version will always be protected with prefix builtin_
 Adapted from: https://github.com/makinacorpus/EasyDict
 """
 import inspect
+import hashlib
+import operator
+import weakref
 import collections.abc as abc
+from collections import OrderedDict
 import benedict.data_format as df
 
 
@@ -204,54 +208,188 @@ class BeneDict(dict):
         if isinstance(name, str):  # support non-string keys
             super().__setattr__(name, value)
         super().__setitem__(name, value)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
 
     __setitem__ = __setattr__
 
+    # the builtin mutators, hooked to drop the cached fingerprints
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+
+    def __ior__(self, other):
+        dict.__ior__(self, other)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+        return self
+
+    def clear(self):
+        dict.clear(self)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+
+    def pop(self, *args):
+        value = dict.pop(self, *args)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+        return value
+
+    def popitem(self, *args):
+        item = dict.popitem(self, *args)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+        return item
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return dict.__getitem__(self, key)
+        value = dict.setdefault(self, key, default)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+        return value
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+
     def to_dict(self):
         """
         Convert to raw dict
         """
         return benedict_to_dict(self)
 
+    def fingerprint(self, algo='blake2b'):
+        """
+        Canonical digest of the content, e.g. to key result caches.
+        Independent of the key order and of how equal numbers are written
+        (1 or 1.0). See `benedict_fingerprint`.
+
+        Args:
+            algo: any hashlib algorithm
+        """
+        return benedict_fingerprint(self, algo)
+
     def deepcopy(self):
         return self.__class__(self)
 
+    @classmethod
+    def _from_pairs(cls, pairs):
+        """
+        Build a node from (key, value) pairs whose nested mappings are already
+        `cls` nodes, e.g. as the JSON `object_pairs_hook` or YAML mapping
+        constructor. Values are stored as-is instead of being converted
+        (and copied) again by `__setattr__`.
+        """
+        self = _new_node(cls, dict)
+        protected = cls._PROTECTED_METHODS
+        for k, v in pairs:
+            if k in protected:
+                raise ValueError('Cannot override `{}()`: {} protected method'
+                                 .format(k, cls.__name__))
+            if isinstance(k, str):
+                object.__setattr__(self, k, v)
+            dict.__setitem__(self, k, v)
+        return self
+
     @classmethod
     def load_json_file(cls, file_path, **loader_kwargs):
-        return cls(df.load_json_file(file_path, **loader_kwargs))
+        return _load_nodes(cls, df.load_json_file, file_path, loader_kwargs)
 
     @classmethod
     def load_json_str(cls, string, **loader_kwargs):
-        return cls(df.load_json_str(string, **loader_kwargs))
+        return _load_nodes(cls, df.load_json_str, string, loader_kwargs)
 
     @classmethod
     def load_yaml_file(cls, file_path, **loader_kwargs):
-        return cls(df.load_yaml_file(file_path, **loader_kwargs))
+        return _load_nodes(cls, df.load_yaml_file, file_path, loader_kwargs)
 
     @classmethod
     def load_yaml_str(cls, string, **loader_kwargs):
-        return cls(df.load_yaml_str(string, **loader_kwargs))
+        return _load_nodes(cls, df.load_yaml_str, string, loader_kwargs)
 
     @classmethod
     def load_file(cls, file_path, **loader_kwargs):
         """
         Args:
-            file_path: JSON or YAML loader depends on the file extension
+            file_path: loader depends on the file extension,
+                see `data_format.register_format`
+            cache: a LoadCache, or True for `data_format.default_load_cache`,
+                to memoize the parsed file until it changes on disk
+            select: only load the subtree at this path, e.g. "learner.optimizer",
+                JSON and YAML files skip everything else without building it
+
+        Raises:
+            IOError: if the extension is not registered
+            KeyError: if the `select` path does not exist
+        """
+        return _load_nodes(cls, df.load_file, file_path, loader_kwargs)
+
+    @classmethod
+    def load_many(cls, file_paths, *, workers=None, executor='thread',
+                  as_completed=False, chunksize=None, **loader_kwargs):
+        """
+        Loads many files in parallel, see `data_format.load_many`
+
+        Returns:
+            iterator of LoadResult(file_path, data, error)
 
         Raises:
-            IOError: if extension is not ".json", ".yml", or ".yaml"
+            IOError: if the extension of a file is not registered, on the
+                call. Missing files are reported in their LoadResult
         """
-        return cls(df.load_file(file_path, **loader_kwargs))
+        return _load_many_nodes(
+            cls, df.load_many, file_paths, workers, executor,
+            as_completed, chunksize, loader_kwargs
+        )
+
+    @classmethod
+    def iter_file(cls, file_path, *, batch_size=None, **loader_kwargs):
+        """
+        Yields one object per record of a ".jsonl" file or per document of a
+        multi-document YAML file, reading the file lazily.
+
+        Args:
+            file_path: JSON Lines, JSON or YAML loader depends on the extension
+            batch_size: if set, yield lists of up to `batch_size` objects instead
+
+        Raises:
+            IOError: if the extension has no registered streaming loader or the
+                file does not exist, on the call
+        """
+        return df._batched(
+            _iter_nodes(cls, df.iter_file, file_path, loader_kwargs),
+            batch_size
+        )
+
+    @classmethod
+    def dump_stream(cls, records, file_path, **dumper_kwargs):
+        """
+        Writes an iterable of dicts one at a time.
+
+        Args:
+            file_path: JSON Lines or YAML dumper depends on the file extension
+
+        Raises:
+            IOError: if the extension has no registered streaming dumper
+        """
+        return df.dump_stream(
+            map(benedict_to_dict, records), file_path, **dumper_kwargs)
 
     def dump_json_file(self, file_path, **dumper_kwargs):
-        df.dump_json_file(benedict_to_dict(self), file_path, **dumper_kwargs)
+        # the JSON dumpers convert dict subclasses themselves, fast backends
+        # like orjson serialize the nodes without any conversion
+        return df.dump_json_file(self, file_path, **dumper_kwargs)
 
     def dump_json_str(self, **dumper_kwargs):
         "Returns: string"
-        return df.dump_json_str(benedict_to_dict(self), **dumper_kwargs)
+        return df.dump_json_str(self, **dumper_kwargs)
 
     def dump_yaml_file(self, file_path, **dumper_kwargs):
-        df.dump_yaml_file(benedict_to_dict(self), file_path, **dumper_kwargs)
+        return df.dump_yaml_file(
+            benedict_to_dict(self), file_path, **dumper_kwargs)
 
     def dump_yaml_str(self, **dumper_kwargs):
         "Returns: string"
@@ -260,12 +398,49 @@ class BeneDict(dict):
     def dump_file(self, file_path, **dumper_kwargs):
         """
         Args:
-            file_path: JSON or YAML loader depends on the file extension
+            file_path: dumper depends on the file extension,
+                see `data_format.register_format`
 
         Raises:
-            IOError: if extension is not ".json", ".yml", or ".yaml"
+            IOError: if the extension is not registered
+        """
+        return df.dump_file(
+            benedict_to_dict(self), file_path, **dumper_kwargs)
+
+    @classmethod
+    async def aload_json_file(cls, file_path, **loader_kwargs):
+        return await df._run_async(
+            cls.load_json_file, file_path, **loader_kwargs)
+
+    @classmethod
+    async def aload_yaml_file(cls, file_path, **loader_kwargs):
+        return await df._run_async(
+            cls.load_yaml_file, file_path, **loader_kwargs)
+
+    @classmethod
+    async def aload_file(cls, file_path, **loader_kwargs):
+        """
+        Loads in an executor without blocking the event loop,
+        see `data_format.set_async_limit` for the concurrency cap
+        """
+        return await df._run_async(
+            cls.load_file, file_path, **loader_kwargs)
+
+    async def adump_json_file(self, file_path, **dumper_kwargs):
+        return await df._run_async(
+            self.dump_json_file, file_path, **dumper_kwargs)
+
+    async def adump_yaml_file(self, file_path, **dumper_kwargs):
+        return await df._run_async(
+            self.dump_yaml_file, file_path, **dumper_kwargs)
+
+    async def adump_file(self, file_path, **dumper_kwargs):
         """
-        df.dump_file(benedict_to_dict(self), file_path, **dumper_kwargs)
+        Dumps in an executor without blocking the event loop. Do not mutate
+        the object until the dump completes.
+        """
+        return await df._run_async(
+            self.dump_file, file_path, **dumper_kwargs)
 
     def __getstate__(self):
         """
@@ -285,16 +460,16 @@ class BeneDict(dict):
 
     # we explicitly list them here so that IDEs like PyCharm can do auto-complete
     # call _print_protected_methods() to generate this code
-    builtin_clear = dict.clear
+    builtin_clear = clear
     builtin_copy = dict.copy
     builtin_fromkeys = dict.fromkeys
     builtin_get = dict.get
     builtin_items = dict.items
     builtin_keys = dict.keys
-    builtin_pop = dict.pop
-    builtin_popitem = dict.popitem
-    builtin_setdefault = dict.setdefault
-    builtin_update = dict.update
+    builtin_pop = pop
+    builtin_popitem = popitem
+    builtin_setdefault = setdefault
+    builtin_update = update
     builtin_values = dict.values
     builtin_deepcopy = deepcopy
     builtin_dump_json_file = dump_json_file
@@ -302,12 +477,121 @@ class BeneDict(dict):
     builtin_dump_yaml_file = dump_yaml_file
     builtin_dump_yaml_str = dump_yaml_str
     builtin_dump_file = dump_file
+    builtin_dump_stream = dump_stream
+    builtin_iter_file = iter_file
+    builtin_load_many = load_many
     builtin_load_json_file = load_json_file
     builtin_load_json_str = load_json_str
     builtin_load_yaml_file = load_yaml_file
     builtin_load_yaml_str = load_yaml_str
     builtin_load_file = load_file
     builtin_to_dict = to_dict
+    builtin_fingerprint = fingerprint
+    builtin_aload_json_file = aload_json_file
+    builtin_aload_yaml_file = aload_yaml_file
+    builtin_aload_file = aload_file
+    builtin_adump_json_file = adump_json_file
+    builtin_adump_yaml_file = adump_yaml_file
+    builtin_adump_file = adump_file
+
+
+def _new_node(cls, base_type):
+    """
+    Empty instance of `cls` without re-running the builtin_ protection scan
+    in `__new__`, once the class has been set up by a first instantiation.
+    """
+    if '_PROTECTED_METHODS' in cls.__dict__:
+        return base_type.__new__(cls)
+    return cls()
+
+
+def _set_node_value(node, key, value):
+    """
+    `node[key] = value` for a value whose nested mappings are already
+    `type(node)` nodes, without `__setattr__` converting (and copying) it again
+    """
+    if key in type(node)._PROTECTED_METHODS:
+        raise ValueError('Cannot override `{}()`: {} protected method'
+                         .format(key, type(node).__name__))
+    if isinstance(key, str):
+        object.__setattr__(node, key, value)
+    if isinstance(node, OrderedDict):
+        OrderedDict.__setitem__(node, key, value)
+    else:
+        dict.__setitem__(node, key, value)
+    if _fingerprint_caches:
+        _fingerprint_changed(node)
+
+
+def _build_nodes(cls, value):
+    """
+    Convert already-parsed plain data to `cls` nodes bottom-up through
+    `cls._from_pairs`, much cheaper than `cls(data)`.
+    """
+    if isinstance(value, abc.Mapping):
+        return cls._from_pairs([(k, _build_nodes(cls, v))
+                                for k, v in value.items()])
+    elif isinstance(value, (list, tuple)):
+        return type(value)(_build_nodes(cls, x) for x in value)
+    else:
+        return value
+
+
+def _load_nodes(cls, load_method, source, loader_kwargs):
+    """
+    Single-pass load: the parser builds `cls` nodes directly through
+    `cls._from_pairs`, so the tree is not walked and copied a second time.
+    Falls back to wrapping the parsed result if the caller supplies
+    its own hook or loader, or loads through a cache of plain data.
+    """
+    if loader_kwargs.get('cache'):
+        return _build_nodes(cls, load_method(source, **loader_kwargs))
+    if any(hook in loader_kwargs for hook in
+           ['object_pairs_hook', 'object_hook', 'loader']):
+        return cls(load_method(source, **loader_kwargs))
+    data = load_method(source, object_pairs_hook=cls._from_pairs,
+                       **loader_kwargs)
+    if isinstance(data, cls):
+        return data
+    if loader_kwargs.get('select') is not None \
+            and not isinstance(data, abc.Mapping):
+        return data  # a selected list or scalar, its dicts are already nodes
+    return cls(data)
+
+
+def _load_many_nodes(cls, load_many_method, file_paths, workers, executor,
+                     as_completed, chunksize, loader_kwargs):
+    """
+    Threads build `cls` nodes while parsing. Process workers return plain
+    data, which pickles much faster than nodes, to be wrapped here.
+    """
+    if executor == 'thread':
+        file_paths = list(file_paths)
+        df._check_formats(file_paths, 'load')  # `cls.load_file` dispatches too
+        return load_many_method(
+            file_paths, workers=workers, executor=executor,
+            as_completed=as_completed, chunksize=chunksize,
+            loader=cls.load_file, **loader_kwargs
+        )
+    results = load_many_method(
+        file_paths, workers=workers, executor=executor,
+        as_completed=as_completed, chunksize=chunksize, **loader_kwargs
+    )
+    return (r if r.error else r._replace(data=_build_nodes(cls, r.data))
+            for r in results)
+
+
+def _iter_nodes(cls, iter_method, source, loader_kwargs):
+    """
+    Streaming counterpart of `_load_nodes`. Not a generator itself, so
+    `iter_method` reports a bad path or extension on the call.
+    """
+    if any(hook in loader_kwargs for hook in
+           ['object_pairs_hook', 'object_hook']):
+        return map(cls, iter_method(source, **loader_kwargs))
+    records = iter_method(source, object_pairs_hook=cls._from_pairs,
+                          **loader_kwargs)
+    return (data if isinstance(data, cls) else cls(data) for data in records)
 
 
 def benedict_to_dict(D, to_type=dict):
@@ -315,13 +599,14 @@ def benedict_to_dict(D, to_type=dict):
     Recursively convert back to builtin dict type
     """
     d = to_type()
-    for k, value in to_type.items(D):
+    items = to_type.items if isinstance(D, to_type) else dict.items
+    for k, value in items(D):
         if isinstance(value, abc.Mapping):
             d[k] = benedict_to_dict(value, to_type=to_type)
         elif isinstance(value, (list, tuple)):
             d[k] = type(value)(
                 benedict_to_dict(v, to_type=to_type)
-                if isinstance(v, BeneDict)
+                if isinstance(v, abc.Mapping)
                 else v for v in value
             )
         else:
@@ -329,5 +614,196 @@ def benedict_to_dict(D, to_type=dict):
     return d
 
 
+# ==================== fingerprint ====================
+_fingerprint_caches = {}  # id(node) -> _NodeCache, dropped with the node
+
+
+class _NodeCache:
+    """
+    Digests of one BeneDict or OrderedBeneDict node, kept outside of the node
+    so that no key can collide with them, and the ids of the nodes that
+    contain it. Dropped by a weakref callback when the node goes away.
+    """
+    __slots__ = ('ref', 'digests', 'parents')
+
+    def __init__(self, node):
+        self.ref = weakref.KeyedRef(node, _drop_cache, id(node))
+        self.digests = {}  # algo -> (token, watched containers)
+        self.parents = set()
+        _fingerprint_caches[self.ref.key] = self
+
+
+def _drop_cache(ref):
+    _fingerprint_caches.pop(ref.key, None)
+
+
+def _fingerprint_changed(node):
+    """
+    Called by the node mutators, behind a cheap `if _fingerprint_caches`:
+    drops the digests of `node` and of the nodes above it, up to the first
+    one that has none left.
+    """
+    cache = _fingerprint_caches.get(id(node))
+    if cache is None or not cache.digests:
+        return
+    cache.digests.clear()
+    pending = list(cache.parents)
+    while pending:
+        cache = _fingerprint_caches.get(pending.pop())
+        if cache is not None and cache.digests:
+            cache.digests.clear()
+            pending.extend(cache.parents)
+
+
+def _snapshot(container):
+    "the objects a list, set or plain dict holds, compared by identity"
+    if isinstance(container, OrderedDict):
+        return tuple(OrderedDict.keys(container)) \
+            + tuple(OrderedDict.values(container))
+    elif isinstance(container, dict):
+        return tuple(dict.keys(container)) + tuple(dict.values(container))
+    return tuple(container)
+
+
+def _unchanged(watched):
+    for container, snapshot in watched:
+        current = _snapshot(container)
+        if (len(current) != len(snapshot)
+                or not all(map(operator.is_, current, snapshot))):
+            return False
+    return True
+
+
+def _scalar_token(value):
+    if value is None or value is True or value is False:
+        return repr(value)
+    elif isinstance(value, int):
+        return repr(int(value))
+    elif isinstance(value, float):
+        if value.is_integer():  # 1.0 == 1
+            return repr(int(value))
+        return repr(float(value))
+    elif isinstance(value, str):
+        return repr(str(value))
+    elif isinstance(value, bytes):
+        return repr(bytes(value))
+    raise TypeError('cannot fingerprint {} value: {!r}'
+                    .format(type(value).__name__, value))
+
+
+_REPR_TYPES = frozenset([str, int, bool, bytes, type(None)])
+
+
+class _Fingerprint:
+    """
+    Encodes every value as a token: scalars by their repr, which quotes
+    strings and bytes, lists, tuples and sets inline, and dicts by the
+    digest of their "key:value" entries, sorted unless the dict is ordered.
+
+    BeneDict and OrderedBeneDict nodes cache their digest, the mutators
+    (`__setattr__`, `__delitem__`, `update()`, `pop()`...) drop it together
+    with the digests of the nodes above, so a clean subtree costs one lookup.
+    Lists, sets and plain dicts have no hooks: each digest also records the
+    ones under it with a snapshot of what they held, compared by identity
+    before the digest is reused.
+    """
+    def __init__(self, algo):
+        from benedict.ordered import OrderedBeneDict  # prevent cyclic import
+        self.algo = algo
+        constructor = getattr(hashlib, algo, None)
+        if not callable(constructor) or algo == 'new':
+            hashlib.new(algo)  # raises ValueError for unknown algorithms
+            constructor = lambda: hashlib.new(algo)
+        self.new = constructor
+        self.node_types = (BeneDict, OrderedBeneDict)
+
+    def token(self, value, watched, parent):
+        """
+        Args:
+            watched: collects (container, snapshot) for the lists, sets and
+                plain dicts under `value`
+            parent: id of the closest node above `value`, or None
+        """
+        t = type(value)
+        if t in _REPR_TYPES:
+            return repr(value)
+        elif t is float:
+            return _scalar_token(value)
+        elif isinstance(value, self.node_types):
+            return self.node(value, watched, parent)
+        elif isinstance(value, dict):
+            watched.append((value, _snapshot(value)))
+            return self.mapping(value, watched, parent)
+        elif isinstance(value, list):
+            watched.append((value, tuple(value)))
+            return '[{}]'.format(','.join(
+                [self.token(x, watched, parent) for x in value]))
+        elif isinstance(value, tuple):
+            return '({})'.format(','.join(
+                [self.token(x, watched, parent) for x in value]))
+        elif isinstance(value, (set, frozenset)):
+            if isinstance(value, set):
+                watched.append((value, tuple(value)))
+            return '{{{}}}'.format(','.join(
+                sorted(self.token(x, watched, parent) for x in value)))
+        return _scalar_token(value)
+
+    def mapping(self, mapping, watched, parent):
+        token = self.token
+        ordered = isinstance(mapping, OrderedDict)
+        entries = []
+        for k, v in (OrderedDict.items if ordered else dict.items)(mapping):
+            if type(k) in _REPR_TYPES and type(v) in _REPR_TYPES:
+                entries.append('%r:%r' % (k, v))
+            else:
+                entries.append(token(k, watched, parent) + ':'
+                               + token(v, watched, parent))
+        if not ordered:
+            entries.sort()
+        h = self.new()
+        h.update('{}{{{}}}'.format('o' if ordered else 'd', ','.join(entries))
+                 .encode('utf-8', 'surrogatepass'))
+        return '#' + h.hexdigest()
+
+    def node(self, node, watched, parent):
+        cache = _fingerprint_caches.get(id(node))
+        if cache is None:
+            cache = _NodeCache(node)
+        if parent is not None:
+            cache.parents.add(parent)
+        cached = cache.digests.get(self.algo)
+        if cached is None or not _unchanged(cached[1]):
+            own = []
+            cached = self.mapping(node, own, id(node)), own
+            cache.digests[self.algo] = cached
+        watched.extend(cached[1])
+        return cached[0]
+
+
+def benedict_fingerprint(D, algo='blake2b'):
+    """
+    Canonical content digest of a dict tree, computed without serializing it
+
+    - dicts and BeneDicts do not depend on the key order, OrderedDicts and
+      OrderedBeneDicts do
+    - equal numbers are equal (1 == 1.0), other types are distinguished,
+      e.g. lists from tuples and True from 1
+    - supports None, bool, int, float, str, bytes, lists, tuples, sets and
+      nested dicts, raises TypeError for anything else
+
+    BeneDict nodes cache the digest of their subtree until it is modified,
+    fingerprinting again after a small change only re-hashes the nodes on
+    the path to the change. Writes that bypass the node methods, e.g.
+    `dict.__setitem__(node, key, value)`, are not seen.
+
+    Returns:
+        hex digest
+    """
+    fingerprint = _Fingerprint(algo)
+    h = fingerprint.new()
+    h.update(fingerprint.token(D, [], None).encode('utf-8', 'surrogatepass'))
+    return h.hexdigest()
+
+
 if __name__ == '__main__':
     _Builtin.print_protected(dict)
\ No newline at end of file
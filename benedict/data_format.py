@@ -1,34 +1,684 @@
 """
 JSON, YAML, and python config file utilities
 """
+import io
+import os
+import re
+import bz2
+import errno
+import gzip
 import json
+import lzma
+import math
+import mmap
 import yaml
-from io import StringIO
+import pickle
+import marshal
+import asyncio
+import hashlib
+import weakref
+import tempfile
+import threading
+import contextlib
+from io import StringIO, BytesIO
 import os.path as path
-from collections import OrderedDict
-from functools import partial
+import concurrent.futures as futures
+from collections import OrderedDict, namedtuple
+from functools import partial, lru_cache
 
 
-def load_json_file(file_path, **kwargs):
+# ==================== file opening, compression ====================
+COMPRESSION_CODECS = {'.gz': gzip, '.bz2': bz2, '.xz': lzma}
+
+
+def _codec_file(codec, raw, mode, compresslevel):
+    writing = 'r' not in mode
+    if codec is gzip:
+        # no file name or timestamp in the header: identical data, identical file
+        return gzip.GzipFile(
+            filename='', mode=mode, fileobj=raw, mtime=0,
+            compresslevel=9 if compresslevel is None else compresslevel)
+    elif codec is bz2:
+        return bz2.BZ2File(
+            raw, mode, compresslevel=9 if compresslevel is None else compresslevel)
+    elif writing and compresslevel is not None:
+        return lzma.LZMAFile(raw, mode, preset=compresslevel)
+    else:
+        return lzma.LZMAFile(raw, mode)
+
+
+@contextlib.contextmanager
+def _open_file(file_path, mode='r', buffering=-1, compresslevel=None,
+               codec_path=None):
+    """
+    Opens a file, streaming it through the stdlib codec if the name ends in
+    ".gz", ".bz2" or ".xz", so the content is never (de)compressed in full.
+
+    Args:
+        compresslevel: when writing compressed files, codec default if None
+        codec_path: choose the codec from this name instead, e.g. for temp files
+    """
+    codec = COMPRESSION_CODECS.get(path.splitext(codec_path or file_path)[1])
+    if codec is None:
+        with open(file_path, mode, buffering=buffering) as fp:
+            yield fp
+        return
+    binary_mode = mode.replace('t', '').replace('b', '') + 'b'
+    with open(file_path, binary_mode, buffering=buffering) as raw:
+        with _codec_file(codec, raw, binary_mode, compresslevel) as fp:
+            if 'b' in mode:
+                yield fp
+            else:
+                with io.TextIOWrapper(fp) as text_fp:
+                    yield text_fp
+
+
+# ==================== file writing ====================
+WRITE_BUFFER_SIZE = 1 << 20
+DumpStats = namedtuple('DumpStats', ['bytes_written', 'bytes_skipped'])
+_dump_totals = [0, 0]
+_dump_totals_lock = threading.Lock()
+_umask = None
+_umask_lock = threading.Lock()
+
+
+def dump_stats():
+    """
+    Returns:
+        DumpStats(bytes_written, bytes_skipped) totals of all file dumps
+        since import or the last `reset_dump_stats()`
+    """
+    with _dump_totals_lock:
+        return DumpStats(*_dump_totals)
+
+
+def reset_dump_stats():
+    with _dump_totals_lock:
+        _dump_totals[:] = [0, 0]
+
+
+def _record_dump(stats):
+    with _dump_totals_lock:
+        _dump_totals[0] += stats.bytes_written
+        _dump_totals[1] += stats.bytes_skipped
+    return stats
+
+
+def _get_umask():
+    """
+    Read once on first use. `os.umask()` can only be read by setting it,
+    which would change it for every thread of the process in between.
+    """
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            with contextlib.suppress(OSError, ValueError):
+                with open('/proc/self/status') as fp:
+                    for line in fp:
+                        if line.startswith('Umask:'):
+                            _umask = int(line.split()[1], 8)
+        if _umask is None:
+            # no procfs: the mode a new file gets in a private directory
+            probe_dir = tempfile.mkdtemp()
+            try:
+                probe = path.join(probe_dir, 'probe')
+                os.close(os.open(probe, os.O_WRONLY | os.O_CREAT, 0o777))
+                _umask = 0o777 & ~os.stat(probe).st_mode
+                os.remove(probe)
+            finally:
+                os.rmdir(probe_dir)
+        return _umask
+
+
+def _content_digest(content):
+    return hashlib.blake2b(content).digest()
+
+
+def _file_digest(file_path):
+    """
+    digest of the decompressed bytes, so it is independent of the codec
+    but not of the encoding or line endings
+    """
+    digest = hashlib.blake2b()
+    with _open_file(file_path, 'rb') as fp:
+        for chunk in iter(partial(fp.read, WRITE_BUFFER_SIZE), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _fsync(file_path):
+    fd = os.open(file_path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_file(file_path, write, atomic=False, skip_unchanged=False,
+                buffering=WRITE_BUFFER_SIZE, binary=False, compresslevel=None):
+    """
+    Args:
+        write: writes the content to the file object it is given
+        atomic: write to a temp file in the same directory, then `os.replace`
+            it into place, so a crash never leaves a truncated file behind
+        skip_unchanged: render the content in memory first and leave the file
+            untouched if its content hash matches
+        buffering: write buffer size in bytes
+        binary: `write` expects a binary instead of a text file object
+        compresslevel: for ".gz", ".bz2" and ".xz" files, codec default if None
+
+    Returns:
+        DumpStats(bytes_written, bytes_skipped)
+    """
     file_path = path.expanduser(file_path)
-    with open(file_path, 'r') as fp:
-        return json.load(fp, **kwargs)
+    mode = 'wb' if binary else 'w'
+    if skip_unchanged:
+        stream = BytesIO()
+        if binary:
+            write(stream)
+        else:
+            # same encoding and newline translation as a text mode file
+            text_stream = io.TextIOWrapper(stream)
+            write(text_stream)
+            text_stream.flush()
+            text_stream.detach()
+        content = stream.getvalue()
+        if (path.isfile(file_path)
+                and _file_digest(file_path) == _content_digest(content)):
+            return _record_dump(DumpStats(0, path.getsize(file_path)))
+        mode = 'wb'
+        write = lambda fp: fp.write(content)
+    if not atomic:
+        with _open_file(file_path, mode, buffering, compresslevel) as fp:
+            write(fp)
+        return _record_dump(DumpStats(path.getsize(file_path), 0))
+    fd, temp_path = tempfile.mkstemp(
+        dir=path.dirname(path.abspath(file_path)),
+        prefix='.{}.'.format(path.basename(file_path)),
+        suffix='.tmp'
+    )
+    os.close(fd)
+    try:
+        with _open_file(temp_path, mode, buffering, compresslevel,
+                        codec_path=file_path) as fp:
+            write(fp)
+        _fsync(temp_path)
+        if path.exists(file_path):
+            os.chmod(temp_path, os.stat(file_path).st_mode)
+        else:
+            os.chmod(temp_path, 0o666 & ~_get_umask())
+        bytes_written = path.getsize(temp_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+    return _record_dump(DumpStats(bytes_written, 0))
+
+
+# ==================== JSON backends ====================
+JsonBackend = namedtuple('JsonBackend', ['name', 'loads', 'dumps', 'dump_options'])
+
+
+def _stdlib_json_backend():
+    return JsonBackend('json', json.loads, json.dumps, None)
+
+
+def _orjson_builtin(value):
+    if isinstance(value, OrderedDict):
+        return dict(OrderedDict.items(value))
+    elif isinstance(value, dict):
+        return dict.copy(value)
+    for base in (list, str, int, float):
+        if isinstance(value, base):
+            return base(value)
+    raise TypeError('Type is not JSON serializable: ' + type(value).__name__)
+
+
+def _has_non_finite(value):
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    elif isinstance(value, dict):
+        return any(map(_has_non_finite, dict.values(value)))
+    elif isinstance(value, (list, tuple)):
+        return any(map(_has_non_finite, value))
+    return False
+
+
+def _orjson_backend():
+    import orjson
+
+    def dumps(data, indent=None, sort_keys=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if isinstance(data, OrderedDict):
+            # orjson walks the dict storage, which ignores move_to_end()
+            encoded = orjson.dumps(
+                data, default=_orjson_builtin,
+                option=option | orjson.OPT_PASSTHROUGH_SUBCLASS)
+        else:
+            encoded = orjson.dumps(data, option=option)
+        if b'null' in encoded and _has_non_finite(data):
+            # orjson writes NaN and Infinity as null, the stdlib keeps them
+            raise ValueError('non-finite float')
+        return encoded.decode('utf-8')
+    return JsonBackend('orjson', orjson.loads, dumps,
+                       {'indent': [None, 2], 'sort_keys': [True, False]})
+
+
+def _rapidjson_backend():
+    import rapidjson
 
+    def dumps(data, indent=None, sort_keys=False, ensure_ascii=True):
+        return rapidjson.dumps(
+            data, indent=indent, sort_keys=sort_keys, ensure_ascii=ensure_ascii,
+            mapping_mode=rapidjson.MM_COERCE_KEYS_TO_STRINGS)
+    return JsonBackend('rapidjson', rapidjson.loads, dumps, {
+        'indent': [None] + list(range(1, 17)),
+        'sort_keys': [True, False],
+        'ensure_ascii': [True, False],
+    })
 
-def load_json_str(string, **kwargs):
+
+def _ujson_backend():
+    import ujson
+
+    def dumps(data, indent=None, sort_keys=False, ensure_ascii=True):
+        return ujson.dumps(
+            data, indent=indent or 0, sort_keys=sort_keys,
+            ensure_ascii=ensure_ascii, escape_forward_slashes=False)
+    return JsonBackend('ujson', ujson.loads, dumps, {
+        'indent': [None, 0] + list(range(1, 17)),
+        'sort_keys': [True, False],
+        'ensure_ascii': [True, False],
+    })
+
+
+# in order of preference for "auto"
+_JSON_BACKEND_FACTORIES = OrderedDict([
+    ('orjson', _orjson_backend),
+    ('rapidjson', _rapidjson_backend),
+    ('ujson', _ujson_backend),
+    ('json', _stdlib_json_backend),
+])
+_json_backend = None
+
+
+@lru_cache(maxsize=None)
+def _get_json_backend(name):
+    if name == 'auto':
+        for name in available_json_backends():
+            return _get_json_backend(name)
+    if name not in _JSON_BACKEND_FACTORIES:
+        raise ValueError('unknown JSON backend "{}", choose from {}'.format(
+            name, ['auto'] + list(_JSON_BACKEND_FACTORIES)))
+    try:
+        return _JSON_BACKEND_FACTORIES[name]()
+    except ImportError:
+        raise ValueError('JSON backend "{}" is not installed'.format(name))
+
+
+def available_json_backends():
+    "Returns: names of the installed JSON backends, in order of preference"
+    names = []
+    for name, factory in _JSON_BACKEND_FACTORIES.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def set_json_backend(name='auto'):
+    """
+    Selects the JSON library used by every JSON load/dump in this module,
+    a `json_backend=` argument overrides it per call. The default is the
+    stdlib "json", whose output stays byte-identical to `json.dumps`; fast
+    backends are opt-in.
+
+    Args:
+        name: "auto" (the fastest installed one), "orjson", "rapidjson",
+            "ujson" or "json" (stdlib)
+
+    Notes:
+      A fast backend is only used when it can honour the call's kwargs,
+      otherwise the stdlib `json` is used for that call:
+      - loads: no kwargs, so `object_pairs_hook` (ordered and BeneDict loads)
+        always goes through `json`
+      - orjson dumps: `indent` None or 2, `sort_keys`
+      - rapidjson, ujson dumps: `indent`, `sort_keys`, `ensure_ascii`
+      - `separators`, `allow_nan`, `default` and any other kwarg: `json`
+      Fast backends differ from `json` in whitespace and, unless
+      `ensure_ascii` is honoured, in escaping non-ASCII characters; the
+      decoded data is the same. Input a backend rejects, like integers over
+      64 bits, and trees with NaN or Infinity, which orjson would write as
+      null, fall back to `json`. Ordered dicts nested under a plain dict are
+      written by orjson in insertion order, ignoring move_to_end().
+    """
+    global _json_backend
+    _json_backend = _get_json_backend(name)
+
+
+def _select_json_backend(name, kwargs, dump):
+    "Returns: the fast backend that can honour `kwargs`, or None for stdlib"
+    backend = _json_backend if name is None else _get_json_backend(name)
+    if backend.name == 'json':
+        return None
+    if not dump:
+        return None if kwargs else backend
+    for key, value in kwargs.items():
+        if key not in backend.dump_options:
+            return None
+        if value not in backend.dump_options[key]:
+            return None
+    return backend
+
+
+def _to_builtin_dict(value):
+    "plain dicts all the way down, without calling overridable methods"
+    if isinstance(value, dict):
+        items = OrderedDict.items if isinstance(value, OrderedDict) else dict.items
+        return {k: _to_builtin_dict(v) for k, v in items(value)}
+    elif isinstance(value, (list, tuple)):
+        return type(value)(_to_builtin_dict(x) for x in value)
+    else:
+        return value
+
+
+def _json_loads(string, json_backend, kwargs):
+    backend = _select_json_backend(json_backend, kwargs, dump=False)
+    if backend is not None:
+        try:
+            return backend.loads(string)
+        except (ValueError, TypeError, OverflowError):
+            pass  # let the stdlib parse or report it
     return json.loads(string, **kwargs)
 
 
-def dump_json_file(data, file_path, **kwargs):
+def _json_dumps(data, json_backend, kwargs):
+    """
+    Fast backends serialize dict subclasses like BeneDict natively. The stdlib
+    would call their possibly overridden `items()`, so convert them first.
+    """
+    backend = _select_json_backend(json_backend, kwargs, dump=True)
+    if backend is not None:
+        try:
+            return backend.dumps(data, **kwargs)
+        except (ValueError, TypeError, OverflowError):
+            pass
+    if type(data) not in (dict, OrderedDict) and isinstance(data, dict):
+        data = _to_builtin_dict(data)
+    return json.dumps(data, **kwargs)
+
+
+set_json_backend('json')
+
+
+class _ChunkWriter:
+    "joins small chunks and writes them out once `chunk_size` is reached"
+    def __init__(self, fp, chunk_size, progress=None):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.chunks = []
+        self.size = 0
+        self.written = 0
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        if self.size >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.chunks:
+            self.fp.write(''.join(self.chunks))
+            self.chunks.clear()
+            self.written += self.size
+            self.size = 0
+            if self.progress is not None:
+                self.progress(self.written)
+
+
+def _encode_json(data, write, cls=None, **kwargs):
+    """
+    Passes the encoded JSON to `write` piece by piece. The output is the
+    same as `json.dump(data, fp, **kwargs)`, but mappings are walked in place
+    with `dict.items` / `OrderedDict.items`, so BeneDict trees need no plain
+    copy and extra memory is O(depth).
+    """
+    encoder = (cls or json.JSONEncoder)(**kwargs)
+    if type(encoder).iterencode is not json.JSONEncoder.iterencode:
+        for chunk in encoder.iterencode(data):
+            write(chunk)
+        return
+    if encoder.ensure_ascii:
+        encode_str = json.encoder.encode_basestring_ascii
+    else:
+        encode_str = json.encoder.encode_basestring
+    indent = encoder.indent
+    if indent is not None and not isinstance(indent, str):
+        indent = ' ' * indent
+    markers = {} if encoder.check_circular else None
+    item_separator = encoder.item_separator
+    key_separator = encoder.key_separator
+    allow_nan = encoder.allow_nan
+    int_str = int.__repr__
+    float_repr = float.__repr__
+    infinity = float('inf')
+
+    def float_str(value):
+        if value != value:
+            text = 'NaN'
+        elif value == infinity:
+            text = 'Infinity'
+        elif value == -infinity:
+            text = '-Infinity'
+        else:
+            return float_repr(value)
+        if not allow_nan:
+            raise ValueError(
+                'Out of range float values are not JSON compliant: '
+                + repr(value))
+        return text
+
+    def scalar(value):
+        "Returns: the encoded scalar, None for containers and other objects"
+        if isinstance(value, str):
+            return encode_str(value)
+        elif value is None:
+            return 'null'
+        elif value is True:
+            return 'true'
+        elif value is False:
+            return 'false'
+        elif isinstance(value, int):
+            return int_str(value)
+        elif isinstance(value, float):
+            return float_str(value)
+        return None
+
+    def key_str(key):
+        if isinstance(key, str):
+            return key
+        elif isinstance(key, float):
+            return float_str(key)
+        elif key is True:
+            return 'true'
+        elif key is False:
+            return 'false'
+        elif key is None:
+            return 'null'
+        elif isinstance(key, int):
+            return int_str(key)
+        elif encoder.skipkeys:
+            return None
+        raise TypeError('keys must be str, int, float, bool or None, not {}'
+                        .format(key.__class__.__name__))
+
+    def mark(value):
+        if markers is not None:
+            if id(value) in markers:
+                raise ValueError('Circular reference detected')
+            markers[id(value)] = value
+
+    def unmark(value):
+        if markers is not None:
+            del markers[id(value)]
+
+    def encode_items(open_, close, items, level, encode_item):
+        level += 1
+        if indent is not None:
+            newline_indent = '\n' + indent * level
+            separator = item_separator + newline_indent
+            write(open_ + newline_indent)
+        else:
+            newline_indent = None
+            separator = item_separator
+            write(open_)
+        first = True
+        for item in items:
+            if encode_item(item, separator, first, level):
+                first = False
+        if newline_indent is not None:
+            write('\n' + indent * (level - 1))
+        write(close)
+
+    def encode_element(value, separator, first, level):
+        text = scalar(value)
+        if text is None:
+            if not first:
+                write(separator)
+            encode(value, level)
+        else:
+            write(text if first else separator + text)
+        return True
+
+    def encode_member(item, separator, first, level):
+        key, value = item
+        key = key_str(key)
+        if key is None:
+            return False
+        text = scalar(value)
+        prefix = encode_str(key) + key_separator
+        if not first:
+            prefix = separator + prefix
+        if text is None:
+            write(prefix)
+            encode(value, level)
+        else:
+            write(prefix + text)
+        return True
+
+    def encode(value, level):
+        text = scalar(value)
+        if text is not None:
+            write(text)
+        elif isinstance(value, (list, tuple)):
+            if not value:
+                write('[]')
+                return
+            mark(value)
+            encode_items('[', ']', value, level, encode_element)
+            unmark(value)
+        elif isinstance(value, dict):
+            if not value:
+                write('{}')
+                return
+            mark(value)
+            if isinstance(value, OrderedDict):
+                items = OrderedDict.items(value)
+            else:
+                items = dict.items(value)
+            if encoder.sort_keys:
+                items = sorted(items)
+            encode_items('{', '}', items, level, encode_member)
+            unmark(value)
+        else:
+            mark(value)
+            encode(encoder.default(value), level)
+            unmark(value)
+
+    encode(data, 0)
+
+
+def load_json_file(file_path, *, json_backend=None, select=None, **kwargs):
+    """
+    Args:
+        json_backend: overrides the backend chosen by `set_json_backend`
+        select: only decode the subtree at this path, see `load_file`
+    """
     file_path = path.expanduser(file_path)
-    with open(file_path, 'w') as fp:
-        indent = kwargs.pop('indent', 4)
-        json.dump(data, fp, indent=indent, **kwargs)
+    if select is not None:
+        return _select_json_file(
+            file_path, _select_keys(select), json_backend, kwargs)
+    with _open_file(file_path, 'r') as fp:
+        if _select_json_backend(json_backend, kwargs, dump=False) is None:
+            return json.load(fp, **kwargs)
+        return _json_loads(fp.read(), json_backend, kwargs)
 
 
-def dump_json_str(data, **kwargs):
-    "Returns: string"
-    return json.dumps(data, **kwargs)
+def load_json_str(string, *, json_backend=None, **kwargs):
+    """
+    Args:
+        json_backend: overrides the backend chosen by `set_json_backend`
+    """
+    return _json_loads(string, json_backend, kwargs)
+
+
+def dump_json_file(data, file_path, *, atomic=False, skip_unchanged=False,
+                   buffering=WRITE_BUFFER_SIZE, compresslevel=None,
+                   json_backend=None, progress=None, **kwargs):
+    """
+    Unless a fast backend is used, the tree is encoded incrementally and
+    written in `buffering`-sized chunks, without a plain copy of the tree.
+    The output is the same as `json.dump` with the same kwargs.
+
+    Args:
+        json_backend: overrides the backend chosen by `set_json_backend`.
+            Fast backends encode the whole document in memory first,
+            use "json" to stream very large trees.
+        progress: progress(chars_written) is called after each chunk,
+            forces the streaming stdlib encoder
+        atomic: write to a temp file in the same directory, then `os.replace`
+            it into place, so a crash never leaves a truncated file behind
+        skip_unchanged: render the content in memory first and leave the file
+            untouched if its content hash matches
+        buffering: write buffer size in bytes
+        compresslevel: for ".gz", ".bz2" and ".xz" files, codec default if None
+
+    Returns:
+        DumpStats(bytes_written, bytes_skipped)
+    """
+    kwargs.setdefault('indent', 4)
+    backend = None
+    if progress is None:
+        backend = _select_json_backend(json_backend, kwargs, dump=True)
+
+    def write(fp):
+        if backend is not None:
+            fp.write(_json_dumps(data, json_backend, kwargs))
+            return
+        writer = _ChunkWriter(
+            fp, buffering if buffering > 0 else io.DEFAULT_BUFFER_SIZE, progress)
+        _encode_json(data, writer.write, **kwargs)
+        writer.flush()
+    return _write_file(file_path, write, atomic, skip_unchanged, buffering,
+                       compresslevel=compresslevel)
+
+
+def dump_json_str(data, *, json_backend=None, **kwargs):
+    """
+    Args:
+        json_backend: overrides the backend chosen by `set_json_backend`
+
+    Returns: string
+    """
+    return _json_dumps(data, json_backend, kwargs)
 
 
 ordered_load_json_file = partial(load_json_file, object_pairs_hook=OrderedDict)
@@ -37,28 +687,79 @@ ordered_dump_json_file = dump_json_file
 ordered_dump_json_str = dump_json_str
 
 
-def load_yaml_file(file_path, *, loader=yaml.safe_load, **kwargs):
+def _yaml_loader(loader, object_pairs_hook, kwargs):
+    """
+    `object_pairs_hook` works like its JSON counterpart: every mapping is built
+    by calling it with a list of (key, value) pairs.
+    """
+    if object_pairs_hook is None:
+        return loader
+    if loader is yaml.safe_load:
+        loader = _ordered_load_stream_yaml
+    kwargs['object_pairs_hook'] = object_pairs_hook
+    return loader
+
+
+def load_yaml_file(file_path, *, loader=yaml.safe_load,
+                   object_pairs_hook=None, sidecar=None, select=None, **kwargs):
+    """
+    Args:
+        sidecar: a SidecarCache, or True for `default_sidecar_cache`, to reuse
+            a pickled copy of the parsed file while it is unchanged.
+            None uses the cache set by `set_yaml_sidecar_cache`, False bypasses it.
+        select: only construct the subtree at this path, see `load_file`
+    """
     file_path = path.expanduser(file_path)
-    with open(file_path, 'r') as fp:
+    sidecar = _get_sidecar_cache(sidecar)
+    if sidecar is not None:
+        data = sidecar.load(file_path, _load_yaml_plain, loader=loader, **kwargs)
+        if select is not None:
+            data = _select_path(data, _select_keys(select))
+        if object_pairs_hook is not None:
+            data = _apply_pairs_hook(data, object_pairs_hook)
+        return data
+    loader = _yaml_loader(loader, object_pairs_hook, kwargs)
+    if select is not None:
+        return _select_yaml_file(file_path, _select_keys(select), loader, kwargs)
+    with _open_file(file_path, 'r') as fp:
         return loader(fp, **kwargs)
 
 
-def load_yaml_str(string, *, loader=yaml.safe_load, **kwargs):
+def _load_yaml_plain(file_path, loader, **kwargs):
+    "mappings keep the document order, so hooks can be applied afterwards"
+    with _open_file(file_path, 'r') as fp:
+        return loader(fp, **kwargs)
+
+
+def load_yaml_str(string, *, loader=yaml.safe_load,
+                  object_pairs_hook=None, **kwargs):
+    loader = _yaml_loader(loader, object_pairs_hook, kwargs)
     return loader(string, **kwargs)
 
 
-def dump_yaml_file(data, file_path, *, dumper=yaml.safe_dump, **kwargs):
-    file_path = path.expanduser(file_path)
+def dump_yaml_file(data, file_path, *, dumper=yaml.safe_dump,
+                   atomic=False, skip_unchanged=False,
+                   buffering=WRITE_BUFFER_SIZE, compresslevel=None, **kwargs):
+    """
+    Args:
+        atomic, skip_unchanged, buffering, compresslevel: see `dump_json_file`
+
+    Returns:
+        DumpStats(bytes_written, bytes_skipped)
+    """
     indent = kwargs.pop('indent', 2)
     default_flow_style = kwargs.pop('default_flow_style', False)
-    with open(file_path, 'w') as fp:
-        dumper(
+    return _write_file(
+        file_path,
+        lambda fp: dumper(
             data,
             stream=fp,
             indent=indent,
             default_flow_style=default_flow_style,
             **kwargs
-        )
+        ),
+        atomic, skip_unchanged, buffering, compresslevel=compresslevel
+    )
 
 
 def dump_yaml_str(data, *, dumper=yaml.safe_dump, **kwargs):
@@ -76,24 +777,58 @@ def dump_yaml_str(data, *, dumper=yaml.safe_dump, **kwargs):
     return stream.getvalue()
 
 
-def _ordered_load_stream_yaml(stream,
-                              Loader=yaml.SafeLoader,
-                              object_pairs_hook=OrderedDict):
+@lru_cache(maxsize=None)
+def _ordered_loader_class(Loader, object_pairs_hook):
     """
-    https://stackoverflow.com/questions/5121931/in-python-how-can-you-load-yaml-mappings-as-ordereddicts
+    Build the Loader subclass once per (Loader, object_pairs_hook) and reuse it,
+    instead of registering a fresh constructor on every load call.
     """
+    # node hooks get independent copies of aliased mappings and lists, like
+    # the nodes the tree used to be converted to, plain dicts share them
+    copy_aliases = object_pairs_hook not in (dict, OrderedDict)
+
     class OrderedLoader(Loader):
-        pass
+        if copy_aliases:
+            def construct_object(self, node, deep=False):
+                if node in self.constructed_objects:
+                    self.aliased = True
+                return super().construct_object(node, deep)
+
+            def construct_document(self, node):
+                self.aliased = False
+                data = super().construct_document(node)
+                if self.aliased:
+                    _copy_aliases(data, object_pairs_hook, set())
+                return data
     def _construct_mapping(loader, node):
         loader.flatten_mapping(node)
         return object_pairs_hook(loader.construct_pairs(node))
     OrderedLoader.add_constructor(
         yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
         _construct_mapping)
-    return yaml.load(stream, OrderedLoader)
+    return OrderedLoader
 
 
-def _ordered_dump_stream_yaml(data, stream=None, Dumper=yaml.Dumper, **kwargs):
+def _copy_aliases(value, object_pairs_hook, seen):
+    "replaces every repeated mapping or list in the tree by a copy, in place"
+    if isinstance(value, dict):
+        items = list(dict.items(value))
+    elif isinstance(value, list):
+        items = list(enumerate(value))
+    else:
+        return
+    for key, x in items:
+        if not isinstance(x, (dict, list)):
+            continue
+        if id(x) in seen:
+            value[key] = _apply_pairs_hook(x, object_pairs_hook)
+        else:
+            seen.add(id(x))
+            _copy_aliases(x, object_pairs_hook, seen)
+
+
+@lru_cache(maxsize=None)
+def _ordered_dumper_class(Dumper):
     class OrderedDumper(Dumper):
         pass
     def _dict_representer(dumper, data):
@@ -101,7 +836,20 @@ def _ordered_dump_stream_yaml(data, stream=None, Dumper=yaml.Dumper, **kwargs):
             yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
             data.items())
     OrderedDumper.add_representer(OrderedDict, _dict_representer)
-    return yaml.dump(data, stream, OrderedDumper, **kwargs)
+    return OrderedDumper
+
+
+def _ordered_load_stream_yaml(stream,
+                              Loader=yaml.SafeLoader,
+                              object_pairs_hook=OrderedDict):
+    """
+    https://stackoverflow.com/questions/5121931/in-python-how-can-you-load-yaml-mappings-as-ordereddicts
+    """
+    return yaml.load(stream, _ordered_loader_class(Loader, object_pairs_hook))
+
+
+def _ordered_dump_stream_yaml(data, stream=None, Dumper=yaml.Dumper, **kwargs):
+    return yaml.dump(data, stream, _ordered_dumper_class(Dumper), **kwargs)
 
 
 ordered_load_yaml_file = partial(load_yaml_file, loader=_ordered_load_stream_yaml)
@@ -110,79 +858,1174 @@ ordered_dump_yaml_file = partial(dump_yaml_file, dumper=_ordered_dump_stream_yam
 ordered_dump_yaml_str = partial(dump_yaml_str, dumper=_ordered_dump_stream_yaml)
 
 
-# ==================== auto-recognize extension ====================
-def _load_with_extension(file_path, json_method, yaml_method, kwargs):
-    if file_path.endswith('.json'):
-        return json_method(file_path, **kwargs)
-    elif file_path.endswith('.yml') or file_path.endswith('.yaml'):
-        return yaml_method(file_path, **kwargs)
+# ==================== partial loading ====================
+def _select_keys(select):
+    "'a.b.0' or ['a', 'b', 0] -> ['a', 'b', '0']"
+    if isinstance(select, str):
+        return select.split('.')
+    return [str(key) for key in select]
+
+
+def _select_error(keys, depth):
+    return KeyError('select "{}": no "{}" in "{}"'.format(
+        '.'.join(keys), keys[depth], '.'.join(keys[:depth])))
+
+
+def _select_path(data, keys):
+    "selects from loaded data, list indices are digit strings"
+    for depth, key in enumerate(keys):
+        try:
+            if isinstance(data, (list, tuple)):
+                data = data[int(key)]
+            else:
+                data = data[key]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise _select_error(keys, depth) from None
+    return data
+
+
+_JSON_WS = re.compile(rb'[ \t\n\r]*')
+_JSON_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+# up to the next bracket, or to a string containing brackets or escapes
+_JSON_NON_BRACKETS = re.compile(
+    rb'[^"\[\]{}]*(?:"[^"\\\[\]{}]*"[^"\[\]{}]*)*')
+_JSON_SCALAR = re.compile(rb'[^\s,:\[\]{}"]+')
+
+
+def _json_error(buf, pos, expected):
+    return ValueError('{} expected at byte {}, found {!r}'.format(
+        expected, pos, bytes(buf[pos:pos + 20])))
+
+
+def _json_value_end(buf, pos):
+    "skips the value at `pos` without decoding it, returns where it ends"
+    first = buf[pos:pos + 1]
+    if first == b'"':
+        match = _JSON_STRING.match(buf, pos)
+    elif first in (b'{', b'['):
+        depth = 0
+        while True:
+            pos = _JSON_NON_BRACKETS.match(buf, pos).end()
+            char = buf[pos:pos + 1]
+            if char == b'"':
+                match = _JSON_STRING.match(buf, pos)
+                if match is None:
+                    raise _json_error(buf, pos, 'string')
+                pos = match.end()
+                continue
+            elif char in (b'{', b'['):
+                depth += 1
+            elif char:
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            else:
+                raise _json_error(buf, pos, 'closing bracket')
+            pos += 1
+    else:
+        match = _JSON_SCALAR.match(buf, pos)
+    if match is None:
+        raise _json_error(buf, pos, 'value')
+    return match.end()
+
+
+def _json_member(buf, pos, key):
+    """
+    `pos` is at "{", returns the position of the value of the last `key`
+    member, like a full load keeps, None if there is no such member
+    """
+    found = None
+    pos = _JSON_WS.match(buf, pos + 1).end()
+    if buf[pos:pos + 1] == b'}':
+        return None
+    while True:
+        match = _JSON_STRING.match(buf, pos)
+        if match is None:
+            raise _json_error(buf, pos, 'member name')
+        name = match.group()
+        if b'\\' in name:
+            name = json.loads(name.decode('utf-8'))
+        else:
+            name = name[1:-1].decode('utf-8')
+        pos = _JSON_WS.match(buf, match.end()).end()
+        if buf[pos:pos + 1] != b':':
+            raise _json_error(buf, pos, '":"')
+        pos = _JSON_WS.match(buf, pos + 1).end()
+        if name == key:
+            found = pos
+        pos = _JSON_WS.match(buf, _json_value_end(buf, pos)).end()
+        separator = buf[pos:pos + 1]
+        if separator == b'}':
+            return found
+        elif separator != b',':
+            raise _json_error(buf, pos, '"," or "}"')
+        pos = _JSON_WS.match(buf, pos + 1).end()
+
+
+def _json_element(buf, pos, index):
+    "`pos` is at '[', returns the position of element `index` or None"
+    pos = _JSON_WS.match(buf, pos + 1).end()
+    if buf[pos:pos + 1] == b']':
+        return None
+    for _ in range(index):
+        pos = _JSON_WS.match(buf, _json_value_end(buf, pos)).end()
+        separator = buf[pos:pos + 1]
+        if separator == b']':
+            return None
+        elif separator != b',':
+            raise _json_error(buf, pos, '"," or "]"')
+        pos = _JSON_WS.match(buf, pos + 1).end()
+    return pos
+
+
+def _select_json_file(file_path, keys, json_backend, kwargs):
+    """
+    Scans the raw bytes to the selected value, jumping over unselected values
+    by matching their brackets, and only decodes that value. Uncompressed
+    files are memory-mapped, so the skipped parts are never copied.
+    If a key occurs more than once in an object, the last one is selected,
+    as in a full load, so the objects on the path are scanned to their end.
+    """
+    with contextlib.ExitStack() as stack:
+        fp = stack.enter_context(_open_file(file_path, 'rb'))
+        try:
+            if path.splitext(file_path)[1] in COMPRESSION_CODECS:
+                raise ValueError
+            buf = stack.enter_context(
+                mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ))
+        except (OSError, ValueError):
+            buf = fp.read()  # compressed or empty file
+        pos = 3 if buf[:3] == b'\xef\xbb\xbf' else 0  # UTF-8 BOM
+        pos = _JSON_WS.match(buf, pos).end()
+        for depth, key in enumerate(keys):
+            first = buf[pos:pos + 1]
+            if first == b'{':
+                pos = _json_member(buf, pos, key)
+            elif first == b'[' and key.isdigit():
+                pos = _json_element(buf, pos, int(key))
+            else:
+                pos = None
+            if pos is None:
+                raise _select_error(keys, depth)
+        end = _json_value_end(buf, pos)
+        return _json_loads(buf[pos:end].decode('utf-8'), json_backend, kwargs)
+
+
+class _YamlFullLoad(Exception):
+    "the selected node may depend on parts of the document that were skipped"
+
+
+def _yaml_skip_node(parser, events=None):
+    "consumes the events of the next node, appending them to `events` if given"
+    depth = 0
+    while True:
+        event = parser.get_event()
+        if events is not None:
+            events.append(event)
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return events
+
+
+def _yaml_select_events(loader, keys):
+    "the events of the selected node"
+    loader.get_event()  # StreamStart
+    if loader.check_event(yaml.StreamEndEvent):
+        raise _select_error(keys, 0)
+    loader.get_event()  # DocumentStart
+    return _yaml_select_in(loader, keys, 0)
+
+
+def _yaml_select_in(loader, keys, depth):
+    """
+    Selects `keys[depth:]` from the next node and consumes all of it, even
+    when that raises KeyError. Every occurrence of a repeated key is
+    selected from in turn, the last one wins as in a full load.
+    """
+    if depth == len(keys):
+        return _yaml_skip_node(loader, [])
+    key = keys[depth]
+    if loader.check_event(yaml.MappingStartEvent):
+        loader.get_event()
+        found = False
+        merges = False
+        while not loader.check_event(yaml.MappingEndEvent):
+            event = loader.peek_event()
+            if isinstance(event, yaml.ScalarEvent):
+                if event.value == key:
+                    loader.get_event()
+                    found = True
+                    try:
+                        events, error = \
+                            _yaml_select_in(loader, keys, depth + 1), None
+                    except KeyError as e:
+                        events, error = None, e
+                    continue
+                merges = merges or event.value == '<<'
+            _yaml_skip_node(loader)  # the key
+            _yaml_skip_node(loader)  # the value
+        loader.get_event()
+        if not found:
+            if merges:
+                raise _YamlFullLoad
+            raise _select_error(keys, depth)
+        if error is not None:
+            raise error
+        return events
+    elif loader.check_event(yaml.SequenceStartEvent) and key.isdigit():
+        loader.get_event()
+        for _ in range(int(key)):
+            if loader.check_event(yaml.SequenceEndEvent):
+                break
+            _yaml_skip_node(loader)
+        if loader.check_event(yaml.SequenceEndEvent):
+            loader.get_event()
+            raise _select_error(keys, depth)
+        try:
+            events, error = _yaml_select_in(loader, keys, depth + 1), None
+        except KeyError as e:
+            events, error = None, e
+        while not loader.check_event(yaml.SequenceEndEvent):
+            _yaml_skip_node(loader)
+        loader.get_event()
+        if error is not None:
+            raise error
+        return events
+    elif loader.check_event(yaml.AliasEvent):
+        raise _YamlFullLoad
+    _yaml_skip_node(loader)
+    raise _select_error(keys, depth)
+
+
+@lru_cache(maxsize=None)
+def _replay_loader_class(Loader):
+    "`Loader` that composes a recorded list of events instead of a stream"
+    class ReplayLoader(Loader):
+        def __init__(self, events):
+            super().__init__('')
+            self.replay_events = events[::-1]
+
+        def check_event(self, *choices):
+            if not self.replay_events:
+                return False
+            return not choices or isinstance(self.replay_events[-1], choices)
+
+        def peek_event(self):
+            return self.replay_events[-1]
+
+        def get_event(self):
+            return self.replay_events.pop()
+    return ReplayLoader
+
+
+def _select_yaml_file(file_path, keys, loader, kwargs):
+    """
+    Walks the parser events to the selected node, skipping everything else
+    without composing it, then composes and constructs only that node.
+    The events come from libyaml when available.
+    Falls back to a full load when the path goes through a merge key or an
+    alias, or the node refers to an anchor outside of it.
+    If a key occurs more than once in a mapping, the last one is selected,
+    as in a full load, so the mappings on the path are parsed to their end.
+    """
+    if loader is yaml.safe_load and not kwargs:
+        Loader = yaml.SafeLoader
+    elif loader is _ordered_load_stream_yaml:
+        Loader = _ordered_loader_class(
+            kwargs.get('Loader', yaml.SafeLoader),
+            kwargs.get('object_pairs_hook', OrderedDict))
     else:
-        raise IOError(
-            'unknown file extension: "{}", loader supports only ".json", ".yml", ".yaml"'
-            .format(file_path)
-        )
+        Loader = None  # a custom loader function, can only load it all
+    if Loader is not None and issubclass(Loader, yaml.composer.Composer):
+        with _open_file(file_path, 'r') as fp:
+            if yaml.__with_libyaml__:
+                parser = yaml.CBaseLoader(fp)
+            else:
+                parser = yaml.BaseLoader(fp)
+            try:
+                events = _yaml_select_events(parser, keys)
+            except _YamlFullLoad:
+                events = None
+            finally:
+                parser.dispose()
+        if events is not None:
+            replay = _replay_loader_class(Loader)(events)
+            try:
+                return replay.construct_document(replay.compose_node(None, None))
+            except yaml.composer.ComposerError:
+                pass  # an alias to an anchor outside of the node
+            finally:
+                replay.dispose()
+    with _open_file(file_path, 'r') as fp:
+        return _select_path(loader(fp, **kwargs), keys)
 
 
-def load_file(file_path, **loader_kwargs):
+# ==================== streaming: JSON Lines, multi-document YAML ====================
+def _batched(records, batch_size):
+    if not batch_size:
+        yield from records
+        return
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_jsonl(file_path, *, batch_size=None, json_backend=None, **kwargs):
     """
+    Yields one record per non-blank line of a JSON Lines file, reading the
+    file lazily so memory stays bounded by a single record (or batch).
+
     Args:
-        file_path: JSON or YAML loader depends on the file extension
+        batch_size: if set, yield lists of up to `batch_size` records instead
+        json_backend: overrides the backend chosen by `set_json_backend`
+    """
+    file_path = path.expanduser(file_path)
+    with _open_file(file_path, 'r') as fp:
+        records = (_json_loads(line, json_backend, kwargs)
+                   for line in fp if line.strip())
+        yield from _batched(records, batch_size)
 
-    Raises:
-        IOError: if extension is not ".json", ".yml", or ".yaml"
+
+def iter_yaml_documents(file_path, *, batch_size=None,
+                        Loader=yaml.SafeLoader, object_pairs_hook=None):
+    """
+    Yields the documents of a multi-document ("---" separated) YAML file one
+    at a time. PyYAML parses the stream lazily, document by document.
+
+    Args:
+        batch_size: if set, yield lists of up to `batch_size` documents instead
+    """
+    file_path = path.expanduser(file_path)
+    if object_pairs_hook is not None:
+        Loader = _ordered_loader_class(Loader, object_pairs_hook)
+    with _open_file(file_path, 'r') as fp:
+        yield from _batched(yaml.load_all(fp, Loader), batch_size)
+
+
+def dump_jsonl_file(records, file_path, *, atomic=False,
+                    buffering=WRITE_BUFFER_SIZE, compresslevel=None,
+                    json_backend=None, **kwargs):
+    """
+    Writes an iterable of records, one JSON document per line.
+    Records are encoded and written one by one.
+
+    Args:
+        atomic, buffering, compresslevel, json_backend: see `dump_json_file`
+
+    Returns:
+        DumpStats(bytes_written, bytes_skipped)
     """
-    return _load_with_extension(
-        file_path, load_json_file, load_yaml_file, loader_kwargs
+    def write(fp):
+        for record in records:
+            fp.write(_json_dumps(record, json_backend, kwargs))
+            fp.write('\n')
+    return _write_file(file_path, write, atomic, False, buffering,
+                       compresslevel=compresslevel)
+
+
+def dump_yaml_documents_file(records, file_path, *, dumper=yaml.safe_dump,
+                             atomic=False, buffering=WRITE_BUFFER_SIZE,
+                             compresslevel=None, **kwargs):
+    """
+    Writes an iterable of records as a multi-document YAML stream.
+    Records are encoded and written one by one.
+
+    Args:
+        atomic, buffering, compresslevel: see `dump_json_file`
+
+    Returns:
+        DumpStats(bytes_written, bytes_skipped)
+    """
+    indent = kwargs.pop('indent', 2)
+    default_flow_style = kwargs.pop('default_flow_style', False)
+    def write(fp):
+        for record in records:
+            dumper(
+                record,
+                stream=fp,
+                indent=indent,
+                default_flow_style=default_flow_style,
+                explicit_start=True,
+                **kwargs
+            )
+    return _write_file(file_path, write, atomic, False, buffering,
+                       compresslevel=compresslevel)
+
+
+ordered_iter_jsonl = partial(iter_jsonl, object_pairs_hook=OrderedDict)
+ordered_iter_yaml_documents = partial(
+    iter_yaml_documents, object_pairs_hook=OrderedDict)
+ordered_dump_jsonl_file = dump_jsonl_file
+ordered_dump_yaml_documents_file = partial(
+    dump_yaml_documents_file, dumper=_ordered_dump_stream_yaml)
+
+
+# ==================== binary formats: pickle, marshal ====================
+def _apply_pairs_hook(value, object_pairs_hook):
+    "rebuild every mapping bottom-up through `object_pairs_hook`"
+    if isinstance(value, dict):
+        return object_pairs_hook(
+            [(k, _apply_pairs_hook(v, object_pairs_hook))
+             for k, v in value.items()])
+    elif isinstance(value, (list, tuple)):
+        return type(value)(
+            _apply_pairs_hook(x, object_pairs_hook) for x in value)
+    else:
+        return value
+
+
+def load_pickle_file(file_path, *, object_pairs_hook=None, **kwargs):
+    """
+    Warning:
+      only load pickle files you trust, unpickling can execute arbitrary code
+    """
+    file_path = path.expanduser(file_path)
+    with _open_file(file_path, 'rb') as fp:
+        data = pickle.load(fp, **kwargs)
+    if object_pairs_hook is not None:
+        data = _apply_pairs_hook(data, object_pairs_hook)
+    return data
+
+
+def dump_pickle_file(data, file_path, *, atomic=False, skip_unchanged=False,
+                     buffering=WRITE_BUFFER_SIZE, compresslevel=None, **kwargs):
+    """
+    Args:
+        atomic, skip_unchanged, buffering, compresslevel: see `dump_json_file`
+
+    Returns:
+        DumpStats(bytes_written, bytes_skipped)
+    """
+    protocol = kwargs.pop('protocol', pickle.HIGHEST_PROTOCOL)
+    return _write_file(
+        file_path,
+        lambda fp: pickle.dump(data, fp, protocol=protocol, **kwargs),
+        atomic, skip_unchanged, buffering, binary=True,
+        compresslevel=compresslevel
     )
 
 
-def ordered_load_file(file_path, **loader_kwargs):
+def load_marshal_file(file_path, *, object_pairs_hook=None):
+    """
+    Loads a file written by `dump_marshal_file`. The marshal format is tied
+    to the Python version, use it for caches rather than for exchange.
+    """
+    file_path = path.expanduser(file_path)
+    with _open_file(file_path, 'rb') as fp:
+        data = marshal.load(fp)
+    if object_pairs_hook is not None:
+        data = _apply_pairs_hook(data, object_pairs_hook)
+    return data
+
+
+def dump_marshal_file(data, file_path, *, atomic=False, skip_unchanged=False,
+                      buffering=WRITE_BUFFER_SIZE, compresslevel=None):
     """
     Args:
-        file_path: JSON or YAML loader depends on the file extension
+        atomic, skip_unchanged, buffering, compresslevel: see `dump_json_file`
+
+    Returns:
+        DumpStats(bytes_written, bytes_skipped)
+    """
+    data = _to_builtin_dict(data)  # marshal only handles exact builtin types
+    return _write_file(
+        file_path, lambda fp: marshal.dump(data, fp),
+        atomic, skip_unchanged, buffering, binary=True,
+        compresslevel=compresslevel
+    )
+
+
+ordered_load_pickle_file = partial(load_pickle_file,
+                                   object_pairs_hook=OrderedDict)
+ordered_dump_pickle_file = dump_pickle_file
+ordered_load_marshal_file = partial(load_marshal_file,
+                                    object_pairs_hook=OrderedDict)
+ordered_dump_marshal_file = dump_marshal_file
+
+
+# ==================== auto-recognize extension ====================
+FileFormat = namedtuple('FileFormat', [
+    'load', 'dump', 'ordered_load', 'ordered_dump',
+    'iter', 'ordered_iter', 'dump_stream', 'ordered_dump_stream', 'select'
+])
+_formats = {}  # extension -> FileFormat
+
+
+def register_format(extensions, *, load=None, dump=None,
+                    ordered_load=None, ordered_dump=None,
+                    iter=None, ordered_iter=None,
+                    dump_stream=None, ordered_dump_stream=None, select=False):
+    """
+    Registers the methods used by `load_file`, `dump_file`, `iter_file`,
+    `dump_stream` and their ordered_ versions for the given extensions.
+    Compound extensions like ".json.gz" take precedence over ".gz".
+    Compressed files such as ".json.gz" are handled by the ".json" methods
+    unless registered explicitly.
+
+    Args:
+        extensions: a file extension with the leading dot, or a list of them
+        load: load(file_path, **kwargs), must accept `object_pairs_hook`
+        dump: dump(data, file_path, **kwargs)
+        ordered_load: defaults to `load` with object_pairs_hook=OrderedDict
+        ordered_dump: defaults to `dump`
+        iter: iter(file_path, batch_size=None, **kwargs) yields records,
+            must accept `object_pairs_hook`
+        ordered_iter: defaults to `iter` with object_pairs_hook=OrderedDict
+        dump_stream: dump_stream(records, file_path, **kwargs)
+        ordered_dump_stream: defaults to `dump_stream`
+        select: True if `load` accepts `select=` and only parses that subtree,
+            otherwise `load_file(select=...)` loads the whole file first
+    """
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    if ordered_load is None and load is not None:
+        ordered_load = partial(load, object_pairs_hook=OrderedDict)
+    if ordered_iter is None and iter is not None:
+        ordered_iter = partial(iter, object_pairs_hook=OrderedDict)
+    file_format = FileFormat(
+        load=load,
+        dump=dump,
+        ordered_load=ordered_load,
+        ordered_dump=ordered_dump or dump,
+        iter=iter,
+        ordered_iter=ordered_iter,
+        dump_stream=dump_stream,
+        ordered_dump_stream=ordered_dump_stream or dump_stream,
+        select=select,
+    )
+    for extension in extensions:
+        assert extension.startswith('.'), \
+            'extension "{}" must start with "."'.format(extension)
+        _formats[extension] = file_format
+
+
+def unregister_format(extensions):
+    """
+    Removes the formats registered for the given extensions, unknown
+    extensions are ignored
+
+    Returns:
+        dict extension -> removed FileFormat
+    """
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    return {extension: _formats.pop(extension) for extension in extensions
+            if extension in _formats}
+
+
+def _format_method(file_path, method_name):
+    """
+    Looks up each suffix of the file name, longest first, in the registry.
+    Compressed files fall back to the extension before ".gz", ".bz2" or ".xz".
 
     Raises:
-        IOError: if extension is not ".json", ".yml", or ".yaml"
+        IOError: if no registered extension supports `method_name`
     """
-    return _load_with_extension(
-        file_path, ordered_load_json_file, ordered_load_yaml_file, loader_kwargs
+    name = path.basename(file_path)
+    names = [name]
+    stem, extension = path.splitext(name)
+    if extension in COMPRESSION_CODECS:
+        names.append(stem)  # "x.json.gz" is read by the ".json" methods
+    for name in names:
+        start = name.find('.')
+        while start != -1:
+            file_format = _formats.get(name[start:])
+            if file_format is not None:
+                method = getattr(file_format, method_name)
+                if method is not None:
+                    return method
+            start = name.find('.', start + 1)
+    supported = sorted(extension for extension, file_format in _formats.items()
+                       if getattr(file_format, method_name) is not None)
+    raise IOError(
+        'unknown file extension: "{}", {} supports only {}'.format(
+            file_path, method_name,
+            ', '.join('"{}"'.format(ext) for ext in supported))
     )
 
 
-def _dump_with_extension(data, file_path, json_method, yaml_method, kwargs):
-    if file_path.endswith('.json'):
-        return json_method(data, file_path, **kwargs)
-    elif file_path.endswith('.yml') or file_path.endswith('.yaml'):
-        return yaml_method(data, file_path, **kwargs)
-    else:
-        raise IOError(
-            'unknown file extension: "{}", dumper supports only ".json", ".yml", ".yaml"'
-            .format(file_path)
-        )
+def _iter_json_document(file_path, *, batch_size=None, **kwargs):
+    "a plain JSON file streams as a single record"
+    yield from _batched(iter([load_json_file(file_path, **kwargs)]), batch_size)
+
+
+register_format(
+    '.json',
+    load=load_json_file,
+    dump=dump_json_file,
+    ordered_load=ordered_load_json_file,
+    ordered_dump=ordered_dump_json_file,
+    iter=_iter_json_document,
+    select=True,
+)
+register_format(
+    ['.yml', '.yaml'],
+    load=load_yaml_file,
+    dump=dump_yaml_file,
+    ordered_load=ordered_load_yaml_file,
+    ordered_dump=ordered_dump_yaml_file,
+    iter=iter_yaml_documents,
+    ordered_iter=ordered_iter_yaml_documents,
+    dump_stream=dump_yaml_documents_file,
+    ordered_dump_stream=ordered_dump_yaml_documents_file,
+    select=True,
+)
+register_format(
+    '.jsonl',
+    iter=iter_jsonl,
+    ordered_iter=ordered_iter_jsonl,
+    dump_stream=dump_jsonl_file,
+)
+register_format(
+    ['.pkl', '.pickle'],
+    load=load_pickle_file,
+    dump=dump_pickle_file,
+)
+register_format(
+    '.marshal',
+    load=load_marshal_file,
+    dump=dump_marshal_file,
+)
+
+
+def _load_format(file_path, method_name, select, loader_kwargs):
+    load = _format_method(file_path, method_name)
+    if select is None:
+        return load(file_path, **loader_kwargs)
+    if _format_method(file_path, 'select'):
+        return load(file_path, select=select, **loader_kwargs)
+    return _select_path(load(file_path, **loader_kwargs), _select_keys(select))
+
+
+def load_file(file_path, *, cache=None, select=None, **loader_kwargs):
+    """
+    Args:
+        file_path: loader depends on the file extension, see `register_format`
+        cache: a LoadCache, or True for `default_load_cache`, to memoize the
+            parsed file until it changes on disk
+        select: only load the subtree at this path, e.g. "learner.optimizer"
+            or ['learner', 'optimizer'], digits index into lists.
+            JSON and YAML files skip everything else without building it.
+
+    Raises:
+        IOError: if the extension is not registered
+        KeyError: if the `select` path does not exist
+    """
+    if cache:
+        return _get_load_cache(cache).load(
+            file_path, load_file, select=select, **loader_kwargs)
+    return _load_format(file_path, 'load', select, loader_kwargs)
+
+
+def ordered_load_file(file_path, *, cache=None, select=None, **loader_kwargs):
+    """
+    Args:
+        file_path: loader depends on the file extension, see `register_format`
+        cache: a LoadCache, or True for `default_load_cache`, to memoize the
+            parsed file until it changes on disk
+        select: only load the subtree at this path, see `load_file`
+
+    Raises:
+        IOError: if the extension is not registered
+        KeyError: if the `select` path does not exist
+    """
+    if cache:
+        return _get_load_cache(cache).load(
+            file_path, ordered_load_file, select=select, **loader_kwargs)
+    return _load_format(file_path, 'ordered_load', select, loader_kwargs)
 
 
 def dump_file(data, file_path, **dumper_kwargs):
     """
     Args:
-        file_path: JSON or YAML loader depends on the file extension
+        file_path: dumper depends on the file extension, see `register_format`
 
     Raises:
-        IOError: if extension is not ".json", ".yml", or ".yaml"
+        IOError: if the extension is not registered
     """
-    return _dump_with_extension(
-        data, file_path, dump_json_file, dump_yaml_file, dumper_kwargs
-    )
+    return _format_method(file_path, 'dump')(data, file_path, **dumper_kwargs)
 
 
 def ordered_dump_file(data, file_path, **dumper_kwargs):
     """
     Args:
-        file_path: JSON or YAML loader depends on the file extension
+        file_path: dumper depends on the file extension, see `register_format`
 
     Raises:
-        IOError: if extension is not ".json", ".yml", or ".yaml"
+        IOError: if the extension is not registered
     """
-    return _dump_with_extension(
-        data, file_path, ordered_dump_json_file, ordered_dump_yaml_file, dumper_kwargs
-    )
+    return _format_method(file_path, 'ordered_dump')(
+        data, file_path, **dumper_kwargs)
+
+
+def _check_file(file_path):
+    """
+    Raises:
+        FileNotFoundError: if `file_path` is not a file, for the lazy loaders
+            to fail on the call rather than on the first record
+    """
+    if not path.isfile(path.expanduser(file_path)):
+        raise FileNotFoundError(
+            errno.ENOENT, os.strerror(errno.ENOENT), file_path)
+
+
+def iter_file(file_path, **loader_kwargs):
+    """
+    Yields records from a ".jsonl" file, documents from a multi-document YAML
+    file, or the single document of a ".json" file.
+
+    Args:
+        batch_size: if set, yield lists of up to `batch_size` records instead
+
+    Raises:
+        IOError: if the extension has no registered streaming loader or the
+            file does not exist, on the call
+    """
+    method = _format_method(file_path, 'iter')
+    _check_file(file_path)
+    return method(file_path, **loader_kwargs)
+
+
+def ordered_iter_file(file_path, **loader_kwargs):
+    """
+    Yields records from a ".jsonl" file, documents from a multi-document YAML
+    file, or the single document of a ".json" file.
+
+    Args:
+        batch_size: if set, yield lists of up to `batch_size` records instead
+
+    Raises:
+        IOError: if the extension has no registered streaming loader or the
+            file does not exist, on the call
+    """
+    method = _format_method(file_path, 'ordered_iter')
+    _check_file(file_path)
+    return method(file_path, **loader_kwargs)
+
+
+def dump_stream(records, file_path, **dumper_kwargs):
+    """
+    Writes an iterable of records as JSON Lines or multi-document YAML,
+    one record at a time.
+
+    Raises:
+        IOError: if the extension has no registered streaming dumper
+    """
+    return _format_method(file_path, 'dump_stream')(
+        records, file_path, **dumper_kwargs)
+
+
+def ordered_dump_stream(records, file_path, **dumper_kwargs):
+    """
+    Writes an iterable of records as JSON Lines or multi-document YAML,
+    one record at a time.
+
+    Raises:
+        IOError: if the extension has no registered streaming dumper
+    """
+    return _format_method(file_path, 'ordered_dump_stream')(
+        records, file_path, **dumper_kwargs)
+
+
+# ==================== parallel bulk loading ====================
+LoadResult = namedtuple('LoadResult', ['file_path', 'data', 'error'])
+
+
+def _load_chunk(load_method, file_paths, loader_kwargs):
+    results = []
+    for file_path in file_paths:
+        try:
+            data = load_method(file_path, **loader_kwargs)
+            results.append(LoadResult(file_path, data, None))
+        except Exception as e:
+            results.append(LoadResult(file_path, None, e))
+    return results
+
+
+_executors = {
+    'thread': futures.ThreadPoolExecutor,
+    'process': futures.ProcessPoolExecutor,
+}
+
+
+def _check_formats(file_paths, method_name):
+    """
+    Raises:
+        IOError: for the first file whose extension is not registered for
+            `method_name`
+    """
+    for file_path in file_paths:
+        _format_method(file_path, method_name)
+
+
+def load_many(file_paths, *, workers=None, executor='thread',
+              as_completed=False, chunksize=None, loader=load_file,
+              **loader_kwargs):
+    """
+    Loads many files in parallel. A file that is missing or fails to parse
+    does not abort the batch, its exception is reported in the result
+    instead.
+
+    Args:
+        file_paths: files to load, each dispatched on its extension by `loader`
+        workers: pool size, defaults to the number of CPUs
+        executor: "thread" or "process". PyYAML and the JSON hooks hold the
+            GIL, so only "process" scales parsing across cores
+        as_completed: yield results as soon as they are loaded instead of in
+            the order of `file_paths`
+        chunksize: number of files handed to a worker at a time,
+            defaults to spreading the files in 4 chunks per worker
+        loader: load method, must be picklable for the "process" executor
+
+    Returns:
+        iterator of LoadResult(file_path, data, error), `error` is None or the
+        exception raised while loading `file_path`
+
+    Raises:
+        ValueError: if `executor` is unknown
+        IOError: for `load_file` and `ordered_load_file`, if the extension of
+            a file is not registered. Checked on the call, before any file is
+            loaded
+    """
+    if executor not in _executors:
+        raise ValueError('executor must be "thread" or "process", got "{}"'
+                         .format(executor))
+    file_paths = list(file_paths)
+    method_name = {load_file: 'load',
+                   ordered_load_file: 'ordered_load'}.get(loader)
+    if method_name is not None:
+        _check_formats(file_paths, method_name)
+    return _load_many(file_paths, workers, executor, as_completed, chunksize,
+                      loader, loader_kwargs)
+
+
+def _load_many(file_paths, workers, executor, as_completed, chunksize,
+               loader, loader_kwargs):
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, -(-len(file_paths) // (workers * 4)))
+    chunks = [file_paths[i:i + chunksize]
+              for i in range(0, len(file_paths), chunksize)]
+    with _executors[executor](max_workers=workers) as pool:
+        jobs = [pool.submit(_load_chunk, loader, chunk, loader_kwargs)
+                for chunk in chunks]
+        if as_completed:
+            jobs = futures.as_completed(jobs)
+        for job in jobs:
+            yield from job.result()
+
+
+ordered_load_many = partial(load_many, loader=ordered_load_file)
+
+
+# ==================== memoized loading ====================
+CacheStats = namedtuple(
+    'CacheStats', ['hits', 'misses', 'evictions', 'entries', 'bytes'])
+
+
+class LoadCache:
+    """
+    LRU cache of parsed files, keyed on the resolved path, the load method and
+    its kwargs. An entry is only reused while the file's (st_mtime_ns, st_size)
+    is unchanged.
+
+    Entries are kept pickled: each hit unpickles a private copy, so callers can
+    mutate what they get without corrupting the cache, and `max_bytes` bounds
+    the real storage. Unpickling is still far cheaper than parsing JSON/YAML.
+    """
+    def __init__(self, max_entries=128, max_bytes=None):
+        """
+        Args:
+            max_entries: max number of cached files, None for unbounded
+            max_bytes: max total pickled size of cached files, None for unbounded
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (stamp, blob)
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(file_path, load_method, loader_kwargs):
+        file_path = path.realpath(path.expanduser(file_path))
+        kwargs_key = tuple(sorted(loader_kwargs.items()))
+        try:
+            hash(kwargs_key)
+        except TypeError:
+            kwargs_key = repr(kwargs_key)
+        return file_path, (load_method, kwargs_key)
+
+    def load(self, file_path, load_method=load_file, **loader_kwargs):
+        key = self._key(file_path, load_method, loader_kwargs)
+        st = os.stat(key[0])
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                blob = entry[1]
+            else:
+                self._misses += 1
+                blob = None
+        if blob is not None:
+            return pickle.loads(blob)
+        data = load_method(file_path, **loader_kwargs)
+        blob = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (stamp, blob)
+            self._bytes += len(blob)
+            self._evict()
+        return data
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def _evict(self):
+        while self._entries and (
+                (self.max_entries is not None
+                 and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None
+                    and self._bytes > self.max_bytes)):
+            _, (_, blob) = self._entries.popitem(last=False)
+            self._bytes -= len(blob)
+            self._evictions += 1
+
+    def invalidate(self, file_path=None):
+        """
+        Drops every cached entry of `file_path`, or the whole cache if None
+        """
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            file_path = path.realpath(path.expanduser(file_path))
+            for key in [key for key in self._entries if key[0] == file_path]:
+                self._pop(key)
+
+    @property
+    def stats(self):
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions,
+                              len(self._entries), self._bytes)
+
+
+default_load_cache = LoadCache()
+
+
+def _get_load_cache(cache):
+    return default_load_cache if cache is True else cache
+
+
+class SidecarCache:
+    """
+    Keeps a pickled copy of each parsed file in `cache_dir`, so that later
+    loads, from any process, unpickle it instead of re-parsing the source.
+
+    A sidecar is named after the source's real path, the load method and its
+    kwargs. It is reused while the source's (st_mtime_ns, st_size) match, or
+    else while the content hash matches (e.g. after a `touch` or a checkout),
+    and is rebuilt otherwise. Once the directory exceeds `max_bytes`, the
+    least recently used sidecars are deleted.
+
+    Warning:
+      sidecars are pickles: only point `cache_dir` at a directory you trust
+    """
+    VERSION = 1
+
+    def __init__(self, cache_dir=None, max_bytes=256 << 20):
+        """
+        Args:
+            cache_dir: defaults to "$XDG_CACHE_HOME/benedict" or "~/.cache/benedict"
+            max_bytes: max total size of the sidecar files, None for unbounded
+        """
+        if cache_dir is None:
+            cache_dir = path.join(
+                os.environ.get('XDG_CACHE_HOME') or '~/.cache', 'benedict')
+        self.cache_dir = path.expanduser(cache_dir)
+        self.max_bytes = max_bytes
+
+    def sidecar_path(self, file_path, load_method, loader_kwargs):
+        file_path = path.realpath(path.expanduser(file_path))
+        key = repr((file_path, _stable_repr(load_method),
+                    [(k, _stable_repr(v)) for k, v in sorted(loader_kwargs.items())]))
+        name = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        return path.join(self.cache_dir, name + '.pkl')
+
+    def load(self, file_path, load_method=load_file, **loader_kwargs):
+        file_path = path.realpath(path.expanduser(file_path))
+        sidecar_path = self.sidecar_path(file_path, load_method, loader_kwargs)
+        st = os.stat(file_path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        digest = None
+        try:
+            with open(sidecar_path, 'rb') as fp:
+                version, source, cached_stamp, cached_digest = pickle.load(fp)
+                if (version, source) == (self.VERSION, file_path):
+                    if cached_stamp == stamp:
+                        data = pickle.load(fp)
+                        os.utime(sidecar_path)  # for LRU eviction
+                        return data
+                    digest = _file_digest(file_path)
+                    if cached_digest == digest:
+                        data = pickle.load(fp)
+                        self._write(sidecar_path, file_path, stamp, digest, data)
+                        return data
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            pass  # missing or corrupt sidecar
+        if digest is None:
+            digest = _file_digest(file_path)
+        data = load_method(file_path, **loader_kwargs)
+        self._write(sidecar_path, file_path, stamp, digest, data)
+        self._evict()
+        return data
+
+    def _write(self, sidecar_path, file_path, stamp, digest, data):
+        def write(fp):
+            pickle.dump((self.VERSION, file_path, stamp, digest), fp,
+                        pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, fp, pickle.HIGHEST_PROTOCOL)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            _write_file(sidecar_path, write, atomic=True, binary=True)
+        except (OSError, pickle.PicklingError):
+            pass  # the cache is best effort, the load itself succeeded
+
+    def _sidecars(self):
+        "Returns: [(st_mtime, st_size, path)] of the sidecar files"
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return []
+        sidecars = []
+        for entry in entries:
+            if entry.name.endswith('.pkl') and not entry.name.startswith('.'):
+                with contextlib.suppress(OSError):
+                    st = entry.stat()
+                    sidecars.append((st.st_mtime, st.st_size, entry.path))
+        return sidecars
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        sidecars = sorted(self._sidecars())
+        total = sum(size for _, size, _ in sidecars)
+        for _, size, sidecar_path in sidecars:
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(sidecar_path)
+            total -= size
+
+    def clear(self):
+        for _, _, sidecar_path in self._sidecars():
+            with contextlib.suppress(OSError):
+                os.remove(sidecar_path)
+
+    @property
+    def size(self):
+        "Returns: total bytes of the sidecar files"
+        return sum(size for _, size, _ in self._sidecars())
+
+
+def _stable_repr(value):
+    "the same across processes, unlike the default repr of functions"
+    if isinstance(value, partial):
+        return ('partial', _stable_repr(value.func), _stable_repr(value.args),
+                [(k, _stable_repr(v)) for k, v in sorted(value.keywords.items())])
+    elif isinstance(value, (list, tuple)):
+        return type(value)(_stable_repr(x) for x in value)
+    elif hasattr(value, '__qualname__'):
+        return '{}.{}'.format(getattr(value, '__module__', None),
+                              value.__qualname__)
+    return repr(value)
+
+
+default_sidecar_cache = SidecarCache()
+_yaml_sidecar_cache = None
+
+
+def set_yaml_sidecar_cache(cache=True):
+    """
+    Makes every YAML file load go through a sidecar cache unless the call
+    passes `sidecar=False`.
+
+    Args:
+        cache: a SidecarCache, True for `default_sidecar_cache`, None to disable
+    """
+    global _yaml_sidecar_cache
+    _yaml_sidecar_cache = _get_sidecar_cache(cache)
+
+
+def _get_sidecar_cache(cache):
+    if cache is None:
+        return _yaml_sidecar_cache
+    elif cache is False:
+        return None
+    return default_sidecar_cache if cache is True else cache
+
+
+# ==================== asyncio ====================
+_async_limit = 8
+_async_semaphores = weakref.WeakKeyDictionary()  # event loop -> Semaphore
+
+
+def set_async_limit(limit):
+    """
+    Max number of async load/dump operations in flight at once per event loop,
+    the rest wait for a slot. Applies to operations started afterwards.
+    """
+    global _async_limit
+    assert limit >= 1
+    _async_limit = limit
+    _async_semaphores.clear()
+
+
+async def _run_async(method, *args, **kwargs):
+    """
+    Runs the blocking file I/O and parsing in the loop's default executor.
+    The parsing thread releases the GIL to the event loop at every switch
+    interval, so the loop stays responsive even on large documents.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _async_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _async_semaphores[loop] = asyncio.Semaphore(_async_limit)
+    async with semaphore:
+        return await loop.run_in_executor(
+            None, partial(method, *args, **kwargs))
+
+
+def _async_version(method):
+    async def async_method(*args, **kwargs):
+        return await _run_async(method, *args, **kwargs)
+    return async_method
+
 
+aload_json_file = _async_version(load_json_file)
+aload_yaml_file = _async_version(load_yaml_file)
+aload_file = _async_version(load_file)
+adump_json_file = _async_version(dump_json_file)
+adump_yaml_file = _async_version(dump_yaml_file)
+adump_file = _async_version(dump_file)
+ordered_aload_json_file = _async_version(ordered_load_json_file)
+ordered_aload_yaml_file = _async_version(ordered_load_yaml_file)
+ordered_aload_file = _async_version(ordered_load_file)
+ordered_adump_json_file = _async_version(ordered_dump_json_file)
+ordered_adump_yaml_file = _async_version(ordered_dump_yaml_file)
+ordered_adump_file = _async_version(ordered_dump_file)
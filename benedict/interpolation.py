@@ -0,0 +1,219 @@
+"""
+`${learner.batch_size}` and `${env:HOME}` references between config values
+"""
+import os
+import re
+from benedict.config import ConfigError
+
+
+_reference = re.compile(r'\$\{([^}]+)\}')
+_ENV = 'env:'
+
+
+def _iter_templates(node, path=()):
+    "(path, string) for every string value with a reference, lists included"
+    if isinstance(node, dict):
+        items = dict.items(node)
+    elif isinstance(node, list):
+        items = enumerate(node)
+    else:
+        return
+    for key, value in items:
+        if isinstance(value, str):
+            if '${' in value and _reference.search(value):
+                yield path + (key,), value
+        else:
+            yield from _iter_templates(value, path + (key,))
+
+
+def _ref_path(ref):
+    return tuple(int(k) if k.isdigit() else k for k in ref.strip().split('.'))
+
+
+def _dotted(path):
+    return '.'.join(map(str, path))
+
+
+class Interpolation:
+    """
+    Resolves the references in a config tree, e.g. one from `load_file`:
+
+        interpolation = Interpolation(config)
+        interpolation.resolve()  # writes the resolved values in place
+        interpolation.set('learner.batch_size', 64)  # and its dependents
+
+    A value that is a single reference takes the referenced value as is
+    (any type, sub-dicts included), references inside a longer string are
+    formatted with str(). A reference to a sub-dict depends on every
+    reference inside it.
+
+    The dependency graph is built once and sorted topologically, cycles
+    raise ConfigError. Resolve before `Config.extend` if the referencing
+    keys have type placeholders in the default config.
+    """
+    def __init__(self, config, environ=None):
+        """
+        Args:
+            config: dict or BeneDict tree, resolved in place
+            environ: for `${env:NAME}`, defaults to os.environ
+        """
+        self.config = config
+        self.environ = os.environ if environ is None else environ
+        self.values = {}  # path -> resolved value, for the templates
+        self._build(dict(_iter_templates(config)))
+
+    def _build(self, templates):
+        self.templates = templates
+        # every prefix of a template path -> templates under it
+        under = {}
+        for path in self.templates:
+            for i in range(1, len(path) + 1):
+                under.setdefault(path[:i], []).append(path)
+        self._refs = {}  # template path -> referenced paths
+        deps = {}
+        for path, template in self.templates.items():
+            refs = [_ref_path(ref) for ref in _reference.findall(template)
+                    if not ref.startswith(_ENV)]
+            self._refs[path] = refs
+            depends = set()
+            for ref in refs:
+                depends.update(under.get(ref, ()))
+                depends.update(ref[:i] for i in range(1, len(ref))
+                               if ref[:i] in self.templates)
+            deps[path] = depends
+        self._dependents = {path: set() for path in self.templates}
+        for path, depends in deps.items():
+            for dependency in depends:
+                self._dependents[dependency].add(path)
+        self.order = self._toposort(deps)
+        self._position = {path: i for i, path in enumerate(self.order)}
+
+    @staticmethod
+    def _toposort(deps):
+        order = []
+        done = set()
+        for root in deps:
+            if root in done:
+                continue
+            trail = [root]
+            on_trail = {root}
+            stack = [iter(deps[root])]
+            while stack:
+                for dependency in stack[-1]:
+                    if dependency in done:
+                        continue
+                    if dependency in on_trail:
+                        cycle = trail[trail.index(dependency):] + [dependency]
+                        raise ConfigError('interpolation cycle: {}'.format(
+                            ' -> '.join(map(_dotted, cycle))))
+                    trail.append(dependency)
+                    on_trail.add(dependency)
+                    stack.append(iter(deps[dependency]))
+                    break
+                else:
+                    stack.pop()
+                    path = trail.pop()
+                    on_trail.discard(path)
+                    done.add(path)
+                    order.append(path)
+        return order
+
+    def _lookup(self, path, ref):
+        node = self.config
+        for key in ref:
+            try:
+                node = node[key] if isinstance(node, (list, tuple)) \
+                    else dict.__getitem__(node, key)
+            except (KeyError, IndexError, TypeError):
+                raise ConfigError('interpolation of key "{}": "${{{}}}" not '
+                                  'found'.format(_dotted(path), _dotted(ref)))
+        return node
+
+    def _substitute(self, path, match):
+        ref = match.group(1).strip()
+        if ref.startswith(_ENV):
+            name = ref[len(_ENV):]
+            try:
+                return self.environ[name]
+            except KeyError:
+                raise ConfigError('interpolation of key "{}": environment '
+                                  'variable {} not set'
+                                  .format(_dotted(path), name))
+        return self._lookup(path, _ref_path(ref))
+
+    def _resolve_one(self, path):
+        template = self.templates[path]
+        match = _reference.fullmatch(template.strip())
+        if match:
+            value = self._substitute(path, match)
+        else:
+            value = _reference.sub(
+                lambda m: str(self._substitute(path, m)), template)
+        self.values[path] = value
+        node = self._lookup(path, path[:-1])
+        node[path[-1]] = value
+        return value
+
+    def resolve(self):
+        """
+        Returns:
+            the config, with every reference resolved in place
+        """
+        for path in self.order:
+            self._resolve_one(path)
+        return self.config
+
+    def set(self, key_path, value):
+        """
+        Sets a value and re-resolves only the references that depend on it
+
+        Args:
+            key_path: dotted string or tuple of keys
+
+        Returns:
+            paths of the re-resolved values, in resolution order
+        """
+        if isinstance(key_path, str):
+            key_path = _ref_path(key_path)
+        key_path = tuple(key_path)
+        parent = self._lookup(key_path, key_path[:-1])
+        parent[key_path[-1]] = value
+        n = len(key_path)
+        added = {key_path + path[1:]: template for path, template
+                 in _iter_templates({None: value})}
+        if added or any(path[:n] == key_path for path in self.templates):
+            # references added or overwritten, only then the graph changes
+            templates = {path: template
+                         for path, template in self.templates.items()
+                         if path[:n] != key_path}
+            templates.update(added)
+            for path in set(self.values) - set(templates):
+                del self.values[path]
+            self._build(templates)
+        affected = set(added)
+        for path, refs in self._refs.items():
+            for ref in refs:
+                n = min(len(ref), len(key_path))
+                if ref[:n] == key_path[:n]:
+                    affected.add(path)
+                    break
+        pending = list(affected)
+        while pending:
+            for dependent in self._dependents[pending.pop()]:
+                if dependent not in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+        resolved = sorted(affected, key=self._position.__getitem__)
+        for path in resolved:
+            self._resolve_one(path)
+        return resolved
+
+
+def interpolate(config, environ=None):
+    """
+    Resolves `${dotted.key}` and `${env:NAME}` references in place
+
+    Returns:
+        `config`
+    """
+    return Interpolation(config, environ).resolve()
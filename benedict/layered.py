@@ -0,0 +1,176 @@
+"""
+Read-through view over a stack of config layers, e.g. global defaults,
+tenant and request overrides, without merging them into a new tree
+"""
+import operator
+import collections.abc as abc
+from benedict.config import ConfigError, ConfigKeyError
+
+
+_missing = object()
+
+
+def _plain(value):
+    "copy of a leaf value with the nested nodes converted to builtin dicts"
+    if isinstance(value, LayeredConfig):
+        return value.to_dict()
+    elif isinstance(value, abc.Mapping):
+        return {k: _plain(v) for k, v in dict.items(value)}
+    elif isinstance(value, (list, tuple)):
+        return type(value)(_plain(v) for v in value)
+    return value
+
+
+class LayeredConfig(abc.MutableMapping):
+    """
+    Like collections.ChainMap, the first layer has the highest priority.
+    A key that holds a dict in several layers resolves to a nested
+    LayeredConfig over those sub-dicts, down to the first layer where the key
+    holds a non-dict value, which shadows the dicts below it.
+
+    Every lookup goes through the layers, one dict.get per layer, so writes
+    to a layer are seen whether they go through the view or to the layer
+    directly. Nested views are cached per key and reused as long as the
+    sub-dicts they cover are the same objects. Writes and deletes go to the
+    first layer.
+
+    Usage:
+        base = LayeredConfig(tenant_config, global_defaults)
+        config = base.new_child(request_config)  # no copy of the layers
+        config.learner.lr  # request, else tenant, else default value
+        config.to_dict()  # merged plain dict
+
+    Missing keys raise ConfigKeyError, like Config. Keys that collide with
+    method names of this class are only accessible as `config['maps']`.
+    """
+    def __init__(self, *layers):
+        """
+        Args:
+            layers: dicts or BeneDicts, highest priority first. Defaults to a
+                single empty dict.
+        """
+        if not layers:
+            layers = ({},)
+        for layer in layers:
+            assert isinstance(layer, dict), 'layers must be dicts'
+        self._init(tuple(layers), self, ())
+
+    def _init(self, layers, root, path):
+        object.__setattr__(self, '_layers', layers)
+        object.__setattr__(self, '_root', root)
+        object.__setattr__(self, '_path', path)
+        object.__setattr__(self, '_views', {})  # key -> nested view
+
+    @property
+    def maps(self):
+        "the layers of this view, highest priority first"
+        return list(self._layers)
+
+    def new_child(self, layer=None):
+        """
+        Returns:
+            new LayeredConfig with `layer` (default {}) on top of this view's
+            layers, the layers themselves are shared, not copied
+        """
+        if layer is None:
+            layer = {}
+        assert isinstance(layer, dict), 'layers must be dicts'
+        child = LayeredConfig.__new__(LayeredConfig)
+        child._init((layer,) + self._layers, child, ())
+        return child
+
+    def invalidate(self):
+        """
+        Drops the cached nested views. Never needed for correctness, the
+        views are checked against the layers on every lookup.
+        """
+        self._views.clear()
+
+    def __getitem__(self, key):
+        dicts = []
+        for layer in self._layers:
+            value = dict.get(layer, key, _missing)
+            if value is _missing:
+                continue
+            if not isinstance(value, dict):
+                if not dicts:
+                    return value
+                break
+            dicts.append(value)
+        if not dicts:
+            raise KeyError(key)
+        view = self._views.get(key)
+        if (view is None or len(view._layers) != len(dicts)
+                or not all(map(operator.is_, view._layers, dicts))):
+            view = LayeredConfig.__new__(LayeredConfig)
+            view._init(tuple(dicts), self._root, self._path + (key,))
+            self._views[key] = view
+        return view
+
+    def __getattr__(self, key):
+        if key.startswith('_'):
+            raise AttributeError(key)
+        try:
+            return self[key]
+        except KeyError:
+            raise ConfigKeyError(key)
+
+    def _top_node(self, create):
+        "the dict at this view's path in the first layer"
+        node = self._root._layers[0]
+        for key in self._path:
+            child = dict.get(node, key, _missing)
+            if child is _missing:
+                if not create:
+                    raise KeyError(key)
+                node[key] = {}
+                child = dict.__getitem__(node, key)
+            elif not isinstance(child, dict):
+                raise ConfigError('key "{}" is not a sub-dict in the first '
+                                  'layer'.format('.'.join(map(str, self._path))))
+            node = child
+        return node
+
+    def __setitem__(self, key, value):
+        self._top_node(create=True)[key] = value
+
+    def __setattr__(self, key, value):
+        if key.startswith('_'):
+            raise AttributeError('cannot set private attribute ' + key)
+        self[key] = value
+
+    def __delitem__(self, key):
+        node = self._top_node(create=False)
+        del node[key]
+        if isinstance(key, str) and hasattr(node, '__dict__'):
+            # BeneDict mirrors its keys as attributes
+            node.__dict__.pop(key, None)
+
+    def __delattr__(self, key):
+        try:
+            del self[key]
+        except KeyError:
+            raise ConfigKeyError(key)
+
+    def __contains__(self, key):
+        return any(key in layer for layer in self._layers)
+
+    def __iter__(self):
+        # lowest layer first, so keys keep the order of the defaults
+        keys = {}
+        for layer in reversed(self._layers):
+            keys.update(dict.fromkeys(layer))
+        return iter(keys)
+
+    def __len__(self):
+        return len(set().union(*self._layers))
+
+    def to_dict(self):
+        """
+        Returns:
+            merged plain dict, independent of the layers
+        """
+        return {key: _plain(self[key]) for key in self}
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, self.to_dict())
@@ -8,7 +8,8 @@ Adapted from: https://github.com/makinacorpus/EasyDict
 """
 import benedict.data_format as df
 from benedict.core import (
-    BeneDict, benedict_to_dict, _Builtin
+    BeneDict, benedict_to_dict, benedict_fingerprint, _Builtin, _new_node, _load_nodes,
+    _iter_nodes, _load_many_nodes, _fingerprint_caches, _fingerprint_changed
 )
 from collections import OrderedDict
 import collections.abc as abc
@@ -79,56 +80,191 @@ class OrderedBeneDict(OrderedDict):
         if isinstance(name, str):  # support non-string keys
             super().__setattr__(name, value)
         super().__setitem__(name, value)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
 
     __setitem__ = __setattr__
 
+    # the builtin mutators, hooked to drop the cached fingerprints
+    def __delitem__(self, key):
+        OrderedDict.__delitem__(self, key)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+
+    def __ior__(self, other):
+        OrderedDict.__ior__(self, other)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+        return self
+
+    def clear(self):
+        OrderedDict.clear(self)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+
+    def pop(self, *args):
+        value = OrderedDict.pop(self, *args)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+        return value
+
+    def popitem(self, *args):
+        item = OrderedDict.popitem(self, *args)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+        return item
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return OrderedDict.__getitem__(self, key)
+        value = OrderedDict.setdefault(self, key, default)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+        return value
+
+    def update(self, *args, **kwargs):
+        OrderedDict.update(self, *args, **kwargs)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+
+    def move_to_end(self, key, last=True):
+        OrderedDict.move_to_end(self, key, last)
+        if _fingerprint_caches:
+            _fingerprint_changed(self)
+
     def to_dict(self):
         """
         Convert to raw dict
         """
         return benedict_to_ordereddict(self)
 
+    def fingerprint(self, algo='blake2b'):
+        """
+        Canonical digest of the content that depends on the key order,
+        see `benedict_fingerprint`.
+        """
+        return benedict_fingerprint(self, algo)
+
     def deepcopy(self):
         return self.__class__(self)
 
+    @classmethod
+    def _from_pairs(cls, pairs):
+        """
+        Build a node from (key, value) pairs whose nested mappings are already
+        `cls` nodes, e.g. as the JSON `object_pairs_hook` or YAML mapping
+        constructor. Values are stored as-is instead of being converted
+        (and copied) again by `__setattr__`.
+        """
+        self = _new_node(cls, OrderedDict)
+        protected = cls._PROTECTED_METHODS
+        for k, v in pairs:
+            if k in protected:
+                raise ValueError('Cannot override `{}()`: {} protected method'
+                                 .format(k, cls.__name__))
+            if isinstance(k, str):
+                object.__setattr__(self, k, v)
+            OrderedDict.__setitem__(self, k, v)
+        return self
+
     @classmethod
     def load_json_file(cls, file_path, **loader_kwargs):
-        return cls(df.ordered_load_json_file(file_path, **loader_kwargs))
+        return _load_nodes(
+            cls, df.ordered_load_json_file, file_path, loader_kwargs)
 
     @classmethod
     def load_json_str(cls, string, **loader_kwargs):
-        return cls(df.ordered_load_json_str(string, **loader_kwargs))
+        return _load_nodes(
+            cls, df.ordered_load_json_str, string, loader_kwargs)
 
     @classmethod
     def load_yaml_file(cls, file_path, **loader_kwargs):
-        return cls(df.ordered_load_yaml_file(file_path, **loader_kwargs))
+        return _load_nodes(
+            cls, df.ordered_load_yaml_file, file_path, loader_kwargs)
 
     @classmethod
     def load_yaml_str(cls, string, **loader_kwargs):
-        return cls(df.ordered_load_yaml_str(string, **loader_kwargs))
+        return _load_nodes(
+            cls, df.ordered_load_yaml_str, string, loader_kwargs)
 
     @classmethod
     def load_file(cls, file_path, **loader_kwargs):
         """
         Args:
-            file_path: JSON or YAML loader depends on the file extension
+            file_path: loader depends on the file extension,
+                see `data_format.register_format`
+            cache: a LoadCache, or True for `data_format.default_load_cache`,
+                to memoize the parsed file until it changes on disk
+            select: only load the subtree at this path, e.g. "learner.optimizer",
+                JSON and YAML files skip everything else without building it
+
+        Raises:
+            IOError: if the extension is not registered
+            KeyError: if the `select` path does not exist
+        """
+        return _load_nodes(
+            cls, df.ordered_load_file, file_path, loader_kwargs)
+
+    @classmethod
+    def load_many(cls, file_paths, *, workers=None, executor='thread',
+                  as_completed=False, chunksize=None, **loader_kwargs):
+        """
+        Loads many files in parallel, see `data_format.load_many`
+
+        Returns:
+            iterator of LoadResult(file_path, data, error)
+
+        Raises:
+            IOError: if the extension of a file is not registered, on the
+                call. Missing files are reported in their LoadResult
+        """
+        return _load_many_nodes(
+            cls, df.ordered_load_many, file_paths, workers, executor,
+            as_completed, chunksize, loader_kwargs
+        )
+
+    @classmethod
+    def iter_file(cls, file_path, *, batch_size=None, **loader_kwargs):
+        """
+        Yields one object per record of a ".jsonl" file or per document of a
+        multi-document YAML file, reading the file lazily.
+
+        Args:
+            file_path: JSON Lines, JSON or YAML loader depends on the extension
+            batch_size: if set, yield lists of up to `batch_size` objects instead
+
+        Raises:
+            IOError: if the extension has no registered streaming loader or the
+                file does not exist, on the call
+        """
+        return df._batched(
+            _iter_nodes(cls, df.ordered_iter_file, file_path, loader_kwargs),
+            batch_size
+        )
+
+    @classmethod
+    def dump_stream(cls, records, file_path, **dumper_kwargs):
+        """
+        Writes an iterable of dicts one at a time.
+
+        Args:
+            file_path: JSON Lines or YAML dumper depends on the file extension
 
         Raises:
-            IOError: if extension is not ".json", ".yml", or ".yaml"
+            IOError: if the extension has no registered streaming dumper
         """
-        return cls(df.ordered_load_file(file_path, **loader_kwargs))
+        return df.ordered_dump_stream(
+            map(benedict_to_ordereddict, records), file_path, **dumper_kwargs)
 
     def dump_json_file(self, file_path, **dumper_kwargs):
-        df.ordered_dump_json_file(
-            benedict_to_ordereddict(self), file_path, **dumper_kwargs)
+        return df.ordered_dump_json_file(self, file_path, **dumper_kwargs)
 
     def dump_json_str(self, **dumper_kwargs):
         "Returns: string"
-        return df.ordered_dump_json_str(
-            benedict_to_ordereddict(self), **dumper_kwargs)
+        return df.ordered_dump_json_str(self, **dumper_kwargs)
 
     def dump_yaml_file(self, file_path, **dumper_kwargs):
-        df.ordered_dump_yaml_file(
+        return df.ordered_dump_yaml_file(
             benedict_to_ordereddict(self), file_path, **dumper_kwargs)
 
     def dump_yaml_str(self, **dumper_kwargs):
@@ -139,14 +275,50 @@ class OrderedBeneDict(OrderedDict):
     def dump_file(self, file_path, **dumper_kwargs):
         """
         Args:
-            file_path: JSON or YAML loader depends on the file extension
+            file_path: dumper depends on the file extension,
+                see `data_format.register_format`
 
         Raises:
-            IOError: if extension is not ".json", ".yml", or ".yaml"
+            IOError: if the extension is not registered
         """
-        df.ordered_dump_file(
+        return df.ordered_dump_file(
             benedict_to_ordereddict(self), file_path, **dumper_kwargs)
 
+    @classmethod
+    async def aload_json_file(cls, file_path, **loader_kwargs):
+        return await df._run_async(
+            cls.load_json_file, file_path, **loader_kwargs)
+
+    @classmethod
+    async def aload_yaml_file(cls, file_path, **loader_kwargs):
+        return await df._run_async(
+            cls.load_yaml_file, file_path, **loader_kwargs)
+
+    @classmethod
+    async def aload_file(cls, file_path, **loader_kwargs):
+        """
+        Loads in an executor without blocking the event loop,
+        see `data_format.set_async_limit` for the concurrency cap
+        """
+        return await df._run_async(
+            cls.load_file, file_path, **loader_kwargs)
+
+    async def adump_json_file(self, file_path, **dumper_kwargs):
+        return await df._run_async(
+            self.dump_json_file, file_path, **dumper_kwargs)
+
+    async def adump_yaml_file(self, file_path, **dumper_kwargs):
+        return await df._run_async(
+            self.dump_yaml_file, file_path, **dumper_kwargs)
+
+    async def adump_file(self, file_path, **dumper_kwargs):
+        """
+        Dumps in an executor without blocking the event loop. Do not mutate
+        the object until the dump completes.
+        """
+        return await df._run_async(
+            self.dump_file, file_path, **dumper_kwargs)
+
     def __getstate__(self):
         """
         Support pickling.
@@ -165,30 +337,40 @@ class OrderedBeneDict(OrderedDict):
 
     # we explicitly list them here so that IDEs like PyCharm can do auto-complete
     # call _print_protected_methods() to generate this code
-    builtin_clear = OrderedDict.clear
+    builtin_clear = clear
     builtin_copy = OrderedDict.copy
     builtin_fromkeys = OrderedDict.fromkeys
     builtin_get = OrderedDict.get
     builtin_items = OrderedDict.items
     builtin_keys = OrderedDict.keys
-    builtin_move_to_end = OrderedDict.move_to_end
-    builtin_pop = OrderedDict.pop
-    builtin_popitem = OrderedDict.popitem
-    builtin_setdefault = OrderedDict.setdefault
-    builtin_update = OrderedDict.update
+    builtin_move_to_end = move_to_end
+    builtin_pop = pop
+    builtin_popitem = popitem
+    builtin_setdefault = setdefault
+    builtin_update = update
     builtin_values = OrderedDict.values
+    builtin_adump_file = adump_file
+    builtin_adump_json_file = adump_json_file
+    builtin_adump_yaml_file = adump_yaml_file
+    builtin_aload_file = aload_file
+    builtin_aload_json_file = aload_json_file
+    builtin_aload_yaml_file = aload_yaml_file
     builtin_deepcopy = deepcopy
     builtin_dump_file = dump_file
+    builtin_dump_stream = dump_stream
     builtin_dump_json_file = dump_json_file
     builtin_dump_json_str = dump_json_str
     builtin_dump_yaml_file = dump_yaml_file
     builtin_dump_yaml_str = dump_yaml_str
+    builtin_iter_file = iter_file
     builtin_load_file = load_file
     builtin_load_json_file = load_json_file
+    builtin_load_many = load_many
     builtin_load_json_str = load_json_str
     builtin_load_yaml_file = load_yaml_file
     builtin_load_yaml_str = load_yaml_str
     builtin_to_dict = to_dict
+    builtin_fingerprint = fingerprint
 
 
 def benedict_to_ordereddict(D):
@@ -0,0 +1,198 @@
+"""
+Hyperparameter sweeps over a config: `_grid[...]_` leaves expand lazily
+into configs that share every unchanged subtree
+"""
+import re
+import sys
+import random
+import itertools
+import yaml
+from benedict.core import BeneDict, _build_nodes
+from benedict.ordered import OrderedBeneDict
+from benedict.config import Config, ConfigError
+
+
+_grid_marker = re.compile(r'_grid\[(.*)\]_', re.IGNORECASE | re.DOTALL)
+# YAML 1.1 reads 1e-3 as a string
+_float_literal = re.compile(r'[-+]?(\d+\.?\d*|\.\d+)[eE][-+]?\d+')
+
+SWEEP_MODES = ('grid', 'zip', 'random')
+
+
+def _parse_grid(value):
+    "options of a `_grid[...]_` string, parsed as a YAML list, or None"
+    match = _grid_marker.fullmatch(value.strip())
+    if match is None:
+        return None
+    try:
+        options = yaml.safe_load('[{}]'.format(match.group(1)))
+    except yaml.YAMLError as e:
+        raise ConfigError('cannot parse sweep "{}": {}'.format(value, e))
+    if not options:
+        raise ConfigError('_grid[...]_ cannot be empty')
+    return [float(option) if isinstance(option, str)
+            and _float_literal.fullmatch(option) else option
+            for option in options]
+
+
+def _find_axes(node, lists, path=()):
+    for key, value in dict.items(node):
+        if isinstance(value, dict):
+            yield from _find_axes(value, lists, path + (key,))
+        elif isinstance(value, str):
+            options = _parse_grid(value)
+            if options is not None:
+                yield path + (key,), options
+        elif lists and isinstance(value, list) and value:
+            yield path + (key,), value
+
+
+class Sweep:
+    """
+    Sequence of configs, one per combination of the swept leaves:
+    `_grid[...]_` strings, e.g. `lr: _grid[0.1, 0.01]_`, and with
+    `lists=True` every non-empty list value.
+
+    Each config is built on access, `sweep[n]` costs O(depth) per swept leaf
+    and none of the combinations before it. `len()` is limited to
+    sys.maxsize, `size` is not. Only the nodes on the paths to
+    swept leaves are new, everything else is shared with the base config
+    and between the configs: assign rather than mutate nested values.
+
+    Usage:
+        for config in Sweep(Config.load_file('sweep.yml'), mode='random',
+                            samples=100, seed=0):
+            launch(config)
+    """
+    def __init__(self, config, mode='grid', samples=None, seed=None,
+                 lists=False):
+        """
+        Args:
+            config: a BeneDict (any subclass), a plain dict becomes a Config
+            mode: 'grid' for the cartesian product, the last swept leaf
+                varies fastest. 'zip' for the n-th option of every leaf, all
+                leaves must have as many options. 'random' for `samples`
+                distinct combinations of the grid.
+            samples: number of configs in 'random' mode
+            seed: for 'random' mode
+            lists: also sweep over list values
+        """
+        if mode not in SWEEP_MODES:
+            raise ValueError('mode must be one of {}'.format(SWEEP_MODES))
+        if not isinstance(config, (BeneDict, OrderedBeneDict)):
+            config = _build_nodes(Config, config)
+        self.config = config
+        self.mode = mode
+        cls = type(config)
+        self.axes = []  # (key path, options)
+        for path, options in _find_axes(config, lists):
+            # option sub-dicts become nodes once, shared by every config
+            self.axes.append((path, [_build_nodes(cls, option)
+                                     for option in options]))
+        self._sizes = [len(options) for _, options in self.axes]
+        # key -> subtree, or axis index at the swept leaves
+        self._trie = {}
+        for i, (path, _) in enumerate(self.axes):
+            node = self._trie
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = i
+        grid_size = 1
+        for size in self._sizes:
+            grid_size *= size
+        if mode == 'zip':
+            if len(set(self._sizes)) > 1:
+                raise ConfigError(
+                    'zip sweep needs as many options for every leaf, got {}'
+                    .format(', '.join('{}: {}'.format('.'.join(map(str, p)),
+                                                      len(o))
+                                      for p, o in self.axes)))
+            self._length = self._sizes[0] if self._sizes else 1
+        elif mode == 'random':
+            if samples is None:
+                raise ValueError('random sweep needs `samples`')
+            # distinct grid indices, without enumerating the grid
+            rng = random.Random(seed)
+            samples = min(samples, grid_size)
+            if grid_size <= sys.maxsize:
+                self._samples = rng.sample(range(grid_size), samples)
+            else:  # too large for sample(), collisions are negligible
+                chosen = {}
+                while len(chosen) < samples:
+                    chosen.setdefault(rng.randrange(grid_size), None)
+                self._samples = list(chosen)
+            self._length = len(self._samples)
+        else:
+            self._length = grid_size
+
+    @property
+    def size(self):
+        "number of configs"
+        return self._length
+
+    def __len__(self):
+        return self._length
+
+    def indices(self, n):
+        """
+        Returns:
+            option index of every swept leaf in the n-th config
+        """
+        if n < 0:
+            n += self._length
+        if not 0 <= n < self._length:
+            raise IndexError('sweep index out of range')
+        if self.mode == 'zip':
+            return [n] * len(self.axes)
+        if self.mode == 'random':
+            n = self._samples[n]
+        indices = []
+        for size in reversed(self._sizes):
+            n, i = divmod(n, size)
+            indices.append(i)
+        return indices[::-1]
+
+    def overrides(self, n):
+        """
+        Returns:
+            {dotted key path: value} of the swept leaves in the n-th config,
+            e.g. to name the run
+        """
+        return {'.'.join(map(str, path)): options[i] for (path, options), i
+                in zip(self.axes, self.indices(n))}
+
+    def _build(self, node, trie, values):
+        pairs = []
+        for key, value in dict.items(node):
+            sub = trie.get(key)
+            if sub is None:
+                pairs.append((key, value))
+            elif isinstance(sub, dict):
+                pairs.append((key, self._build(value, sub, values)))
+            else:
+                pairs.append((key, values[sub]))
+        return type(node)._from_pairs(pairs)
+
+    def __getitem__(self, n):
+        if isinstance(n, slice):
+            return [self[i] for i in range(*n.indices(self._length))]
+        values = [options[i] for (_, options), i
+                  in zip(self.axes, self.indices(n))]
+        return self._build(self.config, self._trie, values)
+
+    def __iter__(self):
+        if self.mode == 'grid':
+            for combination in itertools.product(
+                    *(options for _, options in self.axes)):
+                yield self._build(self.config, self._trie, combination)
+        else:
+            for n in range(self._length):
+                yield self[n]
+
+
+def sweep(config, mode='grid', samples=None, seed=None, lists=False):
+    """
+    Returns:
+        Sweep, a lazy sequence of configs, see `Sweep`
+    """
+    return Sweep(config, mode, samples, seed, lists)
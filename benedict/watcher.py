@@ -0,0 +1,293 @@
+"""
+Hot reload of configs whose files change on disk
+"""
+import os
+import warnings
+import threading
+import os.path as path
+from collections import namedtuple, OrderedDict
+from benedict.core import _fingerprint_caches, _fingerprint_changed
+from benedict.config import _fill_default_config
+
+
+ConfigChange = namedtuple('ConfigChange', ['file_path', 'path', 'old', 'new'])
+
+
+class _Missing:
+    "old value of an added key, new value of a removed key"
+    def __repr__(self):
+        return '<missing>'
+
+
+MISSING = _Missing()
+
+
+def config_diff(old, new, _path=()):
+    """
+    Minimal set of changes that turns `old` into `new`: recurses into keys that
+    hold a dict on both sides, anything else that differs is one change.
+
+    Returns:
+        list of (path_tuple, old_value, new_value), MISSING for added or
+        removed keys
+    """
+    changes = []
+    for key, old_value in _items(old):
+        if key not in new:
+            changes.append((_path + (key,), old_value, MISSING))
+            continue
+        new_value = dict.__getitem__(new, key)
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            changes.extend(config_diff(old_value, new_value, _path + (key,)))
+        elif type(old_value) is not type(new_value) or old_value != new_value:
+            changes.append((_path + (key,), old_value, new_value))
+    for key, new_value in _items(new):
+        if key not in old:
+            changes.append((_path + (key,), MISSING, new_value))
+    return changes
+
+
+def _items(node):
+    "in key order for OrderedDicts, whose `dict.items` ignores move_to_end"
+    if isinstance(node, OrderedDict):
+        return OrderedDict.items(node)
+    return dict.items(node)
+
+
+def _set_raw(node, key, value):
+    "values are already nodes of the right class, so skip the copy"
+    base = OrderedDict if isinstance(node, OrderedDict) else dict
+    if value is MISSING:
+        base.__delitem__(node, key)
+        if isinstance(key, str):
+            node.__dict__.pop(key, None)
+    else:
+        if isinstance(key, str):
+            object.__setattr__(node, key, value)
+        base.__setitem__(node, key, value)
+    if _fingerprint_caches:
+        _fingerprint_changed(node)
+
+
+def _apply_changes(config, changes):
+    """
+    Applies all the changes or, if one of them fails, none of them
+    """
+    applied = []
+    try:
+        for key_path, old, new in changes:
+            node = config
+            for key in key_path[:-1]:
+                node = dict.__getitem__(node, key)
+            _set_raw(node, key_path[-1], new)
+            applied.append((node, key_path[-1], old))
+    except BaseException:
+        for node, key, old in reversed(applied):
+            _set_raw(node, key, old)
+        raise
+
+
+def _file_stamp(file_path):
+    "None while the file is missing, e.g. in the middle of a replace"
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _inotify():
+    try:
+        import inotify_simple
+    except ImportError:
+        return None
+    return inotify_simple
+
+
+_Watch = namedtuple('_Watch', ['config', 'file_path', 'default_config', 'stamp'])
+
+
+class ConfigWatcher:
+    """
+    Reloads watched config files when they change, re-runs the default config
+    extension and validation, and applies only the changed keys to the live
+    config object. A file that fails to load or validate leaves its config
+    untouched.
+
+    Changes are applied while holding `watcher.lock`; readers that need a
+    consistent view across several keys can hold it too.
+
+    Usage:
+        watcher = ConfigWatcher(interval=2)
+        watcher.watch(config, 'config.yml', default_config)
+        watcher.subscribe(lambda change: print(change), 'learner.lr')
+        watcher.start()
+    """
+    def __init__(self, interval=1.0, on_error=None, use_inotify=None):
+        """
+        Args:
+            interval: seconds between polls of the files' stat
+            on_error: on_error(file_path, exception) for files that fail to
+                load or validate and for subscribers that raise,
+                defaults to a warning
+            use_inotify: wait for inotify events instead of polling, needs the
+                `inotify_simple` package. None uses it if installed.
+        """
+        self.interval = interval
+        self.on_error = on_error
+        if use_inotify is None:
+            use_inotify = _inotify() is not None
+        self.use_inotify = use_inotify
+        self.lock = threading.RLock()
+        self._watches = []
+        self._subscribers = []  # (key_path or None, callback)
+        self._check_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, config, file_path, default_config=None):
+        """
+        Args:
+            config: the live config, usually loaded from `file_path`
+            default_config: re-applied with `Config.extend` semantics on reload
+        """
+        file_path = path.abspath(path.expanduser(file_path))
+        with self._check_lock:
+            self._watches.append(_Watch(
+                config, file_path, default_config, _file_stamp(file_path)))
+        return config
+
+    def unwatch(self, file_path):
+        file_path = path.abspath(path.expanduser(file_path))
+        with self._check_lock:
+            self._watches = [w for w in self._watches
+                             if w.file_path != file_path]
+
+    def subscribe(self, callback, key_path=None):
+        """
+        Args:
+            callback: callback(ConfigChange(file_path, path, old, new)), called
+                once per changed path after the whole file has been applied.
+                `path` is dotted, MISSING stands for an added or removed key.
+            key_path: only changes at, above or below this dotted path
+
+        Returns:
+            `callback`, for use as a decorator and with `unsubscribe`
+        """
+        if key_path is not None:
+            key_path = tuple(key_path.split('.'))
+        self._subscribers.append((key_path, callback))
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers = [(p, c) for p, c in self._subscribers
+                             if c is not callback]
+
+    def check(self):
+        """
+        Reloads the files that changed since the last check
+
+        Returns:
+            list of ConfigChange that were applied
+        """
+        with self._check_lock:
+            changes = []
+            for i, watch in enumerate(self._watches):
+                stamp = _file_stamp(watch.file_path)
+                if stamp is None or stamp == watch.stamp:
+                    continue
+                # the stamp is taken before reading: a write during the load
+                # changes the stamp again and triggers another reload
+                self._watches[i] = watch._replace(stamp=stamp)
+                changes.extend(self._reload(watch))
+        for change in changes:
+            self._notify(change)
+        return changes
+
+    def _reload(self, watch):
+        config = watch.config
+        try:
+            new = type(config).load_file(watch.file_path)
+            if watch.default_config is not None:
+                new = _fill_default_config(new, watch.default_config, [])
+            with self.lock:
+                key_changes = config_diff(config, new)
+                _apply_changes(config, key_changes)
+        except Exception as e:
+            self._error(watch.file_path, e)
+            return []
+        return [ConfigChange(watch.file_path, '.'.join(map(str, key_path)),
+                             old, new)
+                for key_path, old, new in key_changes]
+
+    def _notify(self, change):
+        change_path = tuple(change.path.split('.'))
+        for key_path, callback in list(self._subscribers):
+            if key_path is not None:
+                n = min(len(key_path), len(change_path))
+                if key_path[:n] != change_path[:n]:
+                    continue
+            try:
+                callback(change)
+            except Exception as e:
+                self._error(change.file_path, e)
+
+    def _error(self, file_path, exception):
+        if self.on_error is None:
+            warnings.warn('config reload of "{}" failed: {!r}'
+                          .format(file_path, exception))
+        else:
+            self.on_error(file_path, exception)
+
+    def start(self):
+        "polls in a daemon thread until `stop()`"
+        if self._thread is not None:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='ConfigWatcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        inotify = self._open_inotify() if self.use_inotify else None
+        try:
+            while not self._stop.is_set():
+                if inotify is None:
+                    self._stop.wait(self.interval)
+                else:  # wakes up early on changes in the directories
+                    inotify.read(timeout=int(self.interval * 1000))
+                if not self._stop.is_set():
+                    self.check()
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _open_inotify(self):
+        """
+        Watches the directories rather than the files, editors and atomic
+        dumps replace a file instead of writing to it.
+        Files watched after `start()` are still checked every `interval`.
+        """
+        inotify_simple = _inotify()
+        if inotify_simple is None:
+            return None
+        flags = inotify_simple.flags
+        inotify = inotify_simple.INotify()
+        for directory in {path.dirname(w.file_path) for w in self._watches}:
+            inotify.add_watch(directory, flags.CLOSE_WRITE | flags.MOVED_TO
+                              | flags.CREATE | flags.ATTRIB)
+        return inotify
@@ -28,5 +28,13 @@ setup(
     install_requires=[
         'pyyaml',
     ],
-    python_requires='>=3.5',
+    extras_require={
+        # optional JSON backends, see data_format.set_json_backend
+        'orjson': ['orjson'],
+        'rapidjson': ['python-rapidjson'],
+        'ujson': ['ujson'],
+        # ConfigWatcher waits for inotify events instead of polling
+        'inotify': ['inotify_simple'],
+    },
+    python_requires='>=3.7',
 )
@@ -165,7 +165,7 @@ def test_json(C):
 
 def test_yaml(C):
     Config(C).dump_file('~/Temp/debug_config.yml')
-    assert Config.load_file('~/Temp/debug_config.yaml') == C
+    assert Config.load_file('~/Temp/debug_config.yml') == C
 
 
 def test_num_error(C_num):
@@ -383,3 +383,309 @@ def test_abstract_extend():
     })
     with pytest_print_raises(ConfigError):
         my_config.extend(default_config)
+
+
+def _random_default(rng, depth=0):
+    markers = ['_object_', '_singleton_', '_list_', '_dict_', '_int_',
+               '_float_', '_num_', '_str_', '_bool_', '_enum[a, b,C]_']
+    default = {}
+    for key in rng.sample('abcdef', rng.randint(1, 4)):
+        r = rng.random()
+        if r < 0.35:
+            default[key] = rng.choice(markers)
+        elif r < 0.6 and depth < 3:
+            default[key] = _random_default(rng, depth + 1)
+        else:
+            default[key] = rng.choice([1, 2.5, 'x', [1, 2], None, True])
+    return default
+
+
+def _random_config(rng, default):
+    values = [1, 2.5, 'x', 'a', 'c', 'C', [1], {}, {'z': 1}, None, True,
+              '_int_', '_list_', '_enum[a, b,C]_']
+    config = {}
+    for key, default_value in default.items():
+        r = rng.random()
+        if r < 0.15:
+            continue
+        elif isinstance(default_value, dict) and r < 0.8:
+            config[key] = _random_config(rng, default_value)
+        else:
+            config[key] = rng.choice(values)
+    if rng.random() < 0.3:
+        config['extra'] = 1
+    return config
+
+
+def _outcome(extend):
+    try:
+        return 'ok', extend()
+    except ConfigError as e:
+        return 'error', str(e)
+
+
+def test_compiled_schema_matches():
+    import random
+    rng = random.Random(0)
+    outcomes = set()
+    for _ in range(300):
+        default = _random_default(rng)
+        schema = compile_schema(default)
+        for _ in range(10):
+            config = _random_config(rng, default)
+            expected = _outcome(
+                lambda: extend_config(copy.deepcopy(config), default))
+            assert _outcome(
+                lambda: extend_config(copy.deepcopy(config), schema)) == expected
+            assert _outcome(lambda: Config(copy.deepcopy(config)).extend(
+                schema)) == _outcome(lambda: Config(copy.deepcopy(config))
+                                     .extend(default))
+            outcomes.add(expected[0])
+    assert outcomes == {'ok', 'error'}
+
+
+def test_compiled_schema(C, C_extended):
+    schema = compile_schema(C)
+    config = {'redis': {'ps': {'host': {'s': 2}, 'port': [1, 2],
+                               'single': 'one-value'}}}
+    assert schema.extend(config) is config
+    assert config == C_extended
+    with pytest_print_raises(ConfigError):
+        schema.extend({'redis': {'ps': {'host': 3, 'port': [1, 2]}}})
+    # Config nodes get their own copies of the defaults
+    schema = compile_schema({'a': {'b': [1, {'c': 2}]}, 'd': {'e': 3}})
+    config1, config2 = Config(), Config()
+    config1.extend(schema)
+    config2.extend(schema)
+    assert type(config1.d) is Config and type(config1.a.b[1]) is Config
+    config1.a.b[1].c = 5
+    config1.d.e = 6
+    assert config2.a.b[1].c == 2 and config2.d.e == 3
+    assert schema.default_config == {'a': {'b': [1, {'c': 2}]}, 'd': {'e': 3}}
+
+
+def test_collect_errors(C):
+    config = {
+        'redis': {'ps': {'host': 'a', 'port': 3, 'single': [1]}},
+        'job': 4,
+    }
+    default = dict(C, job={'lr': '_float_'})
+    with pytest.raises(ConfigErrors) as exc:
+        extend_config(copy.deepcopy(config), default, collect=True)
+    paths = [path for path, _ in exc.value.errors]
+    assert paths == ['redis.ps.host', 'redis.ps.port', 'redis.ps.single',
+                     'job']
+    # the first collected error is the one a fail-fast extend raises
+    with pytest.raises(ConfigError) as first:
+        extend_config(copy.deepcopy(config), default)
+    assert exc.value.errors[0][1] == str(first.value)
+    assert isinstance(exc.value, ConfigError)
+
+    schema = compile_schema(default)
+    with pytest.raises(ConfigErrors) as from_schema:
+        Config(copy.deepcopy(config)).extend(schema, collect=True)
+    assert from_schema.value.errors == exc.value.errors
+
+
+def test_collect_matches_fail_fast():
+    import random
+    rng = random.Random(1)
+    for _ in range(200):
+        default = _random_default(rng)
+        schema = compile_schema(default)
+        config = _random_config(rng, default)
+        expected = _outcome(
+            lambda: extend_config(copy.deepcopy(config), default))
+        for target in default, schema:
+            try:
+                result = ('ok', extend_config(copy.deepcopy(config), target,
+                                              collect=True))
+            except ConfigErrors as e:
+                result = ('error', e.errors[0][1])
+            assert result == expected
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_extend_configs(C, C_extended, workers):
+    good = {'redis': {'ps': {'host': {'s': 2}, 'port': [1, 2],
+                             'single': 'one-value'}}}
+    bad = {'redis': {'ps': {'host': 3, 'port': 'x'}}}
+    configs = [copy.deepcopy(good if i % 3 else bad) for i in range(10)]
+    results = extend_configs(configs, C, workers=workers, chunksize=3)
+    assert len(results) == 10
+    for i, result in enumerate(results):
+        if i % 3:
+            assert type(result) is Config and result == C_extended
+        else:
+            assert type(result) is ConfigError
+    results = extend_configs([bad], compile_schema(C), workers=workers,
+                             collect=True)
+    assert isinstance(results[0], ConfigErrors)
+    assert len(results[0].errors) == 3
+    results = extend_configs([copy.deepcopy(good)], C, workers=workers,
+                             as_config=False)
+    assert type(results[0]) is dict and results[0] == C_extended
+
+
+def test_from_overrides():
+    default = {
+        'learner': {'lr': '_float_', 'steps': '_int_', 'use_gpu': '_bool_',
+                    'mode': '_enum[train, eval]_', 'batch': 32,
+                    'sizes': [64, 64], 'name': 'x'},
+        'maxEpisodes': 10,
+    }
+    config = Config.from_overrides(
+        default,
+        argv=['--learner.lr=1e-3', '--learner.steps', '100',
+              '--learner.use_gpu', '--learner.sizes=[8, 16]',
+              '--learner.name', '007', '--extra.depth=3'],
+        env_prefix='APP',
+        environ={'APP__LEARNER__LR': '0.5', 'APP__LEARNER__MODE': 'eval',
+                 'APP__MAXEPISODES': '20', 'APP__LEARNER__BATCH': '64',
+                 'OTHER__X': '1'},
+        config={'learner': {'steps': 5}},
+    )
+    assert type(config) is Config
+    assert config.to_dict() == {
+        'learner': {'lr': 1e-3, 'steps': 100, 'use_gpu': True,
+                    'mode': 'eval', 'batch': 64, 'sizes': [8, 16],
+                    'name': '007'},
+        'maxEpisodes': 20,
+        'extra': {'depth': 3},
+    }
+    assert config.learner.sizes == [8, 16]
+
+
+def test_from_overrides_errors():
+    default = {'learner': {'lr': '_float_', 'mode': '_enum[train, eval]_'}}
+    argv = ['--learner.lr=fast', '--learner.mode=test']
+    with pytest.raises(ConfigError, match='must be a float'):
+        Config.from_overrides(default, argv)
+    with pytest.raises(ConfigErrors) as exc:
+        Config.from_overrides(default, argv, collect=True)
+    assert [path for path, _ in exc.value.errors] == ['learner.lr',
+                                                      'learner.mode']
+    with pytest.raises(ConfigError, match='conflicts'):
+        Config.from_overrides(default, ['--learner=1', '--learner.lr=1'])
+    with pytest.raises(ConfigError, match='cannot parse'):
+        Config.from_overrides(default, ['learner.lr=1'])
+    default = {'learner': {'bs': 32, 'gpu': False}}
+    with pytest.raises(ConfigError, match='"learner.bs=64.0" must be int'):
+        Config.from_overrides(default, ['--learner.bs=64.0'])
+    with pytest.raises(ConfigError, match='"learner.gpu=maybe" must be bool'):
+        Config.from_overrides(default, ['--learner.gpu=maybe'])
+
+
+def test_builtin_markers():
+    default = {'sizes': '_list[int]_', 'ratio': '_range[0, 1]_',
+               'root': '_path_', 'probs': '_list[range[0,1]]_'}
+    config = {'sizes': [1, 2], 'ratio': 0.5, 'root': '/tmp',
+              'probs': [0, 0.5, 1]}
+    assert extend_config(dict(config), default) == config
+    for key, value, message in [
+            ('sizes', [1, 'x'], 'list with each element an integer'),
+            ('sizes', (1, 2), 'list with each element an integer'),
+            ('ratio', 1.5, 'a number in \\[0, 1\\]'),
+            ('root', 3, 'a path'),
+            ('probs', [0.5, 2], 'each element a number in')]:
+        with pytest.raises(ConfigError, match=message):
+            extend_config(dict(config, **{key: value}), default)
+        with pytest.raises(ConfigError, match=message):
+            compile_schema(default).extend(dict(config, **{key: value}))
+    with pytest.raises(ConfigError):
+        extend_config({'a': 1}, {'a': '_list[nothing]_'})
+    overrides = Config.from_overrides(
+        default, ['--sizes=[3, 4]', '--ratio=1', '--root=123',
+                  '--probs=[0.1]'])
+    assert overrides.root == '123' and overrides.sizes == [3, 4]
+
+
+def test_register_marker():
+    register_marker('port', lambda x: isinstance(x, int) and 0 < x < 65536,
+                    'a port number', parse=int)
+    register_marker(
+        'prefix', lambda args: (lambda x: str(x).startswith(args),
+                                'prefixed by ' + args),
+        parametrized=True)
+    try:
+        default = {'port': '_port_', 'name': '_PREFIX[job-]_'}
+        config = extend_config({'port': 80, 'name': 'job-1'}, default)
+        assert config.port == 80
+        with pytest.raises(ConfigError, match='must be a port number'):
+            extend_config({'port': 0, 'name': 'job-1'}, default)
+        with pytest.raises(ConfigError, match='must be prefixed by job-'):
+            compile_schema(default).extend({'port': 1, 'name': 'x'})
+        assert Config.from_overrides(default, ['--port=8080', '--name=job-2'],
+                                     ).port == 8080
+    finally:
+        removed = [unregister_marker('port'),
+                   unregister_marker('prefix', parametrized=True)]
+    assert removed == [True, True]
+    # plain values again, also for the parsed markers cached before
+    assert extend_config({}, default) == default
+    assert not unregister_marker('port')
+
+
+def test_extended(C, C_extended):
+    config = Config({'redis': {'ps': {'host': {'s': 2}, 'port': [1, 2],
+                                      'single': 'one-value'}},
+                     'extra': {'a': [{'b': 1}]}})
+    before = config.to_dict()
+    default_before = C.to_dict()
+    result = config.extended(C)
+    assert type(result) is Config
+    assert result.to_dict() == dict(C_extended,
+                                    extra={'a': [{'b': 1}]})
+    assert config.to_dict() == before and C.to_dict() == default_before
+    # untouched subtrees are shared with both inputs
+    assert result.log is C.log
+    assert result.redis.replay is C.redis.replay
+    assert result.redis.ps is config.redis.ps
+    assert result.extra is config.extra
+    assert result.redis is not config.redis
+    # nothing to fill: still a new root node
+    again = result.extended(C)
+    assert again is not result and again == result
+    again.log = 'changed'
+    again.extra = 1
+    assert result.log is C.log and result.extra is config.extra
+
+    plain = {'redis': {'ps': {'host': {}, 'port': [{'x': 1}],
+                              'single': 1}}}
+    result = extended_config(plain, compile_schema(C))
+    assert isinstance(result.redis.ps.port[0], Config)
+    assert 'replay' not in plain['redis']
+    with pytest.raises(ConfigError, match='must be a list'):
+        extended_config({'redis': {'ps': {'host': {}, 'port': 1}}}, C)
+
+
+def test_extended_matches():
+    import random
+    rng = random.Random(2)
+    for _ in range(300):
+        default = _random_default(rng)
+        config = _random_config(rng, default)
+        snapshot = copy.deepcopy(config)
+        expected = _outcome(
+            lambda: extend_config(copy.deepcopy(config), default))
+        result = _outcome(lambda: extended_config(config, default))
+        if result[0] == 'ok':
+            result = 'ok', result[1].to_dict()
+            expected = 'ok', expected[1].to_dict()
+        assert result == expected
+        assert config == snapshot
+
+
+def test_missing_key_probe(C):
+    assert not hasattr(C.redis, 'badkey') and hasattr(C.redis, 'replay')
+    assert getattr(C.redis, 'badkey', None) is None
+    assert getattr(C.redis.replay, 'port', None) == 6379
+    with pytest.raises(AttributeError) as exc:
+        C.redis.badkey
+    assert isinstance(exc.value, ConfigError)
+    assert str(exc.value) == 'config key "badkey" missing.'
+    assert exc.value.key == 'badkey'
+    import pickle
+    assert str(pickle.loads(pickle.dumps(exc.value))) == str(exc.value)
+    # copy probes __deepcopy__ with getattr(x, name, None)
+    assert copy.deepcopy(C) == C
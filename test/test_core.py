@@ -1,6 +1,9 @@
+import gc
 import pytest
 import pickle
+import weakref
 from benedict import *
+import os
 import sys
 
 
@@ -182,3 +185,272 @@ def test_ordered_insert(Dtype):
         assert D_items == O_items
 
 
+def test_load_builds_nodes(Dtype):
+    yaml_str = 'a: {b: [1, {c: 2}]}\nz: 3\ny: {x: 1}\n'
+    json_str = '{"a": {"b": [1, {"c": 2}]}, "z": 3, "y": {"x": 1}}'
+    for D in [Dtype.load_yaml_str(yaml_str), Dtype.load_json_str(json_str)]:
+        assert type(D) is Dtype
+        assert type(D.a) is Dtype
+        assert type(D.a.b[1]) is Dtype
+        assert D.a.b[1].c == 2
+        assert list(D.keys()) == ['a', 'z', 'y']
+        D_copy = D.deepcopy()
+        D_copy.a.b[1].c = 5
+        assert D.a.b[1].c == 2
+    with pytest.raises(ValueError):
+        Dtype.load_json_str('{"a": {"builtin_items": 1}}')
+
+
+def test_load_yaml_aliases(Dtype):
+    D = Dtype.load_yaml_str('a: &x {k: 1, l: [{m: 2}]}\nb: *x\nc: [*x]\n')
+    assert D.a == D.b == D.c[0]
+    assert D.a is not D.b and D.a.l is not D.b.l and D.b is not D.c[0]
+    D.a.k = 5
+    D.a.l[0].m = 6
+    assert D.b.k == 1 and D.c[0].l[0].m == 2
+
+
+def test_stream(Dtype, tmp_path):
+    records = [{'step': i, 'stats': {'loss': 1.0 / (i + 1)}} for i in range(7)]
+    for ext in ['.jsonl', '.yml']:
+        file_path = str(tmp_path / ('records' + ext))
+        Dtype.dump_stream((Dtype(r) for r in records), file_path)
+        loaded = list(Dtype.iter_file(file_path))
+        assert loaded == records
+        assert all(type(r.stats) is Dtype for r in loaded)
+        batches = list(Dtype.iter_file(file_path, batch_size=3))
+        assert [len(b) for b in batches] == [3, 3, 1]
+        assert type(batches[-1][0]) is Dtype
+    with pytest.raises(IOError):
+        Dtype.dump_stream(records, str(tmp_path / 'records.json'))
+    with pytest.raises(IOError):
+        Dtype.iter_file(str(tmp_path / 'missing.jsonl'))
+    with pytest.raises(IOError):
+        Dtype.iter_file(str(tmp_path / 'records.txt'))
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_load_many(Dtype, executor, tmp_path):
+    file_paths = []
+    for i in range(10):
+        file_path = str(tmp_path / 'spec{}.{}'.format(i, ['json', 'yml'][i % 2]))
+        Dtype({'task': i, 'sub': {'x': i}}).dump_file(file_path)
+        file_paths.append(file_path)
+    bad_path = str(tmp_path / 'corrupt.json')
+    with open(bad_path, 'w') as fp:
+        fp.write('{"task": ')
+    file_paths.insert(3, bad_path)
+    results = list(Dtype.load_many(file_paths, workers=2, executor=executor))
+    assert [r.file_path for r in results] == file_paths
+    assert isinstance(results[3].error, ValueError)
+    loaded = [r.data for r in results if r.error is None]
+    assert [d.task for d in loaded] == list(range(10))
+    assert all(type(d.sub) is Dtype for d in loaded)
+    results = Dtype.load_many(file_paths, workers=2, executor=executor,
+                              as_completed=True, chunksize=1)
+    assert sorted(r.file_path for r in results) == sorted(file_paths)
+    missing = str(tmp_path / 'missing.yml')
+    results = list(Dtype.load_many([missing] + file_paths, executor=executor))
+    assert isinstance(results[0].error, FileNotFoundError)
+    assert [r.data.task for r in results[1:] if r.error is None] \
+        == list(range(10))
+    with pytest.raises(IOError):
+        Dtype.load_many(file_paths + [str(tmp_path / 'spec.txt')],
+                        executor=executor)
+    with pytest.raises(ValueError):
+        Dtype.load_many(file_paths, executor='fiber')
+
+
+def test_load_cache(Dtype, tmp_path):
+    file_path = str(tmp_path / 'shared.yml')
+    Dtype({'a': {'b': 1}}).dump_file(file_path)
+    cache = LoadCache(max_entries=2)
+    D1 = Dtype.load_file(file_path, cache=cache)
+    D1.a.b = 'corrupted'
+    D2 = Dtype.load_file(file_path, cache=cache)
+    assert type(D2.a) is Dtype
+    assert D2.a.b == 1
+    assert cache.stats.hits == 1 and cache.stats.misses == 1
+    # file changes on disk: size differs, so the entry is stale
+    Dtype({'a': {'b': 100}}).dump_file(file_path)
+    assert Dtype.load_file(file_path, cache=cache).a.b == 100
+    assert cache.stats.misses == 2
+    for i in range(3):
+        other_path = str(tmp_path / 'other{}.json'.format(i))
+        Dtype({'i': i}).dump_file(other_path)
+        Dtype.load_file(other_path, cache=cache)
+    assert cache.stats.entries == 2
+    assert cache.stats.evictions == 2
+    cache.invalidate(other_path)
+    assert cache.stats.entries == 1
+    cache.invalidate()
+    assert cache.stats.entries == 0 and cache.stats.bytes == 0
+
+
+def test_async(Dtype, tmp_path):
+    import asyncio
+
+    async def roundtrip(i):
+        file_path = str(tmp_path / 'async{}.{}'.format(i, ['json', 'yml'][i % 2]))
+        await Dtype({'i': i, 'sub': {'x': [i]}}).adump_file(file_path)
+        return await Dtype.aload_file(file_path)
+
+    async def main():
+        return await asyncio.gather(*[roundtrip(i) for i in range(6)])
+
+    set_async_limit(2)
+    try:
+        loaded = asyncio.run(main())
+        assert [D.sub.x[0] for D in loaded] == list(range(6))
+        assert all(type(D.sub) is Dtype for D in loaded)
+    finally:
+        set_async_limit(8)
+
+
+@pytest.mark.parametrize('ext', ['.pkl', '.marshal'])
+def test_binary_formats(Dtype, ext, tmp_path):
+    D = Dtype(TESTDICT)
+    file_path = str(tmp_path / ('state' + ext))
+    D.dump_file(file_path)
+    D_loaded = Dtype.load_file(file_path)
+    assert D_loaded == D
+    assert type(D_loaded.b0.c1[3][-15]) is Dtype
+    assert list(D_loaded.b0.keys()) == list(D.b0.keys())
+
+
+@pytest.mark.parametrize('ext', ['.json.gz', '.yaml.xz', '.yml.bz2',
+                                 '.pkl.gz', '.marshal.xz'])
+def test_compressed(Dtype, ext, tmp_path):
+    D = Dtype({'a0': [{'a1': 2}], 'b0': {'c1': 'x' * 1000, 'd1': {'e2': 1}}})
+    file_path = str(tmp_path / ('state' + ext))
+    D.dump_file(file_path, atomic=True, compresslevel=1)
+    assert os.path.getsize(file_path) < 1000
+    D_loaded = Dtype.load_file(file_path)
+    assert D_loaded == D
+    assert type(D_loaded.b0.d1) is Dtype
+    assert D.dump_file(file_path, skip_unchanged=True).bytes_written == 0
+
+
+def test_compressed_stream(Dtype, tmp_path):
+    file_path = str(tmp_path / 'events.jsonl.bz2')
+    Dtype.dump_stream(({'step': i} for i in range(100)), file_path)
+    assert [r.step for r in Dtype.iter_file(file_path)] == list(range(100))
+
+
+@pytest.mark.parametrize('backend', available_json_backends())
+def test_json_backend(Dtype, backend):
+    D = Dtype({'b0': {'z': 1, 'a': [{'c': 2}], 'items': 3}, 'a0': 'x'})
+    s = D.dump_json_str(json_backend=backend)
+    D_loaded = Dtype.load_json_str(s, json_backend=backend)
+    assert D_loaded == D
+    assert list(D_loaded.b0.keys()) == list(D.b0.keys())
+    assert type(D_loaded.b0.a[0]) is Dtype
+
+
+def test_yaml_sidecar(Dtype, tmp_path):
+    cache = data_format.SidecarCache(str(tmp_path / 'cache'))
+    D = Dtype({'z': 1, 'b0': {'y': [{'x': 2}], 'a': 3}})
+    file_path = str(tmp_path / 'config.yaml')
+    D.dump_file(file_path)
+    keys = list(Dtype.load_file(file_path).b0.keys())
+    for _ in range(2):
+        D_loaded = Dtype.load_file(file_path, sidecar=cache)
+        assert D_loaded == D
+        assert list(D_loaded.b0.keys()) == keys
+        assert type(D_loaded.b0.y[0]) is Dtype
+    assert len(os.listdir(cache.cache_dir)) == 1
+
+
+@pytest.mark.parametrize('ext', ['.json', '.yml'])
+def test_select(Dtype, ext, tmp_path):
+    D = Dtype({'learner': {'optimizer': {'lr': 0.1, 'steps': [{'n': 1}]}},
+               'other': list(range(10))})
+    file_path = str(tmp_path / ('experiment' + ext))
+    D.dump_file(file_path)
+    optimizer = Dtype.load_file(file_path, select='learner.optimizer')
+    assert type(optimizer) is Dtype
+    assert optimizer == D.learner.optimizer
+    steps = Dtype.load_file(file_path, select='learner.optimizer.steps')
+    assert type(steps[0]) is Dtype and steps[0].n == 1
+    assert Dtype.load_file(file_path, select='other.3') == 3
+
+
+def test_streaming_json_dump(Dtype, tmp_path):
+    D = Dtype(TESTDICT)
+    file_path = str(tmp_path / 'state.json')
+    progress = []
+    D.dump_json_file(file_path, json_backend='json', progress=progress.append)
+    with open(file_path) as fp:
+        assert fp.read() == json.dumps(D.to_dict(), indent=4)
+    assert progress
+
+
+def test_fingerprint(Dtype):
+    D = Dtype(TESTDICT)
+    fingerprint = D.fingerprint()
+    assert len(fingerprint) == 128  # blake2b hex
+    assert Dtype(TESTDICT).fingerprint() == fingerprint
+    assert benedict_fingerprint(D) == fingerprint
+    assert D.builtin_fingerprint('sha256') == D.fingerprint('sha256') \
+        != fingerprint
+    reordered = Dtype(list(reversed(list(TESTDICT.items()))))
+    if issubclass(Dtype, OrderedBeneDict):
+        assert reordered.fingerprint() != fingerprint
+    else:
+        assert reordered.fingerprint() == fingerprint
+    # the per-node caches follow every kind of mutation
+    D.b0.d1.e2 = 100.0
+    assert D.fingerprint() == fingerprint
+    D.b0.d1.e2 = 101
+    changed = D.fingerprint()
+    assert changed != fingerprint
+    D.b0.d1.builtin_update({'e2': 100})
+    assert D.fingerprint() == fingerprint
+    D.b0.c1[0].a2 = 12
+    assert D.fingerprint() not in (changed, fingerprint)
+    D.b0.c1[0].builtin_pop('a2')
+    D.b0.c1[0].a2 = 11
+    assert D.fingerprint() == fingerprint
+    D.a0.append(1)
+    assert D.fingerprint() != fingerprint
+    if issubclass(Dtype, OrderedBeneDict):
+        D.a0.pop()
+        D.b0.move_to_end('d1')
+        assert D.fingerprint() != fingerprint
+    assert Dtype({'a': [1]}).fingerprint() != Dtype({'a': (1,)}).fingerprint()
+    assert Dtype({'a': True}).fingerprint() != Dtype({'a': 1}).fingerprint()
+    with pytest.raises(TypeError):
+        Dtype({'a': object()}).fingerprint()
+
+
+def test_fingerprint_cache(Dtype):
+    D = Dtype({'a': {'c': [1, {'d': 2}], 'b': 1}, 'e': {'f': 3}})
+    fingerprint = D.fingerprint()
+    # the cache lives outside of the nodes, so any key is fine
+    assert set(vars(D)) == {'a', 'e'}
+    assert Dtype({'_benedict_fingerprints': 1}).fingerprint() \
+        != Dtype({'_benedict_fingerprints': 2}).fingerprint()
+    del D.a['b']
+    assert D.fingerprint() != fingerprint
+    D.a.setdefault('b', 1)
+    assert D.fingerprint() == fingerprint
+    D.a.c[1].d = 3
+    assert D.fingerprint() != fingerprint
+    D.a.c[1].builtin_update(d=2)
+    assert D.fingerprint() == fingerprint
+    D.e.clear()
+    assert D.fingerprint() != fingerprint
+    D.e.f = 3
+    assert D.fingerprint() == fingerprint
+    # a node shared by two parents invalidates both
+    shared = Dtype({'x': 1})
+    D.a.c.append(shared)
+    D.e.f = [shared]
+    changed = D.fingerprint()
+    shared.x = 2
+    assert D.fingerprint() != changed
+    # and is dropped with the nodes
+    ref = weakref.ref(shared)
+    del D, shared
+    gc.collect()
+    assert ref() is None
@@ -1,4 +1,7 @@
+import os
+import pytest
 from benedict.data_format import *
+from benedict.data_format import _ordered_loader_class, _ordered_dumper_class
 
 
 D = OrderedDict(
@@ -25,3 +28,265 @@ def test_json():
     print(load_json_file(fpath))
     assert ordered_load_json_file(fpath) == D
 
+
+def test_ordered_yaml_classes_cached():
+    ordered_load_yaml_str(ordered_dump_yaml_str(D))
+    n_loaders = _ordered_loader_class.cache_info().currsize
+    n_dumpers = _ordered_dumper_class.cache_info().currsize
+    ordered_load_yaml_str(ordered_dump_yaml_str(D))
+    assert _ordered_loader_class.cache_info().currsize == n_loaders
+    assert _ordered_dumper_class.cache_info().currsize == n_dumpers
+
+
+def test_stream(tmp_path):
+    records = [D, OrderedDict([('b', 1), ('a', [1, 2])])]
+    for ext in ['.jsonl', '.yaml']:
+        fpath = str(tmp_path / ('stream' + ext))
+        ordered_dump_stream(iter(records), fpath)
+        loaded = list(ordered_iter_file(fpath))
+        assert loaded == records
+        assert [list(r.keys()) for r in loaded] == [list(r.keys()) for r in records]
+        assert list(iter_file(fpath, batch_size=5)) == [records]
+    with pytest.raises(IOError):
+        iter_file(str(tmp_path / 'missing.jsonl'))
+
+
+def test_atomic_skip_unchanged(tmp_path):
+    fpath = str(tmp_path / 'checkpoint.json')
+    reset_dump_stats()
+    stats = dump_json_file(D, fpath, atomic=True, skip_unchanged=True)
+    assert stats.bytes_written == os.path.getsize(fpath) > 0
+    assert stats.bytes_skipped == 0
+    stats = dump_file(D, fpath, atomic=True, skip_unchanged=True)
+    assert stats == DumpStats(0, os.path.getsize(fpath))
+    assert dump_stats() == DumpStats(stats.bytes_skipped, stats.bytes_skipped)
+    D2 = OrderedDict(D, extra=1)
+    assert dump_file(D2, fpath, skip_unchanged=True).bytes_written > 0
+    assert ordered_load_json_file(fpath) == D2
+
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        dump_yaml_file(D, fpath, atomic=True, dumper=crash)
+    assert ordered_load_json_file(fpath) == D2
+    assert os.listdir(str(tmp_path)) == ['checkpoint.json']
+
+
+def test_atomic_file_mode(tmp_path):
+    umask = os.umask(0)
+    os.umask(umask)
+    fpath = str(tmp_path / 'new.json')
+    dump_json_file(D, fpath, atomic=True)
+    assert os.stat(fpath).st_mode & 0o777 == 0o666 & ~umask
+    os.chmod(fpath, 0o600)
+    dump_json_file({}, fpath, atomic=True)
+    assert os.stat(fpath).st_mode & 0o777 == 0o600
+
+
+def test_register_format(tmp_path):
+    calls = []
+
+    def load_upper(file_path, object_pairs_hook=dict):
+        calls.append('load')
+        return load_json_file(file_path, object_pairs_hook=object_pairs_hook)
+
+    register_format('.up.json', load=load_upper, dump=dump_json_file)
+    try:
+        fpath = str(tmp_path / 'config.up.json')
+        dump_file(D, fpath)
+        assert ordered_load_file(fpath) == D
+        assert calls == ['load']
+        # the shorter ".json" suffix still applies to other files
+        fpath = str(tmp_path / 'config.json')
+        dump_file(D, fpath)
+        assert ordered_load_file(fpath) == D
+        assert calls == ['load']
+        with pytest.raises(IOError):
+            load_file(str(tmp_path / 'config.toml'))
+    finally:
+        removed = unregister_format('.up.json')
+    assert list(removed) == ['.up.json']
+    ordered_load_file(str(tmp_path / 'config.up.json'))  # by ".json" again
+    assert calls == ['load']
+
+
+@pytest.mark.parametrize('backend', available_json_backends())
+def test_json_backend(backend, tmp_path):
+    data = {'a': [1, 2.5, None, True], 'b': {'c': 'd', 'é': 'ü'}}
+    assert json.loads(dump_json_str({3: 'x'}, json_backend=backend)) == {'3': 'x'}
+    for kwargs in [{}, {'indent': 2}, {'sort_keys': True}, {'indent': 7}]:
+        s = dump_json_str(data, json_backend=backend, **kwargs)
+        assert json.loads(s) == data
+        assert load_json_str(s, json_backend=backend) == data
+    # order is kept through the stdlib fallback and by every backend
+    s = ordered_dump_json_str(D, json_backend=backend)
+    assert list(ordered_load_json_str(s, json_backend=backend)) == list(D)
+    moved = OrderedDict(D)
+    moved.move_to_end('z')
+    s = dump_json_str(moved, json_backend=backend)
+    assert list(ordered_load_json_str(s)) == list(moved)
+    # beyond 64 bits falls back to stdlib
+    assert load_json_str(dump_json_str({'n': 2**70}, json_backend=backend),
+                         json_backend=backend) == {'n': 2**70}
+    fpath = str(tmp_path / 'data.json')
+    dump_json_file(data, fpath, json_backend=backend, indent=2)
+    assert load_json_file(fpath, json_backend=backend) == data
+
+
+def test_set_json_backend():
+    data = {'a': 1, 'b': 'é', 'n': float('nan'), 'i': float('-inf')}
+    # the stdlib is the default, byte for byte
+    expected = '{"a": 1, "b": "\\u00e9", "n": NaN, "i": -Infinity}'
+    assert dump_json_str(data) == json.dumps(data) == expected
+    assert dump_json_str(data, sort_keys=True) == json.dumps(data, sort_keys=True)
+    try:
+        set_json_backend()
+        assert dump_json_str({'a': 1}) == \
+            dump_json_str({'a': 1}, json_backend=available_json_backends()[0])
+        # NaN and Infinity are kept through the stdlib fallback
+        assert repr(load_json_str(dump_json_str(data))) == repr(data)
+        with pytest.raises(ValueError):
+            set_json_backend('simdjson')
+    finally:
+        set_json_backend('json')
+    assert available_json_backends()[-1] == 'json'
+
+
+def test_yaml_sidecar(tmp_path):
+    cache = SidecarCache(str(tmp_path / 'cache'), max_bytes=None)
+    fpath = str(tmp_path / 'config.yml')
+    ordered_dump_yaml_file(D, fpath)
+    calls = []
+
+    def loader(stream, **kwargs):
+        calls.append(1)
+        return yaml.safe_load(stream, **kwargs)
+
+    assert load_yaml_file(fpath, loader=loader, sidecar=cache) == D
+    assert load_yaml_file(fpath, loader=loader, sidecar=cache) == D
+    assert len(calls) == 1
+    # ordered variant keeps its own sidecar, and the key order
+    loaded = ordered_load_yaml_file(fpath, sidecar=cache)
+    assert type(loaded) is OrderedDict and list(loaded) == list(D)
+    loaded = ordered_load_yaml_file(fpath, sidecar=cache)
+    assert type(loaded) is OrderedDict and list(loaded) == list(D)
+    assert list(load_yaml_file(fpath, sidecar=cache,
+                               object_pairs_hook=OrderedDict)) == list(D)
+    # touched but unchanged content: still a hit
+    os.utime(fpath, ns=(0, 0))
+    assert load_yaml_file(fpath, loader=loader, sidecar=cache) == D
+    assert len(calls) == 1
+    # changed content
+    dump_yaml_file({'a': 1}, fpath)
+    assert load_yaml_file(fpath, loader=loader, sidecar=cache) == {'a': 1}
+    assert len(calls) == 2
+    # per-call bypass of the global cache
+    try:
+        set_yaml_sidecar_cache(cache)
+        assert load_yaml_file(fpath, loader=loader) == {'a': 1}
+        assert len(calls) == 2
+        assert load_yaml_file(fpath, loader=loader, sidecar=False) == {'a': 1}
+        assert len(calls) == 3
+    finally:
+        set_yaml_sidecar_cache(None)
+    # corrupt sidecar is rebuilt
+    for name in os.listdir(cache.cache_dir):
+        with open(os.path.join(cache.cache_dir, name), 'wb') as fp:
+            fp.write(b'garbage')
+    assert load_yaml_file(fpath, loader=loader, sidecar=cache) == {'a': 1}
+    assert len(calls) == 4
+    # size cap
+    cache.max_bytes = 1
+    assert load_file(fpath, sidecar=cache) == {'a': 1}
+    assert cache.size <= 1
+    cache.max_bytes = None
+    load_file(fpath, sidecar=cache)
+    assert cache.size > 0
+    cache.clear()
+    assert cache.size == 0
+
+
+SELECT_DATA = {
+    'a': {'x': [1, {'q': 's"}{[\\', 'r': [2]}], 'é"k': 5},
+    'learner': {'optimizer': {'lr': 0.1, 'betas': [0.9, 0.99]}, 'z': None},
+    'l': [10, [20, 21], {'m': 3}],
+}
+
+
+@pytest.mark.parametrize('ext', ['.json', '.json.gz', '.yml', '.pkl'])
+def test_select(ext, tmp_path):
+    fpath = str(tmp_path / ('experiment' + ext))
+    dump_file(SELECT_DATA, fpath)
+    for select, expected in [
+        ('learner.optimizer', SELECT_DATA['learner']['optimizer']),
+        ('learner.z', None),
+        ('a.x.1.q', 's"}{[\\'),
+        (['a', 'é"k'], 5),
+        ('l.1.1', 21),
+        ('l.2', {'m': 3}),
+    ]:
+        assert load_file(fpath, select=select) == expected
+    optimizer = ordered_load_file(fpath, select='learner.optimizer')
+    assert type(optimizer) is OrderedDict
+    assert list(optimizer) == list(ordered_load_file(fpath)['learner']['optimizer'])
+    for select in ['nope', 'a.x.5', 'learner.optimizer.lr.q', 'l.x']:
+        with pytest.raises(KeyError):
+            load_file(fpath, select=select)
+
+
+def test_select_yaml_anchors(tmp_path):
+    fpath = str(tmp_path / 'experiment.yml')
+    with open(fpath, 'w') as fp:
+        fp.write('base: &base {lr: 0.1, b: [1, 2]}\n'
+                 'learner:\n'
+                 '  optimizer: {<<: *base, lr: 0.2}\n'
+                 '  own: &own {x: 1}\n'
+                 '  copy: *own\n'
+                 '  merged: {<<: *base}\n'
+                 'ptr: *base\n')
+    full = load_file(fpath)
+    for select in ['learner.optimizer', 'learner.own', 'learner.copy',
+                   'learner.merged.lr', 'ptr.b.1']:
+        expected = full
+        for key in select.split('.'):
+            expected = expected[int(key)] if isinstance(expected, list) \
+                else expected[key]
+        assert load_file(fpath, select=select) == expected
+
+
+@pytest.mark.parametrize('ext', ['.json', '.yml'])
+def test_select_duplicate_keys(ext, tmp_path):
+    fpath = str(tmp_path / ('experiment' + ext))
+    with open(fpath, 'w') as fp:
+        if ext == '.json':
+            fp.write('{"b": {"c": 4, "d": 1}, "l": [{"x": 1}, 2], "e": 0,'
+                     ' "b": {"c": 5}, "l": [{"y": 2}]}')
+        else:
+            fp.write('b: {c: 4, d: 1}\nl: [{x: 1}, 2]\ne: 0\n'
+                     'b: {c: 5}\nl: [{y: 2}]\n')
+    full = load_file(fpath)
+    # the last occurrence wins, as in a full load
+    assert load_file(fpath, select='b.c') == full['b']['c'] == 5
+    assert load_file(fpath, select='l.0.y') == 2
+    assert load_file(fpath, select='e') == 0
+    for select in ['b.d', 'l.0.x', 'l.1']:
+        with pytest.raises(KeyError):
+            load_file(fpath, select=select)
+
+
+def test_streaming_json_dump(tmp_path):
+    data = {'a': [1, 2.5, float('nan'), None, True, (), {}],
+            'b': OrderedDict([('z', 'é'), ('y', {3: [{'x': []}]})]),
+            'c': 2**70}
+    fpath = str(tmp_path / 'state.json')
+    for kwargs in [{}, {'indent': None}, {'indent': '\t', 'sort_keys': False},
+                   {'ensure_ascii': False, 'separators': (',', ':')}]:
+        progress = []
+        dump_json_file(data, fpath, json_backend='json', buffering=16,
+                       progress=progress.append, **kwargs)
+        with open(fpath) as fp:
+            content = fp.read()
+        kwargs.setdefault('indent', 4)
+        assert content == json.dumps(data, **kwargs)
+        assert progress == sorted(progress) and progress[-1] == len(content)
+        assert len(progress) > 1
@@ -0,0 +1,75 @@
+import pytest
+from benedict import *
+
+
+@pytest.fixture
+def config():
+    return Config({
+        'learner': {'batch_size': 32, 'lr': 0.1,
+                    'optimizer': {'name': 'adam', 'lr': '${learner.lr}'}},
+        'replay': {'batch_size': '${learner.batch_size}',
+                   'name': 'replay-${learner.batch_size}-${replay.size}',
+                   'size': '${env:REPLAY_SIZE}'},
+        'copy': '${learner.optimizer}',
+        'items': [1, '${items.0}', {'x': '${learner.lr}'}],
+    })
+
+
+ENVIRON = {'REPLAY_SIZE': '100'}
+
+
+def test_resolve(config):
+    interpolation = Interpolation(config, ENVIRON)
+    # dependencies first, whatever the key order
+    order = interpolation.order
+    assert order.index(('replay', 'size')) < order.index(('replay', 'name'))
+    assert order.index(('learner', 'optimizer', 'lr')) \
+        < order.index(('copy',))
+    interpolation.resolve()
+    assert config.replay.batch_size == 32
+    assert config.replay.name == 'replay-32-100'
+    assert config.learner.optimizer.lr == 0.1
+    assert config.copy == {'name': 'adam', 'lr': 0.1}
+    assert isinstance(config.copy, Config)
+    assert config['items'][1] == 1 and config['items'][2]['x'] == 0.1
+
+
+def test_set(config):
+    interpolation = Interpolation(config, ENVIRON)
+    interpolation.resolve()
+    resolved = interpolation.set('learner.batch_size', 64)
+    assert sorted(resolved) == [('replay', 'batch_size'), ('replay', 'name')]
+    assert config.replay.name == 'replay-64-100'
+    resolved = interpolation.set('learner.lr', 0.5)
+    assert set(resolved) == {('learner', 'optimizer', 'lr'), ('copy',),
+                             ('items', 2, 'x')}
+    assert resolved.index(('learner', 'optimizer', 'lr')) \
+        < resolved.index(('copy',))
+    assert config.copy.lr == 0.5 and config['items'][2]['x'] == 0.5
+    assert interpolation.set('replay.size', 7) == [('replay', 'name')]
+    assert config.replay.name == 'replay-64-7'
+    assert interpolation.set('replay.size', '${learner.lr}') \
+        == [('replay', 'size'), ('replay', 'name')]
+    assert config.replay.name == 'replay-64-0.5'
+    assert interpolation.set('learner.name', 'x') == []
+
+
+def test_errors():
+    with pytest.raises(ConfigError, match='cycle: a -> b.c -> a'):
+        interpolate({'a': '${b.c}', 'b': {'c': '${a}'}})
+    with pytest.raises(ConfigError, match='cycle'):
+        interpolate({'a': {'b': '${a}'}})
+    with pytest.raises(ConfigError, match='"\\${b}" not found'):
+        interpolate({'a': '${b}'})
+    with pytest.raises(ConfigError, match='NOPE not set'):
+        interpolate({'a': '${env:NOPE}'}, environ={})
+
+
+def test_loaded(tmp_path):
+    file_path = str(tmp_path / 'config.yml')
+    with open(file_path, 'w') as fp:
+        fp.write('a: {b: 2}\nc: "${a.b}"\nd: "${c}0"\n')
+    assert interpolate(load_file(file_path)) == {'a': {'b': 2}, 'c': 2,
+                                                 'd': '20'}
+    config = interpolate(Config.load_file(file_path))
+    assert config.d == '20'
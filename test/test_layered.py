@@ -0,0 +1,95 @@
+import pytest
+from benedict import *
+
+
+@pytest.fixture
+def layers():
+    defaults = BeneDict({
+        'learner': {'lr': 0.1, 'optimizer': {'name': 'adam', 'eps': 1e-8}},
+        'workers': 4,
+        'tags': ['a'],
+    })
+    tenant = BeneDict({'learner': {'optimizer': {'eps': 1e-6}}, 'workers': 8})
+    request = BeneDict({'learner': {'lr': 0.5}})
+    return request, tenant, defaults
+
+
+def test_resolution(layers):
+    request, tenant, defaults = layers
+    config = LayeredConfig(tenant, defaults).new_child(request)
+    assert config.learner.lr == 0.5
+    assert config.learner.optimizer.eps == 1e-6
+    assert config.learner.optimizer.name == 'adam'
+    assert config.workers == 8
+    assert config['tags'] == ['a']
+    assert config.learner is config.learner  # cached
+    assert list(config) == ['learner', 'workers', 'tags']
+    assert len(config.learner) == 2 and 'lr' in config.learner
+    assert config.to_dict() == {
+        'learner': {'lr': 0.5, 'optimizer': {'name': 'adam', 'eps': 1e-6}},
+        'workers': 8,
+        'tags': ['a'],
+    }
+    with pytest.raises(ConfigError):
+        config.learner.missing
+    with pytest.raises(KeyError):
+        config['missing']
+
+
+def test_shadowing():
+    config = LayeredConfig({'a': 1}, {'a': {'b': 2}})
+    assert config.a == 1
+    config = LayeredConfig({'a': {'b': 2}}, {'a': 1}, {'a': {'c': 3}})
+    assert config.a.to_dict() == {'b': 2}
+
+
+def test_writes(layers):
+    request, tenant, defaults = layers
+    config = LayeredConfig(request, tenant, defaults)
+    assert config.workers == 8
+    config.workers = 2
+    assert config.workers == 2 and request.workers == 2
+    assert tenant.workers == 8
+    # nested writes go to the first layer, creating the path
+    assert config.learner.optimizer.name == 'adam'
+    config.learner.optimizer.name = 'sgd'
+    assert config.learner.optimizer.name == 'sgd'
+    assert request.learner.optimizer.name == 'sgd'
+    assert defaults.learner.optimizer.name == 'adam'
+    del config.learner.optimizer.name
+    assert config.learner.optimizer.name == 'adam'
+    assert 'name' not in vars(request.learner.optimizer)
+    with pytest.raises(KeyError):
+        del config['tags']  # only in a lower layer
+    # direct writes to a layer are seen without invalidate()
+    assert config.learner.lr == 0.5
+    tenant.learner.lr = 0.3
+    del request['learner']['lr']
+    assert config.learner.lr == 0.3
+    learner = config.learner
+    tenant.learner = {'lr': 0.2}  # replaces a sub-dict under the view
+    assert config.learner is not learner
+    assert config.learner.lr == 0.2 and config.learner.optimizer.eps == 1e-8
+    tenant.workers = {'n': 3}  # shadowed by the first layer
+    assert config.workers == 2
+
+
+def test_shared_base_layer():
+    base = {'lr': 1, 'opt': {'eps': 1}}
+    config = LayeredConfig({'a': 2}, base)
+    assert config.lr == 1 and config.opt.eps == 1
+    base['lr'] = 5
+    base['opt']['eps'] = 2
+    assert config.lr == 5 and config.opt.eps == 2
+    base['opt'] = 3
+    assert config.opt == 3
+
+
+def test_new_child_shares_layers(layers):
+    request, tenant, defaults = layers
+    base = LayeredConfig(tenant, defaults)
+    config = base.new_child()
+    assert config.maps[1] is tenant and config.maps[2] is defaults
+    config.workers = 1
+    assert config.workers == 1 and base.workers == 8
+    assert config.maps[0] == {'workers': 1}
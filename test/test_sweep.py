@@ -0,0 +1,62 @@
+import pytest
+from benedict import *
+
+
+@pytest.fixture
+def base():
+    return Config({
+        'learner': {'lr': '_grid[0.1, 0.01, 1e-3]_',
+                    'optimizer': {'name': '_grid[adam, sgd]_', 'eps': 1}},
+        'env': {'name': 'cartpole', 'wrappers': {'a': 1}},
+        'seeds': [1, 2],
+    })
+
+
+def test_grid(base):
+    configs = Sweep(base)
+    assert len(configs) == 6
+    expanded = [(c.learner.lr, c.learner.optimizer.name) for c in configs]
+    assert expanded == [(0.1, 'adam'), (0.1, 'sgd'), (0.01, 'adam'),
+                        (0.01, 'sgd'), (1e-3, 'adam'), (1e-3, 'sgd')]
+    assert [configs[n].to_dict() for n in range(6)] \
+        == [c.to_dict() for c in configs]
+    assert configs[-1].learner.lr == 1e-3
+    assert configs.overrides(3) == {'learner.lr': 0.01,
+                                    'learner.optimizer.name': 'sgd'}
+    config = configs[4]
+    assert type(config) is Config and type(config.learner) is Config
+    # unchanged subtrees are shared, the base config is untouched
+    assert config.env is base.env and config.seeds is base.seeds
+    assert config.learner is not base.learner
+    assert base.learner.lr == '_grid[0.1, 0.01, 1e-3]_'
+    with pytest.raises(IndexError):
+        configs[6]
+
+
+def test_modes(base):
+    configs = Sweep(base, lists=True)
+    assert len(configs) == 12 and configs[11].seeds == 2
+    with pytest.raises(ConfigError, match='as many options'):
+        Sweep(base, mode='zip')
+    base.learner.lr = '_grid[0.1, 0.01]_'
+    zipped = list(Sweep(base, mode='zip', lists=True))
+    assert [(c.learner.lr, c.learner.optimizer.name, c.seeds)
+            for c in zipped] == [(0.1, 'adam', 1), (0.01, 'sgd', 2)]
+    sampled = Sweep(base, mode='random', samples=3, seed=0)
+    assert len(sampled) == 3
+    assert len({tuple(sampled.indices(n)) for n in range(3)}) == 3
+    assert [c.to_dict() for c in sampled] \
+        == [c.to_dict() for c in Sweep(base, mode='random', samples=3,
+                                       seed=0)]
+    assert len(Sweep(base, mode='random', samples=10)) == 4
+
+
+def test_large_grid():
+    config = {'k{}'.format(i): '_grid[{}]_'.format(
+        ', '.join(map(str, range(10)))) for i in range(30)}
+    configs = sweep(config)
+    assert configs.size == 10 ** 30
+    last = configs[configs.size - 1]
+    assert all(last['k{}'.format(i)] == 9 for i in range(30))
+    assert configs[12345].k29 == 5 and configs[12345].k25 == 1
+    assert len(sweep(config, mode='random', samples=5)) == 5
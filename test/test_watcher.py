@@ -0,0 +1,121 @@
+import os
+import time
+import pytest
+from benedict import *
+
+
+DEFAULT = {
+    'learner': {'lr': '_float_', 'optimizer': 'adam', 'betas': [0.9, 0.99]},
+    'workers': 4,
+}
+
+
+def rewrite(file_path, data):
+    "bump the mtime so that quick successive writes are seen as changes"
+    stamp = os.stat(file_path).st_mtime_ns if os.path.exists(file_path) else 0
+    if isinstance(data, str):
+        with open(file_path, 'w') as fp:
+            fp.write(data)
+    else:
+        BeneDict(data).dump_file(file_path)
+    os.utime(file_path, ns=(stamp + 10**9, stamp + 10**9))
+
+
+@pytest.fixture
+def watched(tmp_path):
+    file_path = str(tmp_path / 'config.yml')
+    rewrite(file_path, {'learner': {'lr': 0.1}, 'extra': {'a': 1}})
+    config = Config.load_file(file_path)
+    config.extend(DEFAULT)
+    errors = []
+    watcher = ConfigWatcher(on_error=lambda f, e: errors.append(e),
+                            use_inotify=False)
+    watcher.watch(config, file_path, DEFAULT)
+    return watcher, config, file_path, errors
+
+
+def test_diff():
+    old = {'a': {'b': 1, 'c': [1]}, 'd': 1, 'e': {'f': 1}}
+    new = {'a': {'b': 1, 'c': [2]}, 'd': 1.0, 'e': 1, 'g': 2}
+    assert sorted(config_diff(old, new), key=str) == sorted([
+        (('a', 'c'), [1], [2]),
+        (('d',), 1, 1.0),
+        (('e',), {'f': 1}, 1),
+        (('g',), MISSING, 2),
+    ], key=str)
+    assert config_diff(old, old) == []
+
+
+def test_reload(watched):
+    watcher, config, file_path, errors = watched
+    optimizer_node = config.learner
+    seen = []
+    watcher.subscribe(seen.append, 'learner.lr')
+    everything = watcher.subscribe(lambda change: None)
+    assert watcher.check() == []
+
+    rewrite(file_path, {'learner': {'lr': 0.2}, 'extra': {'b': 2}})
+    changes = watcher.check()
+    assert {(c.path, c.old, c.new) for c in changes} == {
+        ('learner.lr', 0.1, 0.2),
+        ('extra.a', 1, MISSING),
+        ('extra.b', MISSING, 2),
+    }
+    assert config.learner.lr == 0.2 and config.learner['lr'] == 0.2
+    assert config.learner is optimizer_node  # updated in place
+    assert config.learner.optimizer == 'adam'  # defaults re-applied
+    assert 'a' not in config.extra and 'a' not in vars(config.extra)
+    assert config.extra.b == 2
+    assert [(c.path, c.new) for c in seen] == [('learner.lr', 0.2)]
+    assert not errors
+    watcher.unsubscribe(everything)
+
+
+def test_reload_ordered(tmp_path):
+    file_path = str(tmp_path / 'config.yml')
+    rewrite(file_path, 'a: 1\nz: 2\nb: {c: 3, d: 4}\n')
+    config = OrderedBeneDict.load_file(file_path)
+    config.b.move_to_end('c')
+    watcher = ConfigWatcher(use_inotify=False)
+    watcher.watch(config, file_path)
+    rewrite(file_path, 'a: 1\nb: {d: 4, c: 5}\ny: 6\n')
+    changes = watcher.check()
+    assert [(c.path, c.old, c.new) for c in changes] == [
+        ('z', 2, MISSING), ('b.c', 3, 5), ('y', MISSING, 6)]
+    assert list(config.keys()) == ['a', 'b', 'y']
+    assert list(config.b.items()) == [('d', 4), ('c', 5)]
+    assert 'z' not in vars(config)
+
+
+def test_failed_validation_never_applies(watched):
+    watcher, config, file_path, errors = watched
+    before = config.to_dict()
+    seen = []
+    watcher.subscribe(seen.append)
+    rewrite(file_path, {'learner': {'lr': 'fast'}, 'extra': {'a': 2}})
+    assert watcher.check() == []
+    assert config.to_dict() == before
+    assert isinstance(errors[0], ConfigError) and not seen
+    rewrite(file_path, 'learner: {lr: [')  # broken YAML
+    assert watcher.check() == []
+    assert config.to_dict() == before and len(errors) == 2
+
+
+def test_background(watched):
+    watcher, config, file_path, errors = watched
+    watcher.interval = 0.01
+    with watcher:
+        rewrite(file_path, {'learner': {'lr': 0.5}})
+        deadline = time.time() + 5
+        while config.learner.lr != 0.5 and time.time() < deadline:
+            time.sleep(0.01)
+    assert config.learner.lr == 0.5
+    assert 'extra' not in config
+
+
+def test_apply_is_all_or_nothing():
+    from benedict.watcher import _apply_changes
+    config = Config({'a': {'b': 1}, 'c': 2})
+    with pytest.raises(KeyError):
+        _apply_changes(config, [(('c',), 2, 3), (('x', 'y'), MISSING, 1)])
+    assert config == {'a': {'b': 1}, 'c': 2} and config.c == 2